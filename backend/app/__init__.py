@@ -1,3 +1,5 @@
+from typing import Optional
+
 from flask import Flask
 
 from backend.app.config import settings
@@ -5,35 +7,47 @@ from backend.app.routes import admin_bp, api_bp, web_bp
 from backend.app.routes.admin import init_admin_routes
 from backend.app.routes.api import init_api_routes
 from backend.app.routes.web import init_web_routes
+from backend.app.services.artifact_store import ArtifactStore
 from backend.app.services.certificate_service import CertificateService
 from backend.app.services.ipfs_service import IPFSService
+from backend.app.services.job_queue import JobQueue
 from backend.app.services.linkedin_service import LinkedInService
 from backend.app.services.ots_service import OpenTimestampsService
 from backend.app.services.pdf_service import PDFService
+from backend.app.services.revocation_list import RevocationListPublisher
 from backend.app.services.signature_service import SignatureService
 from backend.app.services.storage_service import CertificateStore
 
 
-def create_app() -> Flask:
-    app = Flask(__name__)
-    app.config["SECRET_KEY"] = "dadadevs-demo-secret"
-
+def build_certificate_service(job_queue: Optional[JobQueue] = None) -> CertificateService:
+    """Wire a ``CertificateService`` from settings (shared by the app and the CLI)."""
     store = CertificateStore()
     signer = SignatureService()
-    pdf_service = PDFService(base_url=settings.BASE_URL)
-    ots_service = OpenTimestampsService()
-    ipfs_service = IPFSService()
-    linkedin_service = LinkedInService()
-
-    cert_service = CertificateService(
+    return CertificateService(
         store=store,
         signer=signer,
-        pdf_service=pdf_service,
-        ots_service=ots_service,
-        ipfs_service=ipfs_service,
-        linkedin_service=linkedin_service,
+        pdf_service=PDFService(base_url=settings.BASE_URL),
+        ots_service=OpenTimestampsService(),
+        ipfs_service=IPFSService(),
+        linkedin_service=LinkedInService(),
+        job_queue=job_queue,
+        artifact_store=ArtifactStore(),
+        revocation_list=RevocationListPublisher(store, signer),
     )
 
+
+def create_app(start_workers: bool = True) -> Flask:
+    """Build the Flask app; ``start_workers=False`` skips the background job threads (CLI use)."""
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "dadadevs-demo-secret"
+
+    job_queue = JobQueue() if settings.ASYNC_ISSUANCE else None
+    cert_service = build_certificate_service(job_queue)
+    app.extensions["certificate_service"] = cert_service
+    signer = cert_service.signer
+    if job_queue is not None and start_workers:
+        job_queue.start()
+
     init_admin_routes(cert_service)
     init_api_routes(cert_service)
     init_web_routes(cert_service)
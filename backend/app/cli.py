@@ -0,0 +1,311 @@
+"""
+Maintenance commands that run against the local data directory.
+
+Usage examples:
+    python -m backend.app.cli export-cohort "DadaDevs Feb 2025"
+    python -m backend.app.cli export-cohort "DadaDevs Feb 2025" --format pdf --output feb.pdf
+    python -m backend.app.cli export-cohort cohort-2 --include-revoked --output - > cohort-2.zip
+    python -m backend.app.cli upgrade-proofs            # e.g. hourly from cron
+    python -m backend.app.cli retry-pins
+    python -m backend.app.cli prune-jobs --older-than 86400
+    python -m backend.app.cli publish-payloads
+    python -m backend.app.cli build-site --output /var/www/certs
+    python -m backend.app.cli publish-crl               # e.g. hourly from cron
+    python -m backend.app.cli rotate-key
+    python -m backend.app.cli issue-batch roster.csv --output feb-2025 --workers 4
+    python -m backend.app.cli issue-batch roster.csv --output feb-2025     # resumes after an interruption
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from werkzeug.utils import secure_filename
+
+from backend.app import build_certificate_service, create_app
+from backend.app.config import settings
+from backend.app.services.certificate_service import CertificateExistsError, CertificateService
+from backend.app.services.job_queue import JobQueue
+from backend.app.services.static_site import StaticSiteBuilder
+from backend.app.services.storage_backends import atomic_write_bytes, atomic_write_text
+
+ISSUE_CHECKPOINT = ".issue-batch.json"
+
+
+def export_cohort(args: argparse.Namespace) -> int:
+    service = build_certificate_service()
+    count = service.count_export(args.cohort, args.include_revoked)
+    if not count:
+        print(f"No certificates found for cohort {args.cohort!r}", file=sys.stderr)
+        return 1
+    export = service.export_cohort_zip if args.format == "zip" else service.export_cohort_pdf
+    chunks = export(args.cohort, args.include_revoked)
+    if args.output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return 0
+    output = Path(args.output or f"certificates-{secure_filename(args.cohort) or 'cohort'}.{args.format}")
+    with output.open("wb") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+    print(f"Exported {count} certificate(s) to {output}", file=sys.stderr)
+    return 0
+
+
+def upgrade_proofs(args: argparse.Namespace) -> int:
+    service = build_certificate_service()
+    results = service.upgrade_proofs(args.cert_ids or None)
+    counts = Counter(result["status"] for result in results.values())
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "nothing to upgrade"
+    print(f"Checked {len(results)} pending proof(s): {summary}", file=sys.stderr)
+    return 0
+
+
+def retry_pins(args: argparse.Namespace) -> int:
+    service = build_certificate_service()
+    retried = service.retry_failed_pins()
+    remaining = service.store.count_certificates(ipfs_status="error")
+    print(f"Retried {retried} failed IPFS pin(s); {remaining} still failing", file=sys.stderr)
+    return 1 if remaining else 0
+
+
+def prune_jobs(args: argparse.Namespace) -> int:
+    queue = JobQueue()
+    removed = queue.prune(args.older_than)
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(queue.counts().items())) or "empty"
+    print(f"Removed {removed} finished jobs; queue: {counts}")
+    return 0
+
+
+def publish_payloads(args: argparse.Namespace) -> int:
+    service = build_certificate_service()
+    count = service.publish_all()
+    store = service.ipfs_service.public_store
+    # Per-id files written before the content-addressed layout, and JSON manifests replaced by logs.
+    legacy = list(store.root.glob("*.json"))
+    legacy += [path for path in store.cohorts_dir.glob("*.json") if path.name != "index.json"]
+    for path in legacy:
+        path.unlink()
+    print(f"Published {count} payload(s) to {store.root}; removed {len(legacy)} legacy file(s)", file=sys.stderr)
+    return 0
+
+
+def publish_crl(args: argparse.Namespace) -> int:
+    service = build_certificate_service()
+    crl = service.revocation_list.publish()["crl"]
+    print(
+        f"Revocation list #{crl['number']}: {crl['count']} revoked, valid until {crl['next_update']} "
+        f"({service.revocation_list.output_dir})",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def rotate_key(args: argparse.Namespace) -> int:
+    signer = build_certificate_service().signer
+    previous = signer.key_id
+    key_id = signer.rotate()
+    print(f"Signing key rotated: {previous} retired, now signing with {key_id}", file=sys.stderr)
+    return 0
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunked(rows: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def issue_batch(args: argparse.Namespace, service: Optional[CertificateService] = None) -> int:
+    """Issue a CSV roster (name, cohort, email columns) offline, chunk by chunk, with a resumable checkpoint.
+
+    Rows whose certificate is already stored are never re-issued. Only rows
+    of the chunk that was in flight when the previous run stopped (same
+    output directory and checkpoint) count as issued, and their PDFs are
+    copied from the archive. Any other row is logged as ``exists``.
+    """
+    roster = Path(args.roster)
+    output = Path(args.output or f"certificates-{secure_filename(roster.stem) or 'roster'}")
+    output.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output / ISSUE_CHECKPOINT
+    roster_sha256 = _sha256_file(roster)
+    try:
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        checkpoint = {}
+    if checkpoint and checkpoint.get("roster_sha256") != roster_sha256 and not args.restart:
+        print(f"{checkpoint_path} belongs to a different roster; pass --restart to start over", file=sys.stderr)
+        return 1
+    if args.restart or not checkpoint:
+        checkpoint = {"roster_sha256": roster_sha256, "rows": 0, "issued": 0, "failed": 0}
+    elif checkpoint["rows"]:
+        print(f"Resuming after row {checkpoint['rows']}", file=sys.stderr)
+    checkpoint.setdefault("skipped", 0)
+    replayed = checkpoint.pop("inflight", None) or [0, 0]
+
+    settings.BATCH_PDF_WORKERS = args.workers
+    service = service or build_certificate_service(JobQueue() if settings.ASYNC_ISSUANCE else None)
+    started, issued_now = time.monotonic(), 0
+    interactive = sys.stderr.isatty()
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    with roster.open(newline="", encoding="utf-8-sig") as handle, (output / "issued.csv").open(
+        "a", newline="", encoding="utf-8"
+    ) as log_handle, pool or nullcontext():
+        log = csv.writer(log_handle)
+        if log_handle.tell() == 0:
+            log.writerow(["row", "status", "certificate_id", "name", "cohort", "email", "error"])
+        numbered: Iterator[Tuple[int, Dict]] = enumerate(csv.DictReader(handle), start=1)
+        rows = islice(numbered, checkpoint["rows"], None)
+        for chunk in _chunked(rows, args.chunk_size):
+            entries, numbers = [], []
+            for number, row in chunk:
+                name = (row.get("name") or "").strip()
+                email = (row.get("email") or "").strip() or None
+                cohort = (row.get("cohort") or "").strip() or args.cohort
+                if not name:
+                    log.writerow([number, "error", "", "", cohort, email or "", "name required"])
+                    checkpoint["failed"] += 1
+                    continue
+                entries.append(
+                    {
+                        # Stable per roster row, so a chunk replayed after a crash finds its own records.
+                        "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"dadadevs-roster:{roster_sha256}:{number}")),
+                        "name": name,
+                        "cohort": cohort,
+                        "email": email,
+                        "metadata": {"source": "issue-batch", "roster_row": number},
+                    }
+                )
+                numbers.append(number)
+            checkpoint["inflight"] = [chunk[0][0], chunk[-1][0]]
+            atomic_write_text(checkpoint_path, json.dumps(checkpoint))
+            for number, (cert, pdf) in zip(numbers, service.issue_many(entries, pool)):
+                status, error = "issued", ""
+                if isinstance(pdf, CertificateExistsError):
+                    located = None
+                    if replayed[0] <= number <= replayed[1] and not cert.get("revoked"):
+                        located = service.certificate_pdf(cert["id"])
+                    if located is None:
+                        status, error = "exists", "already issued" + (" and revoked" if cert.get("revoked") else "")
+                    else:
+                        pdf = located[0].read_bytes()
+                elif isinstance(pdf, Exception):
+                    status, error = "error", str(pdf)
+                if status == "issued":
+                    atomic_write_bytes(output / cert["artifacts"]["pdf_filename"], pdf)
+                    issued_now += 1
+                checkpoint[{"issued": "issued", "exists": "skipped", "error": "failed"}[status]] += 1
+                log.writerow([number, status, cert["id"], cert["name"], cert["cohort"], cert.get("email") or "", error])
+            log_handle.flush()
+            checkpoint["rows"] = chunk[-1][0]
+            del checkpoint["inflight"]
+            atomic_write_text(checkpoint_path, json.dumps(checkpoint))
+            rate = issued_now / max(time.monotonic() - started, 1e-9)
+            progress = (
+                f"{checkpoint['rows']} rows: {checkpoint['issued']} issued, {checkpoint['skipped']} already issued, "
+                f"{checkpoint['failed']} failed, "
+            )
+            print(f"{progress}{rate:.0f} certs/s", end="\r" if interactive else "\n", file=sys.stderr)
+    if interactive:
+        print(file=sys.stderr)
+    print(
+        f"Done: {checkpoint['issued']} issued, {checkpoint['skipped']} already issued, {checkpoint['failed']} failed; "
+        f"PDFs and issued.csv in {output}",
+        file=sys.stderr,
+    )
+    return 1 if checkpoint["failed"] else 0
+
+
+def build_site(args: argparse.Namespace) -> int:
+    app = create_app(start_workers=False)
+    builder = StaticSiteBuilder(app, app.extensions["certificate_service"], Path(args.output))
+    counts = builder.build(full=args.full)
+    print(
+        f"{builder.output_dir}: {counts['rendered']} rendered, {counts['unchanged']} unchanged, "
+        f"{counts['removed']} removed",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.app.cli", description="Dada Devs certificate tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export-cohort", help="Export every certificate of a cohort as a ZIP or one PDF")
+    export.add_argument("cohort", help="Cohort name, as stored on the certificates")
+    export.add_argument("--format", choices=("zip", "pdf"), default="zip", help="ZIP of PDFs or one multi-page PDF")
+    export.add_argument("--output", help="Output file ('-' for stdout); defaults to certificates-<cohort>.<format>")
+    export.add_argument("--include-revoked", action="store_true", help="Include revoked certificates")
+    export.set_defaults(handler=export_cohort)
+
+    upgrade = commands.add_parser("upgrade-proofs", help="Upgrade pending OpenTimestamps proofs to Bitcoin attestations")
+    upgrade.add_argument("cert_ids", nargs="*", help="Only these certificates (default: every pending proof)")
+    upgrade.set_defaults(handler=upgrade_proofs)
+
+    pins = commands.add_parser("retry-pins", help="Pin again every certificate whose IPFS pin failed")
+    pins.set_defaults(handler=retry_pins)
+
+    prune = commands.add_parser("prune-jobs", help="Delete finished background jobs from the queue database")
+    prune.add_argument(
+        "--older-than",
+        type=float,
+        default=None,
+        help="Age in seconds (default: JOB_RETENTION_SECONDS)",
+    )
+    prune.set_defaults(handler=prune_jobs)
+
+    publish = commands.add_parser("publish-payloads", help="Rebuild the public payload store and manifests")
+    publish.set_defaults(handler=publish_payloads)
+
+    crl = commands.add_parser("publish-crl", help="Re-sign the revocation list, deltas and Bloom filter")
+    crl.set_defaults(handler=publish_crl)
+
+    rotate = commands.add_parser("rotate-key", help="Retire the signing key and start signing with a new one")
+    rotate.set_defaults(handler=rotate_key)
+
+    batch = commands.add_parser("issue-batch", help="Issue every row of a CSV roster locally, without the server")
+    batch.add_argument("roster", help="CSV with name, cohort and email columns")
+    batch.add_argument("--output", help="Directory for PDFs, issued.csv and the checkpoint")
+    batch.add_argument("--cohort", default="unspecified", help="Cohort for rows that leave it empty")
+    batch.add_argument("--workers", type=int, default=settings.BATCH_PDF_WORKERS, help="PDF rendering processes")
+    batch.add_argument("--chunk-size", type=int, default=200, help="Rows signed, rendered and stored per step")
+    batch.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start from row 1")
+    batch.set_defaults(handler=issue_batch)
+
+    site = commands.add_parser("build-site", help="Pre-render verify pages and JSON twins for a static host")
+    site.add_argument("--output", default=str(settings.STATIC_SITE_DIR), help="Output directory")
+    site.add_argument("--full", action="store_true", help="Re-render every certificate, not only changed ones")
+    site.set_defaults(handler=build_site)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,19 +14,124 @@ class Settings:
     CERT_DB_PATH = DATA_DIR / "certs.json"
     CERT_REQUEST_DB_PATH = DATA_DIR / "cert_requests.json"
     PUBLIC_PAYLOAD_DIR = DATA_DIR / "public"
+    # Signed revocation list, deltas and Bloom filter (static files). Lists are
+    # valid for REVOCATION_LIST_TTL seconds; regenerate them on revocation and
+    # from cron with `python -m backend.app.cli publish-crl`.
+    REVOCATION_DIR = PUBLIC_PAYLOAD_DIR / "revocations"
+    REVOCATION_LIST_TTL = int(os.environ.get("REVOCATION_LIST_TTL", str(24 * 3600)))
+    REVOCATION_BLOOM_FP_RATE = float(os.environ.get("REVOCATION_BLOOM_FP_RATE", "0.001"))
+    REVOCATION_DELTAS_KEPT = int(os.environ.get("REVOCATION_DELTAS_KEPT", "100"))
+    # Output of `python -m backend.app.cli build-site` (pre-rendered verify pages).
+    STATIC_SITE_DIR = Path(os.environ.get("STATIC_SITE_DIR", str(DATA_DIR / "site")))
+
+    # "log" keeps an append-only certs.jsonl/cert_requests.jsonl next to the
+    # legacy JSON files (migrated automatically on first start); "json" keeps
+    # the original whole-file rewrites.
+    STORE_BACKEND = os.environ.get("STORE_BACKEND", "log")
+    STORE_COMPACT_RATIO = float(os.environ.get("STORE_COMPACT_RATIO", "1.0"))
+    STORE_COMPACT_MIN = int(os.environ.get("STORE_COMPACT_MIN", "1000"))
+
+    BATCH_PDF_WORKERS = int(os.environ.get("BATCH_PDF_WORKERS", str(os.cpu_count() or 1)))
+
+    # OTS stamping and IPFS pinning run on a durable background queue unless
+    # ASYNC_ISSUANCE=false, in which case approval performs them inline.
+    ASYNC_ISSUANCE = os.environ.get("ASYNC_ISSUANCE", "true").lower() == "true"
+    JOB_QUEUE_PATH = DATA_DIR / "jobs.sqlite3"
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+    JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "6"))
+    JOB_BACKOFF_SECONDS = float(os.environ.get("JOB_BACKOFF_SECONDS", "5"))
+    # Finished jobs are deleted once this old (seconds); workers sweep every
+    # JOB_PRUNE_INTERVAL seconds. Failed jobs are kept for inspection.
+    JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    JOB_PRUNE_INTERVAL = float(os.environ.get("JOB_PRUNE_INTERVAL", "3600"))
+
+    # POST /api/v1/verify/batch: request size cap, and the batch size from
+    # which signature checks are spread over VERIFY_WORKERS processes.
+    VERIFY_BATCH_MAX = int(os.environ.get("VERIFY_BATCH_MAX", "500"))
+    VERIFY_WORKERS = int(os.environ.get("VERIFY_WORKERS", str(os.cpu_count() or 1)))
+    VERIFY_PARALLEL_MIN = int(os.environ.get("VERIFY_PARALLEL_MIN", "256"))
+
+    # Per-process cache of signature/OpenTimestamps results for /verify pages.
+    VERIFY_CACHE_SIZE = int(os.environ.get("VERIFY_CACHE_SIZE", "10000"))
+    VERIFY_CACHE_TTL = float(os.environ.get("VERIFY_CACHE_TTL", "300"))
+
+    # Cache-Control per route. Verify pages, API records and proofs also carry
+    # an ETag/Last-Modified, so revalidating is a 304 answered before any
+    # verification or rendering. A confirmed proof never changes again.
+    CACHE_CONTROL_VERIFY = os.environ.get("CACHE_CONTROL_VERIFY", "public, max-age=60, must-revalidate")
+    CACHE_CONTROL_API = os.environ.get("CACHE_CONTROL_API", "private, no-cache")
+    CACHE_CONTROL_PROOF = os.environ.get("CACHE_CONTROL_PROOF", "public, max-age=300, must-revalidate")
+    CACHE_CONTROL_PROOF_CONFIRMED = os.environ.get(
+        "CACHE_CONTROL_PROOF_CONFIRMED", "public, max-age=31536000, immutable"
+    )
+    CACHE_CONTROL_PDF = os.environ.get("CACHE_CONTROL_PDF", "public, max-age=300, must-revalidate")
+    CACHE_CONTROL_REVOCATIONS = os.environ.get("CACHE_CONTROL_REVOCATIONS", "public, max-age=300")
+    CACHE_CONTROL_KEYS = os.environ.get("CACHE_CONTROL_KEYS", "public, max-age=300")
+
+    PAGE_SIZE = int(os.environ.get("PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "200"))
+    # A single-PDF cohort export is drawn in full before its first byte is
+    # sent, so the admin UI only offers it up to this many certificates
+    # (ZIP exports stream and have no limit; the CLI has none either).
+    EXPORT_PDF_WEB_MAX = int(os.environ.get("EXPORT_PDF_WEB_MAX", "300"))
 
     BASE_URL = os.environ.get("BASE_URL", "http://localhost:5000")
     ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "admin")
     ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "adminpass")
 
+    # With MERKLE_SIGNING=true, batch approvals sign one Merkle root per cohort
+    # (of at least MERKLE_SIGNING_MIN certificates) instead of every
+    # certificate; each certificate stores its inclusion path.
+    MERKLE_SIGNING = os.environ.get("MERKLE_SIGNING", "false").lower() == "true"
+    MERKLE_SIGNING_MIN = int(os.environ.get("MERKLE_SIGNING_MIN", "16"))
+
     PRIVATE_KEY_PATH = KEY_DIR / os.environ.get("PRIVATE_KEY_FILE", "ed25519_private.pem")
     PUBLIC_KEY_PATH = KEY_DIR / os.environ.get("PUBLIC_KEY_FILE", "ed25519_public.pem")
 
     IPFS_API_URL = os.environ.get("IPFS_API_URL")
     IPFS_API_KEY = os.environ.get("IPFS_API_KEY")
     IPFS_API_SECRET = os.environ.get("IPFS_API_SECRET")
+    # Several payloads are pinned as one directory through this endpoint
+    # (Pinata's pinFileToIPFS, derived from IPFS_API_URL when not set).
+    IPFS_BATCH_API_URL = os.environ.get("IPFS_BATCH_API_URL") or (
+        IPFS_API_URL.replace("pinJSONToIPFS", "pinFileToIPFS")
+        if IPFS_API_URL and "pinJSONToIPFS" in IPFS_API_URL
+        else None
+    )
+    IPFS_GATEWAY_URL = os.environ.get("IPFS_GATEWAY_URL", "https://ipfs.io/ipfs")
+    IPFS_MAX_CONCURRENCY = int(os.environ.get("IPFS_MAX_CONCURRENCY", "4"))
+    IPFS_TIMEOUT = float(os.environ.get("IPFS_TIMEOUT", "10"))
+    IPFS_RETRIES = int(os.environ.get("IPFS_RETRIES", "3"))
+    IPFS_BACKOFF_SECONDS = float(os.environ.get("IPFS_BACKOFF_SECONDS", "0.5"))
 
     OTS_ENABLED = os.environ.get("ENABLE_OTS", "true").lower() == "true"
+    # Certificates are stamped in Merkle batches of up to OTS_BATCH_SIZE; only
+    # the batch root is submitted, once to each calendar.
+    OTS_CALENDAR_URLS = [
+        url.strip()
+        for url in os.environ.get(
+            "OTS_CALENDAR_URLS",
+            "https://a.pool.opentimestamps.org,https://b.pool.opentimestamps.org,https://a.pool.eternitywall.com",
+        ).split(",")
+        if url.strip()
+    ]
+    OTS_TIMEOUT = float(os.environ.get("OTS_TIMEOUT", "10"))
+    OTS_BATCH_SIZE = int(os.environ.get("OTS_BATCH_SIZE", "500"))
+    # Pending proofs are re-checked every OTS_UPGRADE_INTERVAL seconds until
+    # a Bitcoin attestation arrives (or OTS_UPGRADE_MAX_AGE passes); upgrades
+    # are only fetched from the configured calendars and these patterns, and
+    # attestations are checked against block headers from an Esplora API.
+    OTS_UPGRADE_INTERVAL = float(os.environ.get("OTS_UPGRADE_INTERVAL", "3600"))
+    OTS_UPGRADE_MAX_AGE = float(os.environ.get("OTS_UPGRADE_MAX_AGE", str(7 * 24 * 3600)))
+    OTS_UPGRADE_WHITELIST = [
+        pattern.strip()
+        for pattern in os.environ.get(
+            "OTS_UPGRADE_WHITELIST",
+            "https://*.calendar.opentimestamps.org,https://*.calendar.eternitywall.com,https://*.calendar.catallaxy.com",
+        ).split(",")
+        if pattern.strip()
+    ]
+    OTS_BLOCK_EXPLORER_URL = os.environ.get("OTS_BLOCK_EXPLORER_URL", "https://blockstream.info/api")
 
     PDF_ORG_NAME = os.environ.get("ORG_NAME", "Dada Devs")
     PDF_SIGNATORY = os.environ.get("SIGNATORY_NAME", "Dada Devs Training Team")
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import io
 
-from flask import flash, redirect, render_template, request, send_file, url_for, session
+from flask import Response, flash, redirect, render_template, request, send_file, url_for, session
+from werkzeug.utils import secure_filename
 
+from backend.app.config import settings
 from backend.app.routes import admin_bp
 from backend.app.services.auth_service import AuthService, require_admin
 from backend.app.services.certificate_service import CertificateService
+from backend.app.utils import parse_bool
 
 
 def init_admin_routes(service: CertificateService) -> None:
@@ -33,26 +36,71 @@ def init_admin_routes(service: CertificateService) -> None:
     @admin_bp.route("/", methods=["GET"])
     @require_admin
     def dashboard():
-        certs = service.list_history()
-        pending_requests = service.list_requests(status="pending")
-        stats = {
-            "total": len(certs),
-            "revoked": len([c for c in certs if c.get("revoked")]),
-            "active": len([c for c in certs if not c.get("revoked")]),
-            "pending": len(pending_requests),
-        }
+        pending_page = service.list_requests_page(
+            cursor=request.args.get("requests_cursor"),
+            limit=10,
+            status="pending",
+        )
         return render_template(
             "admin/dashboard.html",
-            certificates=certs[:10],
-            pending_requests=pending_requests[:10],
-            stats=stats,
+            certificates=service.list_history(limit=10),
+            pending_requests=pending_page["items"],
+            next_requests_cursor=pending_page["next_cursor"],
+            stats=service.stats(),
         )
 
     @admin_bp.route("/history", methods=["GET"])
     @require_admin
     def history():
-        certs = service.list_history()
-        return render_template("admin/history.html", certificates=certs)
+        status = request.args.get("status", "")
+        page = service.list_history_page(
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", type=int),
+            cohort=request.args.get("cohort", ""),
+            revoked={"revoked": True, "active": False}.get(status),
+        )
+        cohort = request.args.get("cohort", "")
+        return render_template(
+            "admin/history.html",
+            certificates=page["items"],
+            next_cursor=page["next_cursor"],
+            cohort=cohort,
+            status=status,
+            pdf_export_allowed=bool(cohort) and service.count_export(cohort, False) <= settings.EXPORT_PDF_WEB_MAX,
+            pdf_export_max=settings.EXPORT_PDF_WEB_MAX,
+        )
+
+    @admin_bp.route("/export", methods=["GET"])
+    @require_admin
+    def export_cohort():
+        cohort = request.args.get("cohort", "").strip()
+        export_format = request.args.get("format", "zip")
+        include_revoked = bool(parse_bool(request.args.get("include_revoked")))
+        if not cohort or export_format not in ("zip", "pdf"):
+            flash("Choose a cohort and an export format (zip or pdf).", "error")
+            return redirect(url_for("admin.history"))
+        count = service.count_export(cohort, include_revoked)
+        if not count:
+            flash(f"No certificates found for cohort {cohort}.", "error")
+            return redirect(url_for("admin.history", cohort=cohort))
+        if export_format == "pdf" and count > settings.EXPORT_PDF_WEB_MAX:
+            flash(
+                f"{cohort} has {count} certificates; single-PDF exports from the browser are limited to "
+                f"{settings.EXPORT_PDF_WEB_MAX}. Download the ZIP, or run `python -m backend.app.cli "
+                "export-cohort --format pdf`.",
+                "error",
+            )
+            return redirect(url_for("admin.history", cohort=cohort))
+        if export_format == "zip":
+            chunks, mimetype = service.export_cohort_zip(cohort, include_revoked), "application/zip"
+        else:
+            chunks, mimetype = service.export_cohort_pdf(cohort, include_revoked), "application/pdf"
+        filename = f"certificates-{secure_filename(cohort) or 'cohort'}.{export_format}"
+        return Response(
+            chunks,
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
 
     @admin_bp.route("/issue", methods=["POST"])
     @require_admin
@@ -80,8 +128,18 @@ def init_admin_routes(service: CertificateService) -> None:
         if not file:
             flash("CSV file is required", "error")
             return redirect(url_for("admin.dashboard"))
-        requests_created = service.bulk_request_issue(file.read(), requested_by=session.get("admin_username"))
-        flash(f"Queued {len(requests_created)} certificate requests for approval.", "info")
+        try:
+            requests_created, skipped = service.bulk_request_issue(
+                file.stream, requested_by=session.get("admin_username")
+            )
+        except ValueError as exc:
+            flash(str(exc), "error")
+            return redirect(url_for("admin.dashboard"))
+        message = f"Queued {len(requests_created)} certificate requests for approval."
+        if skipped:
+            rows = ", ".join(str(item["row"]) for item in skipped[:10]) + (", ..." if len(skipped) > 10 else "")
+            message += f" Skipped {len(skipped)} rows (missing name, invalid email or duplicate): {rows}."
+        flash(message, "info")
         return redirect(url_for("admin.dashboard"))
 
     @admin_bp.route("/revoke/<cert_id>", methods=["POST"])
@@ -111,6 +169,33 @@ def init_admin_routes(service: CertificateService) -> None:
             mimetype="application/pdf",
         )
 
+    @admin_bp.route("/requests/approve", methods=["POST"])
+    @require_admin
+    def approve_requests():
+        request_ids = request.form.getlist("request_ids")
+        if request.form.get("scope") == "all":
+            request_ids = None
+        elif not request_ids:
+            flash("Select at least one request to approve.", "error")
+            return redirect(url_for("admin.dashboard"))
+        cohort = request.form.get("cohort") or None
+        report, archive = service.approve_requests(
+            request_ids=request_ids,
+            cohort=cohort,
+            approver=session.get("admin_username"),
+        )
+        approved = [item for item in report if item["status"] == "approved"]
+        if not approved:
+            flash("No pending requests were approved.", "error")
+            return redirect(url_for("admin.dashboard"))
+        flash(f"Approved {len(approved)} of {len(report)} certificate requests.", "success")
+        return send_file(
+            io.BytesIO(archive),
+            as_attachment=True,
+            download_name=f"certificates-{cohort or 'batch'}.zip",
+            mimetype="application/zip",
+        )
+
     @admin_bp.route("/requests/<request_id>/reject", methods=["POST"])
     @require_admin
     def reject_request(request_id: str):
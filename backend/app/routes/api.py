@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from flask import jsonify, request
 
+from backend.app.config import settings
 from backend.app.routes import api_bp
+from backend.app.routes.caching import not_modified, with_validators
 from backend.app.services.certificate_service import CertificateService
+from backend.app.utils import export_public_certificate, parse_bool
 
 
 def init_api_routes(service: CertificateService) -> None:
@@ -25,20 +28,75 @@ def init_api_routes(service: CertificateService) -> None:
         )
         return jsonify({"status": "pending", "request": request_record}), 202
 
+    @api_bp.route("/certificates", methods=["GET"])
+    def api_list_certs():
+        revoked = parse_bool(request.args.get("revoked"))
+        status = request.args.get("status")
+        if status in ("active", "revoked"):
+            revoked = status == "revoked"
+        page = service.list_history_page(
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", type=int),
+            cohort=request.args.get("cohort"),
+            revoked=revoked,
+        )
+        return jsonify(
+            {
+                "certificates": [export_public_certificate(cert) for cert in page["items"]],
+                "next_cursor": page["next_cursor"],
+            }
+        )
+
+    @api_bp.route("/stats", methods=["GET"])
+    def api_stats():
+        return jsonify({**service.stats(), "verification_cache": service.verification_cache.stats()})
+
     @api_bp.route("/certificates/bulk", methods=["POST"])
     def api_bulk_issue():
         csv_content = request.files.get("file")
         if not csv_content:
             return jsonify({"error": "CSV file required"}), 400
-        requests_created = service.bulk_request_issue(csv_content.read(), requested_by="api")
-        return jsonify({"queued": len(requests_created), "requests": requests_created}), 202
+        try:
+            requests_created, skipped = service.bulk_request_issue(csv_content.stream, requested_by="api")
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify({"queued": len(requests_created), "requests": requests_created, "skipped": skipped}), 202
 
     @api_bp.route("/certificates/<cert_id>", methods=["GET"])
     def api_get_cert(cert_id: str):
-        cert = service.verify(cert_id)
+        validators = service.cache_validators(cert_id)
+        cert = None
+        if validators is not None:
+            etag, last_modified = validators["etag"], validators["last_modified"]
+            cached = not_modified(etag, last_modified, settings.CACHE_CONTROL_API)
+            if cached is not None:
+                return cached
+            cert = service.verify(cert_id)
         if not cert:
             return jsonify({"found": False}), 404
-        return jsonify({"found": True, "certificate": cert})
+        response = jsonify({"found": True, "certificate": cert})
+        return with_validators(response, etag, last_modified, settings.CACHE_CONTROL_API)
+
+    @api_bp.route("/batches/<batch_id>", methods=["GET"])
+    def api_get_batch(batch_id: str):
+        manifest = service.batch_manifest(batch_id)
+        if not manifest:
+            return jsonify({"found": False}), 404
+        return jsonify(manifest)
+
+    @api_bp.route("/verify/batch", methods=["POST"])
+    def api_verify_batch():
+        payload = request.get_json(silent=True) or {}
+        items = payload.get("certificates", payload.get("ids"))
+        if not isinstance(items, list) or not items or not all(isinstance(item, (str, dict)) for item in items):
+            return jsonify({"error": "certificates must be a non-empty list of ids or public payloads"}), 400
+        if len(items) > settings.VERIFY_BATCH_MAX:
+            return jsonify({"error": f"at most {settings.VERIFY_BATCH_MAX} certificates per request"}), 413
+        results = service.verify_batch(items)
+        summary: dict = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return jsonify({"results": results, "summary": summary})
 
     @api_bp.route("/certificates/<cert_id>/revoke", methods=["POST"])
     def api_revoke(cert_id: str):
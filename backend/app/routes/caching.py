@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Optional
+
+from flask import Response, request, session
+from werkzeug.http import is_resource_modified
+
+
+def not_modified(etag: str, last_modified: Optional[dt.datetime], cache_control: str) -> Optional[Response]:
+    """A 304 when the client's copy matches ``etag`` / ``last_modified``, else ``None``.
+
+    Call it before doing the work the full response needs. ``If-None-Match``
+    takes precedence over ``If-Modified-Since``, as in RFC 9110.
+    """
+    if "_flashes" in session:
+        return None
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return with_validators(Response(status=304), etag, last_modified, cache_control)
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: Optional[dt.datetime], cache_control: str
+) -> Response:
+    """Attach the validators and ``Cache-Control`` policy to a freshly built response.
+
+    Responses that touched the session (e.g. rendered a one-off flash
+    message) are personal, so they are never marked cacheable.
+    """
+    if session.modified or "_flashes" in session:
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -1,26 +1,43 @@
 from __future__ import annotations
 
+import hashlib
 import io
 from pathlib import Path
 
-from flask import abort, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask import (
+    abort,
+    flash,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    send_from_directory,
+    url_for,
+)
 
 from backend.app.config import settings
 
 from backend.app.routes import web_bp
+from backend.app.routes.caching import not_modified, with_validators
 from backend.app.services.auth_service import AuthService
 from backend.app.services.certificate_service import CertificateService
 
 
+TEMPLATE_DIR = Path(__file__).resolve().parents[1] / "templates"
+
+
 def init_web_routes(service: CertificateService) -> None:
+    # Verify pages also depend on the templates and base URL, neither of which
+    # changes without a restart.
+    page_version = hashlib.sha256(settings.BASE_URL.encode("utf-8"))
+    for name in ("base.html", "verify.html"):
+        page_version.update((TEMPLATE_DIR / name).read_bytes())
+
     @web_bp.route("/", methods=["GET"])
     def landing():
-        certificates = service.store.list_certificates()
-        stats = {
-            "total": len(certificates),
-            "revoked": len([c for c in certificates if c.get("revoked")]),
-        }
-        return render_template("landing.html", stats=stats)
+        return render_template("landing.html", stats=service.stats())
 
     @web_bp.route("/issue", methods=["POST"])
     def public_issue():
@@ -56,31 +73,87 @@ def init_web_routes(service: CertificateService) -> None:
 
     @web_bp.route("/verify/<cert_id>", methods=["GET"])
     def verify(cert_id: str):
-        cert = service.verify(cert_id)
+        validators = service.cache_validators(cert_id)
+        cert = None
+        if validators is not None:
+            digest = page_version.copy()
+            digest.update(validators["etag"].encode("utf-8"))
+            etag, last_modified = digest.hexdigest(), validators["last_modified"]
+            cached = not_modified(etag, last_modified, settings.CACHE_CONTROL_VERIFY)
+            if cached is not None:
+                return cached
+            cert = service.verify(cert_id)
         if not cert:
             return render_template("verify.html", found=False, cert_id=cert_id), 404
         signature_valid = cert.get("signature_valid")
         ots = cert.get("ots_verification", {})
-        return render_template(
-            "verify.html",
-            found=True,
-            cert=cert,
-            signature_valid=signature_valid,
-            ots=ots,
+        response = make_response(
+            render_template(
+                "verify.html",
+                found=True,
+                cert=cert,
+                signature_valid=signature_valid,
+                ots=ots,
+            )
         )
+        return with_validators(response, etag, last_modified, settings.CACHE_CONTROL_VERIFY)
+
+    @web_bp.route("/certificates/<cert_id>.pdf", methods=["GET"])
+    def download_certificate(cert_id: str):
+        result = service.certificate_pdf(cert_id)
+        if not result:
+            abort(404)
+        pdf_path, digest = result
+        response = send_file(
+            pdf_path,
+            mimetype="application/pdf",
+            download_name=f"certificate-{cert_id}.pdf",
+            etag=digest,
+            conditional=True,
+        )
+        response.headers["Cache-Control"] = settings.CACHE_CONTROL_PDF
+        return response
 
     @web_bp.route("/proofs/<cert_id>.ots", methods=["GET"])
     def download_proof(cert_id: str):
-        proof_path = Path(settings.PROOF_DIR) / f"{cert_id}.ots"
-        if not proof_path.exists():
+        validators = service.cache_validators(cert_id)
+        if validators is None or validators["proof_digest"] is None:
             abort(404)
-        return send_file(
-            proof_path,
+        etag, last_modified = validators["proof_digest"], validators["proof_modified"]
+        if validators["proof_confirmed"]:
+            policy = settings.CACHE_CONTROL_PROOF_CONFIRMED
+        else:
+            policy = settings.CACHE_CONTROL_PROOF
+        cached = not_modified(etag, last_modified, policy)
+        if cached is not None:
+            return cached
+        response = send_file(
+            service.ots_service.proof_path(cert_id),
             mimetype="application/octet-stream",
             as_attachment=True,
             download_name=f"{cert_id}.ots",
+            etag=etag,
+            last_modified=last_modified,
+            conditional=True,
         )
-    
+        return with_validators(response, etag, last_modified, policy)
+
+    @web_bp.route("/.well-known/jwks.json", methods=["GET"])
+    def jwks():
+        """Every signing key, current and retired, by key id."""
+        response = jsonify(service.signer.jwks())
+        response.headers["Cache-Control"] = settings.CACHE_CONTROL_KEYS
+        return response
+
+    @web_bp.route("/revocations/<path:filename>", methods=["GET"])
+    def revocations(filename: str):
+        """Signed revocation list, deltas and Bloom filter (normally served straight from the static host)."""
+        if service.revocation_list is None:
+            abort(404)
+        response = send_from_directory(service.revocation_list.output_dir, filename)
+        response.headers["Cache-Control"] = settings.CACHE_CONTROL_REVOCATIONS
+        return response
+
     @web_bp.route("/verify-identity/<cert_id>", methods=["GET", "POST"])
     def verify_identity(cert_id: str):
         """Student identity verification page."""
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from backend.app.config import settings
+
+
+class ArtifactStore:
+    """Content-addressed blob store: ``<root>/<aa>/<sha256><suffix>``.
+
+    Blobs are immutable, so the digest doubles as a strong ETag and a blob is
+    only ever written once.
+    """
+
+    def __init__(self, root: Path = settings.STATIC_STORAGE):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str, suffix: str = ".pdf") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def exists(self, digest: Optional[str], suffix: str = ".pdf") -> bool:
+        return bool(digest) and self.path(digest, suffix).exists()
+
+    def put(self, data: bytes, suffix: str = ".pdf") -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.path(digest, suffix)
+        if target.exists():
+            return digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return digest
+
+    def delete(self, digest: Optional[str], suffix: str = ".pdf") -> None:
+        if digest:
+            self.path(digest, suffix).unlink(missing_ok=True)
@@ -6,8 +6,18 @@ import hashlib
 import secrets
 import json
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Set, Tuple
 from backend.app.config import settings
+from backend.app.services.storage_backends import FileSignature, atomic_write_text, file_signature, interprocess_lock
+
+# (email, cert_id) pairs with a verified token, per verifications file, tagged
+# with the file signature they were built from. AuthService is instantiated per
+# request, so the index lives at module level.
+_verified_index: Dict[Path, Tuple[FileSignature, Set[Tuple[str, str]]]] = {}
+
+
+def _verified_pairs(data: Dict) -> Set[Tuple[str, str]]:
+    return {(v.get("email"), v.get("cert_id")) for v in data.values() if v.get("verified")}
 
 
 class AuthService:
@@ -53,32 +63,36 @@ class AuthService:
     def generate_student_verification_token(self, email: str, cert_id: str) -> str:
         """Generate a verification token for student identity."""
         token = secrets.token_urlsafe(32)
-        verifications = self._load_verifications()
-        verifications[token] = {
-            "email": email,
-            "cert_id": cert_id,
-            "verified": False,
-            "created_at": None
-        }
-        self._save_verifications(verifications)
+        with interprocess_lock(self.student_verifications_file):
+            verifications = self._load_verifications()
+            verifications[token] = {
+                "email": email,
+                "cert_id": cert_id,
+                "verified": False,
+                "created_at": None
+            }
+            self._save_verifications(verifications)
         return token
     
     def verify_student_token(self, token: str) -> Optional[Dict]:
         """Verify a student token and mark as verified."""
-        verifications = self._load_verifications()
-        if token in verifications:
-            verifications[token]["verified"] = True
-            self._save_verifications(verifications)
-            return verifications[token]
+        with interprocess_lock(self.student_verifications_file):
+            verifications = self._load_verifications()
+            if token in verifications:
+                verifications[token]["verified"] = True
+                self._save_verifications(verifications)
+                return verifications[token]
         return None
     
     def check_student_verified(self, email: str, cert_id: str) -> bool:
         """Check if student email is verified for a certificate."""
-        verifications = self._load_verifications()
-        for v in verifications.values():
-            if v.get("email") == email and v.get("cert_id") == cert_id and v.get("verified"):
-                return True
-        return False
+        path = self.student_verifications_file
+        signature = file_signature(path)
+        cached = _verified_index.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, _verified_pairs(self._load_verifications()))
+            _verified_index[path] = cached
+        return (email, cert_id) in cached[1]
     
     def _load_verifications(self) -> Dict:
         """Load verification data."""
@@ -88,10 +102,10 @@ class AuthService:
             return {}
     
     def _save_verifications(self, data: Dict):
-        """Save verification data."""
-        self.student_verifications_file.write_text(
-            json.dumps(data, indent=2), encoding="utf-8"
-        )
+        """Save verification data (caller holds the file's interprocess lock)."""
+        path = self.student_verifications_file
+        atomic_write_text(path, json.dumps(data, indent=2))
+        _verified_index[path] = (file_signature(path), _verified_pairs(data))
 
 
 def require_admin(f):
@@ -1,17 +1,81 @@
 from __future__ import annotations
 
 import csv
+import datetime as dt
+import hashlib
 import io
+import json
+import tempfile
+import time
 import uuid
-from typing import Dict, List, Optional, Tuple
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
-from backend.app.services.ipfs_service import IPFSService
+from backend.app.config import settings
+from backend.app.services.artifact_store import ArtifactStore
+from backend.app.services.ipfs_service import IPFSPinError, IPFSService
+from backend.app.services.job_queue import JobQueue
+from backend.app.services import merkle
 from backend.app.services.linkedin_service import LinkedInService
 from backend.app.services.ots_service import OpenTimestampsService
-from backend.app.services.pdf_service import PDFService
+from backend.app.services.pdf_service import PDFService, render_pdf_bytes
+from backend.app.services.revocation_list import RevocationListPublisher
 from backend.app.services.signature_service import SignatureService
 from backend.app.services.storage_service import CertificateStore
-from backend.app.utils import canonical_payload, export_public_certificate, utc_now_iso
+from backend.app.services.verification_cache import VerificationCache
+from backend.app.utils import (
+    CANONICAL_FIELDS,
+    canonical_payload,
+    decode_cursor,
+    encode_cursor,
+    export_public_certificate,
+    parse_utc_iso,
+    utc_now_iso,
+)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, unseekable file that a generator drains between writes.
+
+    ``zipfile`` detects that it cannot seek and writes sizes in data
+    descriptors instead, which is what lets an archive be streamed.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def pending(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+class CertificateExistsError(RuntimeError):
+    """``issue_many`` was given the id of a stored certificate, which is left as it is."""
+
+
+def _looks_like_email(email: str) -> bool:
+    local, _, domain = email.partition("@")
+    return bool(local) and "." in domain and "@" not in domain and not any(char.isspace() for char in email)
 
 
 class CertificateService:
@@ -23,6 +87,10 @@ class CertificateService:
         ots_service: OpenTimestampsService,
         ipfs_service: IPFSService,
         linkedin_service: LinkedInService,
+        job_queue: Optional[JobQueue] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+        verification_cache: Optional[VerificationCache] = None,
+        revocation_list: Optional[RevocationListPublisher] = None,
     ):
         self.store = store
         self.signer = signer
@@ -30,9 +98,38 @@ class CertificateService:
         self.ots_service = ots_service
         self.ipfs_service = ipfs_service
         self.linkedin_service = linkedin_service
+        self.job_queue = job_queue
+        self.artifact_store = artifact_store or ArtifactStore()
+        self.verification_cache = verification_cache or VerificationCache()
+        self.revocation_list = revocation_list
+        self._root_signatures: Dict[Tuple[str, str, Optional[str]], bool] = {}
+        if job_queue is not None:
+            job_queue.register("ots_stamp", self._run_ots_job)
+            job_queue.register("ipfs_pin", self._run_ipfs_job)
+            job_queue.register("ots_upgrade", self._run_ots_upgrade_job)
+            job_queue.register("crl_publish", self._run_crl_job)
 
     def issue(self, name: str, cohort: str, email: str | None = None, metadata: Dict | None = None) -> Tuple[Dict, bytes]:
-        cert_id = str(uuid.uuid4())
+        cert, payload = self._prepare_certificate(name, cohort, email, metadata)
+        if self.job_queue is None:
+            self._anchor_many([(cert, payload)])
+        pdf_bytes = self.pdf_service.generate_pdf(cert).getvalue()
+        self._archive_pdf(cert, pdf_bytes)
+        self.store.save_certificate(cert)
+        self._enqueue_side_effects([cert])
+        return cert, pdf_bytes
+
+    def _prepare_certificate(
+        self,
+        name: str,
+        cohort: str,
+        email: str | None = None,
+        metadata: Dict | None = None,
+        sign: bool = True,
+        cert_id: Optional[str] = None,
+    ) -> Tuple[Dict, str]:
+        """Build (and unless ``sign`` is false, sign) a certificate record; returns it with its canonical payload."""
+        cert_id = cert_id or str(uuid.uuid4())
         issued_at = utc_now_iso()
         cert = {
             "id": cert_id,
@@ -47,22 +144,289 @@ class CertificateService:
         }
 
         payload = canonical_payload(cert)
-        cert["signature"] = self.signer.sign(payload)
+        if sign:
+            cert["key_id"], cert["signature"] = self.signer.sign_with_key_id(payload)
         cert["verify_url"] = f"{self.pdf_service.base_url}/verify/{cert_id}"
         cert["linkedin_share_url"] = self.linkedin_service.share_url(cert_id)
+        cert["artifacts"] = {"pdf_filename": f"certificate-{cert_id}.pdf"}
+        if self.job_queue is not None:
+            cert["ots_status"] = "queued"
+            cert["ots_proof_path"] = None
+            cert["ipfs_status"] = "queued"
+            cert["public_payload_url"] = None
+        return cert, payload
+
+    def _sign_many(self, items: List[Tuple[Dict, str]]) -> None:
+        """Sign prepared certificates one by one, or with ``MERKLE_SIGNING`` one Merkle root per cohort."""
+        cohorts: Dict[str, List[Tuple[Dict, str]]] = {}
+        for item in items:
+            cohorts.setdefault(item[0]["cohort"] if settings.MERKLE_SIGNING else item[0]["id"], []).append(item)
+        for group in cohorts.values():
+            if len(group) >= max(settings.MERKLE_SIGNING_MIN, 2) and settings.MERKLE_SIGNING:
+                self._sign_merkle(group)
+                continue
+            for cert, payload in group:
+                cert["key_id"], cert["signature"] = self.signer.sign_with_key_id(payload)
 
-        ots_result = self.ots_service.stamp(cert_id, payload)
-        cert["ots_status"] = ots_result.get("status")
-        cert["ots_proof_path"] = ots_result.get("proof_path")
+    def _sign_merkle(self, items: List[Tuple[Dict, str]]) -> Dict:
+        """Sign one Merkle root over the payloads, store each inclusion path and publish the batch manifest."""
+        batch_id = str(uuid.uuid4())
+        root, paths = merkle.build([merkle.leaf_hash(payload) for _, payload in items])
+        key_id, signature = self.signer.sign_with_key_id(merkle.root_message(batch_id, len(items), root.hex()))
+        for index, ((cert, _), path) in enumerate(zip(items, paths)):
+            cert["key_id"] = key_id
+            cert["signature"] = signature
+            cert["signature_scheme"] = merkle.SCHEME
+            cert["merkle"] = merkle.inclusion_proof(batch_id, root, index, len(items), path)
+        manifest = {
+            "batch": batch_id,
+            "scheme": merkle.SCHEME,
+            "cohort": items[0][0]["cohort"],
+            "created_at": utc_now_iso(),
+            "size": len(items),
+            "root": root.hex(),
+            "signature": signature,
+            "key_id": key_id,
+            "leaves": [{field: cert[field] for field in CANONICAL_FIELDS} for cert, _ in items],
+        }
+        self.ipfs_service.public_store.put_batch(manifest)
+        return manifest
 
-        public_payload = export_public_certificate(cert)
-        cert["public_payload_url"] = self.ipfs_service.pin_json(cert_id, public_payload)
+    def batch_manifest(self, batch_id: str) -> Optional[Dict]:
+        return self.ipfs_service.public_store.get_batch(batch_id)
 
-        pdf_buffer = self.pdf_service.generate_pdf(cert)
-        cert["artifacts"] = {"pdf_filename": f"certificate-{cert_id}.pdf"}
+    def _check_signatures(self, certs: List[Dict]) -> List[bool]:
+        """Signature validity per record, in order.
 
-        self.store.save_certificate(cert)
-        return cert, pdf_buffer.getvalue()
+        Per-certificate signatures are checked as one ``verify_many`` batch.
+        Merkle-signed records fold their inclusion path up to the root and then
+        need only the root signature, which is checked once per batch and memoized.
+        """
+        results: List[Optional[bool]] = []
+        plain: List[Tuple[str, str, Optional[str]]] = []
+        for cert in certs:
+            if cert.get("signature_scheme") == merkle.SCHEME:
+                results.append(self._check_merkle(cert))
+            else:
+                results.append(None)
+                plain.append((canonical_payload(cert), cert.get("signature") or "", cert.get("key_id")))
+        checked = iter(self.signer.verify_many(plain) if plain else [])
+        return [next(checked) if result is None else result for result in results]
+
+    def _check_merkle(self, cert: Dict) -> bool:
+        root = merkle.proof_root(cert)
+        if root is None:
+            return False
+        signed = (*root, cert.get("key_id"))
+        valid = self._root_signatures.get(signed)
+        if valid is None:
+            valid = self.signer.verify(*signed)
+            if len(self._root_signatures) >= settings.VERIFY_CACHE_SIZE:
+                self._root_signatures.clear()
+            self._root_signatures[signed] = valid
+        return valid
+
+    def _anchor_many(self, items: List[Tuple[Dict, str]]) -> None:
+        """Inline network side-effects: Merkle-batched OpenTimestamps stamps, then one batched payload pin."""
+        size = settings.OTS_BATCH_SIZE
+        for start in range(0, len(items), size):
+            batch = items[start:start + size]
+            results = self.ots_service.stamp_many({cert["id"]: payload for cert, payload in batch})
+            for cert, _ in batch:
+                cert["ots_status"] = results[cert["id"]].get("status")
+                cert["ots_proof_path"] = results[cert["id"]].get("proof_path")
+
+        certs = [cert for cert, _ in items]
+        try:
+            urls = self._pin_many(certs)
+        except IPFSPinError:
+            urls = None
+        for cert in certs:
+            cert["public_payload_url"] = urls.get(cert["id"]) if urls else None
+            cert["ipfs_status"] = "error" if urls is None else "pinned" if cert["public_payload_url"] else "local"
+
+    def _pin_many(self, certs: List[Dict]) -> Dict[str, Optional[str]]:
+        """Pin public payloads, as one directory named after the cohort when there are several."""
+        cohorts = {cert.get("cohort") for cert in certs}
+        name = f"certificates-{cohorts.pop()}" if len(cohorts) == 1 else "certificates"
+        return self.ipfs_service.pin_many({cert["id"]: export_public_certificate(cert) for cert in certs}, name)
+
+    def _archive_pdf(self, cert: Dict, pdf_bytes: bytes) -> None:
+        """Store rendered PDF bytes and point ``cert["artifacts"]`` at them."""
+        cert.setdefault("artifacts", {}).update(
+            pdf_sha256=self.artifact_store.put(pdf_bytes),
+            pdf_fingerprint=self.pdf_service.fingerprint(cert),
+        )
+
+    def certificate_pdf(self, cert_id: str) -> Optional[Tuple[Path, str]]:
+        """Path and SHA-256 of the certificate's archived PDF, rendering it on a cache miss.
+
+        The archived copy is reused while its render fingerprint still matches
+        the certificate (so a revocation or edit triggers a fresh render).
+        """
+        cert = self.store.get_certificate(cert_id)
+        if not cert:
+            return None
+        artifacts = cert.get("artifacts") or {}
+        digest = artifacts.get("pdf_sha256")
+        if artifacts.get("pdf_fingerprint") == self.pdf_service.fingerprint(cert) and self.artifact_store.exists(digest):
+            return self.artifact_store.path(digest), digest
+
+        self._archive_pdf(cert, self.pdf_service.generate_pdf(cert).getvalue())
+        fresh = cert["artifacts"]
+
+        def apply(current: Dict) -> Dict:
+            current.setdefault("artifacts", {}).update(
+                pdf_sha256=fresh["pdf_sha256"], pdf_fingerprint=fresh["pdf_fingerprint"]
+            )
+            return current
+
+        self.store.update_certificate(cert_id, apply)
+        if digest != fresh["pdf_sha256"]:
+            self.artifact_store.delete(digest)
+        return self.artifact_store.path(fresh["pdf_sha256"]), fresh["pdf_sha256"]
+
+    def _enqueue_side_effects(self, certs: List[Dict]) -> None:
+        """Queue OTS stamping in batches of ``OTS_BATCH_SIZE``; each OTS job then queues the IPFS pins."""
+        if self.job_queue is not None and certs:
+            ids = [cert["id"] for cert in certs]
+            size = settings.OTS_BATCH_SIZE
+            self.job_queue.enqueue_many(
+                ("ots_stamp", {"cert_ids": ids[start:start + size]}) for start in range(0, len(ids), size)
+            )
+
+    def _set_fields(self, cert_id: str, **fields) -> Optional[Dict]:
+        def apply(cert: Dict) -> Dict:
+            cert.update(fields)
+            return cert
+
+        return self.store.update_certificate(cert_id, apply)
+
+    def _run_ots_job(self, job: Dict) -> None:
+        # Jobs queued before batching carry a single ``cert_id``.
+        certs = self.store.get_certificates(job.get("cert_ids") or [job["cert_id"]])
+        if not certs:
+            return
+        results = self.ots_service.stamp_many({cert_id: canonical_payload(cert) for cert_id, cert in certs.items()})
+
+        def apply(cert: Dict) -> Dict:
+            cert["ots_status"] = results[cert["id"]].get("status")
+            cert["ots_proof_path"] = results[cert["id"]].get("proof_path")
+            return cert
+
+        self.store.update_certificates(list(certs), apply)
+        for cert_id in certs:
+            self.verification_cache.invalidate(cert_id)
+        error = next((result.get("error") for result in results.values() if result.get("status") == "error"), None)
+        if error is None or job["_final_attempt"]:
+            self.job_queue.enqueue("ipfs_pin", {"cert_ids": list(certs)})
+        if error is not None:
+            raise RuntimeError(error or "OpenTimestamps stamp failed")
+        if any(result.get("status") == "stamped" for result in results.values()):
+            self.job_queue.enqueue(
+                "ots_upgrade",
+                {"cert_ids": list(certs), "stamped_at": time.time()},
+                delay=settings.OTS_UPGRADE_INTERVAL,
+            )
+
+    def _run_ots_upgrade_job(self, job: Dict) -> None:
+        """Upgrade a stamped batch; re-schedules itself while proofs are still pending."""
+        results = self.upgrade_proofs(job["cert_ids"])
+        pending = [cert_id for cert_id, result in results.items() if result.get("status") == "pending"]
+        if pending and time.time() - job["stamped_at"] < settings.OTS_UPGRADE_MAX_AGE:
+            self.job_queue.enqueue(
+                "ots_upgrade",
+                {"cert_ids": pending, "stamped_at": job["stamped_at"]},
+                delay=settings.OTS_UPGRADE_INTERVAL,
+            )
+
+    def upgrade_proofs(self, cert_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Upgrade pending OpenTimestamps proofs and record confirmed block height and time.
+
+        Without ``cert_ids`` every certificate still marked ``stamped`` is
+        walked. Confirmed (or invalid) results are stored on the certificate so
+        that verify pages never have to resolve proofs themselves.
+        """
+        if cert_ids is None:
+            cert_ids = [cert["id"] for cert in self.iter_certificates(ots_status="stamped")]
+        else:
+            stored = self.store.get_certificates(cert_ids)
+            cert_ids = [cert_id for cert_id, cert in stored.items() if cert.get("ots_status") == "stamped"]
+        results = self.ots_service.upgrade_many(cert_ids)
+        settled = {
+            cert_id: result for cert_id, result in results.items() if result["status"] in ("confirmed", "invalid")
+        }
+        if settled:
+            upgraded_at = utc_now_iso()
+
+            def apply(cert: Dict) -> Dict:
+                result = settled[cert["id"]]
+                cert["ots_status"] = result["status"]
+                cert["ots_block_height"] = result.get("block_height")
+                cert["ots_block_time"] = result.get("block_time")
+                cert["ots_upgraded_at"] = upgraded_at
+                if result.get("error"):
+                    cert["ots_error"] = result["error"]
+                return cert
+
+            self._publish(self.store.update_certificates(list(settled), apply))
+            for cert_id in settled:
+                self.verification_cache.invalidate(cert_id)
+        return results
+
+    def _run_ipfs_job(self, job: Dict) -> None:
+        """Pin a batch of public payloads; a failure marks them ``error`` and the queue retries it."""
+        certs = self.store.get_certificates(job.get("cert_ids") or [job["cert_id"]])
+        if not certs:
+            return
+        try:
+            urls = self._pin_many(list(certs.values()))
+        except IPFSPinError:
+            self.store.update_certificates(list(certs), lambda cert: {**cert, "ipfs_status": "error"})
+            raise
+
+        def apply(cert: Dict) -> Dict:
+            cert["public_payload_url"] = urls.get(cert["id"])
+            cert["ipfs_status"] = "pinned" if cert["public_payload_url"] else "local"
+            return cert
+
+        self.store.update_certificates(list(certs), apply)
+
+    def _publish(self, certs: List[Dict]) -> None:
+        """Refresh the local public payloads (unchanged ones are not rewritten)."""
+        if certs:
+            self.ipfs_service.publish({cert["id"]: export_public_certificate(cert) for cert in certs})
+
+    def publish_all(self) -> int:
+        """Re-publish every certificate's public payload, one index page per write; returns the count."""
+        batch: List[Dict] = []
+        count = 0
+        for cert in self.iter_certificates():
+            batch.append(cert)
+            if len(batch) >= settings.MAX_PAGE_SIZE:
+                self._publish(batch)
+                count, batch = count + len(batch), []
+        self._publish(batch)
+        return count + len(batch)
+
+    def retry_failed_pins(self) -> int:
+        """Re-pin every certificate left at ``ipfs_status: error``; returns how many were retried.
+
+        With a job queue the pins are queued again (with its backoff),
+        otherwise they run inline and failures stay marked for the next call.
+        """
+        cert_ids = [cert["id"] for cert in self.iter_certificates(ipfs_status="error")]
+        size = settings.OTS_BATCH_SIZE
+        jobs = [("ipfs_pin", {"cert_ids": cert_ids[start:start + size]}) for start in range(0, len(cert_ids), size)]
+        if self.job_queue is not None:
+            self.job_queue.enqueue_many(jobs)
+            return len(cert_ids)
+        for _, payload in jobs:
+            try:
+                self._run_ipfs_job(payload)
+            except IPFSPinError:
+                pass
+        return len(cert_ids)
 
     def request_issue(
         self,
@@ -87,29 +451,68 @@ class CertificateService:
         }
         return self.store.save_request(request)
 
-    def bulk_request_issue(self, csv_bytes: bytes, requested_by: Optional[str] = None) -> List[Dict]:
-        buffer = io.StringIO(csv_bytes.decode("utf-8"))
-        reader = csv.DictReader(buffer)
+    def bulk_request_issue(
+        self, csv_source: Union[bytes, BinaryIO], requested_by: Optional[str] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Queue one request per row of a ``name,cohort,email`` CSV; returns ``(created, skipped)``.
+
+        Rows are read straight from ``csv_source`` (an uploaded file stream, or
+        bytes) without decoding the whole upload first. A row is skipped, with
+        its 1-based ``row`` number and a ``reason``, when it has no name, a
+        malformed email, or an email+cohort that appears earlier in the upload
+        or already has a pending or approved request. Everything else is saved
+        in one store write, so a CSV that fails to decode queues nothing.
+        """
+        stream = io.BytesIO(csv_source) if isinstance(csv_source, bytes) else csv_source
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        requested_at = utc_now_iso()
         requests: List[Dict] = []
-        for row in reader:
-            name = row.get("name")
-            cohort = row.get("cohort", "unspecified")
-            email = row.get("email")
-            if not name:
-                continue
-            req = self.request_issue(
-                name=name,
-                cohort=cohort,
-                email=email,
-                metadata={"source_row": row},
-                requested_by=requested_by,
-                source="bulk",
-            )
-            requests.append(req)
-        return requests
+        rows: Dict[str, int] = {}
+        skipped: List[Dict] = []
+        seen = set()
+        try:
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                name = (row.get("name") or "").strip()
+                cohort = (row.get("cohort") or "").strip() or "unspecified"
+                email = (row.get("email") or "").strip() or None
+                if not name:
+                    skipped.append({"row": number, "reason": "name required"})
+                    continue
+                if email and not _looks_like_email(email):
+                    skipped.append({"row": number, "name": name, "reason": "invalid email"})
+                    continue
+                if email:
+                    if (email, cohort) in seen:
+                        skipped.append({"row": number, "name": name, "reason": "duplicate in upload"})
+                        continue
+                    seen.add((email, cohort))
+                request = {
+                    "request_id": str(uuid.uuid4()),
+                    "name": name,
+                    "cohort": cohort,
+                    "email": email,
+                    "metadata": {},
+                    "status": "pending",
+                    "requested_at": requested_at,
+                    "requested_by": requested_by,
+                    "source": "bulk",
+                }
+                rows[request["request_id"]] = number
+                requests.append(request)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ValueError(f"Could not read CSV: {exc}") from exc
+        finally:
+            text.detach()
+        created, duplicates = self.store.add_requests(requests)
+        skipped.extend(
+            {"row": rows[request["request_id"]], "name": request["name"], "reason": "already requested"}
+            for request in duplicates
+        )
+        skipped.sort(key=lambda item: item["row"])
+        return created, skipped
 
-    def list_requests(self, status: Optional[str] = None) -> List[Dict]:
-        return self.store.list_requests(status)
+    def list_requests(self, status: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        return self.store.list_requests(status, limit=limit)
 
     def approve_request(self, request_id: str, approver: Optional[str] = None) -> Optional[Tuple[Dict, bytes]]:
         request = self.store.get_request(request_id)
@@ -128,6 +531,200 @@ class CertificateService:
         self.store.save_request(request)
         return cert, pdf_bytes
 
+    def approve_requests(
+        self,
+        request_ids: Optional[List[str]] = None,
+        cohort: Optional[str] = None,
+        approver: Optional[str] = None,
+    ) -> Tuple[List[Dict], bytes]:
+        """Approve many requests at once and return a per-item report plus a ZIP of PDFs.
+
+        With no ``request_ids`` every pending request (optionally only those of
+        ``cohort``) is approved; repeated ids are approved once. Signing runs inline (one Merkle root per cohort
+        with ``MERKLE_SIGNING``), OTS stamping (one Merkle batch per
+        ``OTS_BATCH_SIZE`` certificates) and IPFS pinning go to the
+        job queue (or run inline, pins as one batch, when there is none),
+        PDF rendering to a process pool, and all certificates and request
+        updates are committed in one store write each.
+        """
+        if request_ids is None:
+            filters = {"cohort": cohort} if cohort else {}
+            requests = self.store.list_requests("pending", **filters)
+            request_ids = [req["request_id"] for req in requests]
+        else:
+            request_ids = list(dict.fromkeys(request_ids))
+            requests = [self.store.get_request(request_id) for request_id in request_ids]
+
+        report: List[Dict] = []
+        prepared: List[Tuple[Dict, Dict, str]] = []
+        for request_id, request in zip(request_ids, requests):
+            if not request or request.get("status") != "pending":
+                report.append({"request_id": request_id, "status": "skipped", "error": "not found or not pending"})
+                continue
+            cert, payload = self._prepare_certificate(
+                name=request.get("name", ""),
+                cohort=request.get("cohort", "unspecified"),
+                email=request.get("email"),
+                metadata=request.get("metadata"),
+                sign=False,
+            )
+            prepared.append((request, cert, payload))
+
+        self._sign_many([(cert, payload) for _, cert, payload in prepared])
+        if prepared and self.job_queue is None:
+            self._anchor_many([(cert, payload) for _, cert, payload in prepared])
+        pdfs = self._render_pdfs([cert for _, cert, _ in prepared])
+
+        approved_at = utc_now_iso()
+        certificates: List[Dict] = []
+        approved_requests: List[Dict] = []
+        archive_buffer = io.BytesIO()
+        with zipfile.ZipFile(archive_buffer, "w") as archive:
+            for (request, cert, _), pdf in zip(prepared, pdfs):
+                if isinstance(pdf, Exception):
+                    report.append({"request_id": request["request_id"], "status": "error", "error": str(pdf)})
+                    continue
+                request["status"] = "approved"
+                request["approved_at"] = approved_at
+                request["approved_by"] = approver
+                request["certificate_id"] = cert["id"]
+                certificates.append(cert)
+                approved_requests.append(request)
+                self._archive_pdf(cert, pdf)
+                archive.writestr(cert["artifacts"]["pdf_filename"], pdf, compress_type=zipfile.ZIP_STORED)
+                report.append(
+                    {
+                        "request_id": request["request_id"],
+                        "status": "approved",
+                        "certificate_id": cert["id"],
+                        "name": cert["name"],
+                        "ots_status": cert.get("ots_status"),
+                        "public_payload_url": cert.get("public_payload_url"),
+                    }
+                )
+            self.store.save_certificates(certificates)
+            self.store.save_requests(approved_requests)
+            self._enqueue_side_effects(certificates)
+            position = {request_id: index for index, request_id in enumerate(request_ids)}
+            report.sort(key=lambda item: position[item["request_id"]])
+            archive.writestr("report.json", json.dumps(report, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        return report, archive_buffer.getvalue()
+
+    def issue_many(self, entries: List[Dict], pool: Optional[Executor] = None) -> List[Tuple[Dict, bytes | Exception]]:
+        """Issue certificates directly from ``{"name", "cohort", "email", "metadata", "id"}`` entries.
+
+        The offline counterpart of ``approve_requests`` (no request records):
+        the batch is signed (one Merkle root per cohort with ``MERKLE_SIGNING``),
+        PDFs are rendered on ``pool`` when given, and every certificate whose
+        PDF rendered is stored in one write. An entry whose optional ``id`` is
+        already stored is never re-issued: it comes back as the stored record
+        with a ``CertificateExistsError``, so revocations and signatures are
+        kept. Returns each certificate with its PDF bytes or error, in input order.
+        """
+        ids = [entry.get("id") or str(uuid.uuid4()) for entry in entries]
+        stored = self.store.get_certificates([entry["id"] for entry in entries if entry.get("id")])
+        prepared = [
+            self._prepare_certificate(
+                entry["name"],
+                entry.get("cohort", "unspecified"),
+                entry.get("email"),
+                entry.get("metadata"),
+                sign=False,
+                cert_id=cert_id,
+            )
+            for entry, cert_id in zip(entries, ids)
+            if cert_id not in stored
+        ]
+        self._sign_many(prepared)
+        if prepared and self.job_queue is None:
+            self._anchor_many(prepared)
+        pdfs = self._render_pdfs([cert for cert, _ in prepared], pool)
+        results: Dict[str, Tuple[Dict, bytes | Exception]] = {}
+        rendered: List[Dict] = []
+        for (cert, _), pdf in zip(prepared, pdfs):
+            results[cert["id"]] = cert, pdf
+            if not isinstance(pdf, Exception):
+                self._archive_pdf(cert, pdf)
+                rendered.append(cert)
+        # Another process may have stored some of these ids since the lookup above.
+        clashed = {cert["id"] for cert in self.store.add_certificates(rendered)}
+        if clashed:
+            stored.update(self.store.get_certificates(list(clashed)))
+        self._enqueue_side_effects([cert for cert in rendered if cert["id"] not in clashed])
+        for cert_id, cert in stored.items():
+            results[cert_id] = cert, CertificateExistsError(f"certificate {cert_id} already issued")
+        return [results[cert_id] for cert_id in ids]
+
+    def _render_pdfs(self, certs: List[Dict], pool: Optional[Executor] = None) -> List[bytes | Exception]:
+        """Render PDFs in a process pool (``pool`` if given; inline for one cert or one worker)."""
+        workers = min(settings.BATCH_PDF_WORKERS, len(certs))
+        if pool is None and workers <= 1:
+            results: List[bytes | Exception] = []
+            for cert in certs:
+                try:
+                    results.append(self.pdf_service.generate_pdf(cert).getvalue())
+                except Exception as exc:
+                    results.append(exc)
+            return results
+        if pool is not None:
+            futures = [pool.submit(render_pdf_bytes, self.pdf_service.base_url, cert) for cert in certs]
+            return [future.exception() or future.result() for future in futures]
+        with ProcessPoolExecutor(max_workers=workers) as owned:
+            return self._render_pdfs(certs, owned)
+
+    def count_export(self, cohort: str, include_revoked: bool = False) -> int:
+        return self.store.count_certificates(**self._export_filters(cohort, include_revoked))
+
+    def export_cohort_zip(self, cohort: str, include_revoked: bool = False) -> Iterator[bytes]:
+        """Stream a ZIP of the cohort's certificate PDFs, one entry at a time.
+
+        Archived PDFs are copied straight from the artifact store, so memory
+        stays flat however large the cohort is and the first entry reaches the
+        client before later ones are looked up (or rendered on a cache miss).
+        """
+        sink = _StreamSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            for cert in self.iter_certificates(**self._export_filters(cohort, include_revoked)):
+                located = self.certificate_pdf(cert["id"])
+                if located is None:
+                    continue
+                path, _ = located
+                with path.open("rb") as source, archive.open(f"certificate-{cert['id']}.pdf", "w") as target:
+                    for chunk in iter(lambda: source.read(STREAM_CHUNK_SIZE), b""):
+                        target.write(chunk)
+                        if sink.pending() >= STREAM_CHUNK_SIZE:
+                            yield sink.drain()
+                if sink.pending():
+                    yield sink.drain()
+        yield sink.drain()
+
+    def export_cohort_pdf(self, cohort: str, include_revoked: bool = False) -> Iterator[bytes]:
+        """Stream the cohort as one multi-page PDF.
+
+        ReportLab only serialises a document on ``save()``, so the output is
+        spooled (in memory up to ``EXPORT_SPOOL_BYTES``, then on disk) and
+        streamed from there; pages share one copy of the static artwork.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as spool:
+            self.pdf_service.write_document(
+                self.iter_certificates(**self._export_filters(cohort, include_revoked)), spool
+            )
+            spool.seek(0)
+            yield from iter(lambda: spool.read(STREAM_CHUNK_SIZE), b"")
+
+    def iter_certificates(self, **filters) -> Iterator[Dict]:
+        """Walk matching certificates newest first, one index page at a time."""
+        before = None
+        while True:
+            items, before = self.store.page_certificates(settings.MAX_PAGE_SIZE, before, **filters)
+            yield from items
+            if before is None:
+                return
+
+    @staticmethod
+    def _export_filters(cohort: str, include_revoked: bool) -> Dict:
+        return {"cohort": cohort} if include_revoked else {"cohort": cohort, "revoked": False}
+
     def reject_request(self, request_id: str, reviewer: Optional[str] = None, reason: str | None = None) -> Optional[Dict]:
         request = self.store.get_request(request_id)
         if not request or request.get("status") != "pending":
@@ -139,24 +736,191 @@ class CertificateService:
         return self.store.save_request(request)
 
     def revoke(self, cert_id: str, reason: str) -> Dict | None:
-        cert = self.store.get_certificate(cert_id)
-        if not cert:
-            return None
-        cert["revoked"] = True
-        cert["revoked_at"] = utc_now_iso()
-        cert["revocation_reason"] = reason
-        self.store.save_certificate(cert)
+        stale_pdfs: List[str] = []
+
+        def mark_revoked(cert: Dict) -> Dict:
+            cert["revoked"] = True
+            cert["revoked_at"] = utc_now_iso()
+            cert["revocation_reason"] = reason
+            artifacts = cert.get("artifacts") or {}
+            artifacts.pop("pdf_fingerprint", None)
+            digest = artifacts.pop("pdf_sha256", None)
+            if digest:
+                stale_pdfs.append(digest)
+            return cert
+
+        cert = self.store.update_certificate(cert_id, mark_revoked)
+        self.verification_cache.invalidate(cert_id)
+        if cert:
+            self._publish([cert])
+            self._refresh_revocations()
+        for digest in stale_pdfs:
+            self.artifact_store.delete(digest)
         return cert
 
+    def _refresh_revocations(self) -> None:
+        """Regenerate the signed revocation list (queued when there is a job queue)."""
+        if self.revocation_list is None:
+            return
+        if self.job_queue is not None:
+            self.job_queue.enqueue("crl_publish", {})
+        else:
+            self.revocation_list.publish()
+
+    def _run_crl_job(self, job: Dict) -> None:
+        if self.revocation_list is not None:
+            self.revocation_list.publish()
+
     def verify(self, cert_id: str) -> Dict | None:
         cert = self.store.get_certificate(cert_id)
         if not cert:
             return None
         payload = canonical_payload(cert)
-        cert["signature_valid"] = self.signer.verify(payload, cert.get("signature", ""))
-        cert["ots_verification"] = self.ots_service.verify(cert_id)
+        # Neither check can change unless the signed fields, the signature or
+        # the proof file do, so memoize on exactly those.
+        key = (cert_id, payload, cert.get("signature"), cert.get("key_id"), self.ots_service.proof_mtime(cert_id))
+        result = self.verification_cache.get(key)
+        if result is None:
+            result = {
+                "signature_valid": self._check_signatures([cert])[0],
+                "ots_verification": self._stored_ots_status(cert) or self.ots_service.verify(cert_id, payload),
+            }
+            self.verification_cache.put(key, result)
+        cert["signature_valid"] = result["signature_valid"]
+        cert["ots_verification"] = dict(result["ots_verification"])
         return cert
 
-    def list_history(self) -> List[Dict]:
-        return sorted(self.store.list_certificates(), key=lambda c: c["issued_at"], reverse=True)
+    def cache_validators(self, cert_id: str) -> Optional[Dict]:
+        """ETag seed and Last-Modified for a certificate's verify page, API record and proof.
+
+        The tag hashes the stored record (signature, revocation state and every
+        other field a response shows) with the proof's SHA-256. It costs one
+        store read and a stat, so routes can answer conditional requests
+        before verifying or rendering anything.
+        """
+        cert = self.store.get_certificate(cert_id)
+        if not cert:
+            return None
+        proof_digest = self.ots_service.proof_digest(cert_id)
+        record = json.dumps(cert, sort_keys=True, separators=(",", ":"))
+        etag = hashlib.sha256(f"{record}|{proof_digest}".encode("utf-8")).hexdigest()
+        # ``updated_at`` moves on every store write (pins, status changes...), as the tag does.
+        fields = ("issued_at", "revoked_at", "ots_upgraded_at", "updated_at")
+        stamps = [parse_utc_iso(cert.get(field)) for field in fields]
+        proof_mtime = self.ots_service.proof_mtime(cert_id)
+        proof_modified = None
+        if proof_mtime is not None:
+            proof_modified = dt.datetime.fromtimestamp(proof_mtime // 1_000_000_000, dt.timezone.utc)
+            stamps.append(proof_modified)
+        return {
+            "etag": etag,
+            "last_modified": max((stamp for stamp in stamps if stamp), default=None),
+            "proof_digest": proof_digest,
+            "proof_modified": proof_modified,
+            "proof_confirmed": cert.get("ots_status") == "confirmed",
+        }
+
+    @staticmethod
+    def _stored_ots_status(cert: Dict) -> Optional[Dict]:
+        """Attestation result recorded by ``upgrade_proofs``, if any."""
+        if cert.get("ots_status") == "confirmed":
+            return {
+                "status": "verified",
+                "block_height": cert.get("ots_block_height"),
+                "block_time": cert.get("ots_block_time"),
+            }
+        if cert.get("ots_status") == "invalid":
+            return {"status": "invalid", "error": cert.get("ots_error")}
+        return None
+
+    def verify_batch(self, items: List[str | Dict]) -> List[Dict]:
+        """Verify many certificates given as ids or presented public payloads.
+
+        All records come from one store read and the Ed25519 checks run as one
+        batch. A presented payload is checked against its own signature and
+        must also match the stored record. OpenTimestamps proofs are not
+        re-verified here; the stored ``ots_status`` is reported instead.
+        """
+        ids = [item if isinstance(item, str) else str(item.get("id") or "") for item in items]
+        stored = self.store.get_certificates(ids)
+        presented: List[Optional[Dict]] = []
+        for item, cert_id in zip(items, ids):
+            if isinstance(item, dict):
+                fields = CANONICAL_FIELDS + ("signature", "signature_scheme")
+                cert = {field: item[field] if isinstance(item.get(field), str) else "" for field in fields}
+                # Payloads from before the keyring carry no key id and are checked against every key.
+                cert["key_id"] = item["key_id"] if isinstance(item.get("key_id"), str) else None
+                if isinstance(item.get("merkle"), dict):
+                    cert["merkle"] = item["merkle"]
+                presented.append(cert)
+            else:
+                presented.append(stored.get(cert_id))
+        signatures_valid = iter(self._check_signatures([cert for cert in presented if cert]))
+
+        results: List[Dict] = []
+        for item, cert_id, cert in zip(items, ids, presented):
+            record = stored.get(cert_id)
+            result: Dict = {"id": cert_id, "found": record is not None}
+            if cert:
+                result["signature_valid"] = next(signatures_valid)
+            if record:
+                result["revoked"] = bool(record.get("revoked"))
+                result["ots_status"] = record.get("ots_status")
+            if isinstance(item, dict) and record:
+                result["matches_record"] = canonical_payload(record) == canonical_payload(cert) and record.get(
+                    "signature"
+                ) == cert["signature"]
+            if not record:
+                result["status"] = "not_found"
+            elif not result["signature_valid"] or result.get("matches_record") is False:
+                result["status"] = "invalid"
+            elif result["revoked"]:
+                result["status"] = "revoked"
+            else:
+                result["status"] = "valid"
+            results.append(result)
+        return results
+
+    def stats(self) -> Dict:
+        return self.store.stats_snapshot()
+
+    def list_history(self, limit: Optional[int] = None) -> List[Dict]:
+        return self.store.query_certificates(limit=limit)
+
+    def list_history_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        cohort: Optional[str] = None,
+        revoked: Optional[bool] = None,
+    ) -> Dict:
+        """Newest-first certificates after ``cursor``; pass ``next_cursor`` back for the next page."""
+        filters = {"cohort": cohort or None, "revoked": revoked}
+        items, next_before = self.store.page_certificates(
+            self._page_size(limit),
+            decode_cursor(cursor),
+            **{key: value for key, value in filters.items() if value is not None},
+        )
+        return {"items": items, "next_cursor": encode_cursor(next_before) if next_before else None}
+
+    def list_requests_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        status: Optional[str] = None,
+        cohort: Optional[str] = None,
+    ) -> Dict:
+        filters = {"status": status or None, "cohort": cohort or None}
+        items, next_before = self.store.page_requests(
+            self._page_size(limit),
+            decode_cursor(cursor),
+            **{key: value for key, value in filters.items() if value is not None},
+        )
+        return {"items": items, "next_cursor": encode_cursor(next_before) if next_before else None}
+
+    @staticmethod
+    def _page_size(limit: Optional[int]) -> int:
+        if not limit or limit < 1:
+            return settings.PAGE_SIZE
+        return min(limit, settings.MAX_PAGE_SIZE)
 
@@ -1,48 +1,122 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from backend.app.config import settings
+from backend.app.services.public_store import PublicPayloadStore
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class IPFSPinError(RuntimeError):
+    """A pin request failed after all retries (or was rejected outright)."""
 
 
 class IPFSService:
-    def __init__(self, public_dir: Path = settings.PUBLIC_PAYLOAD_DIR):
-        self.public_dir = public_dir
-        self.public_dir.mkdir(parents=True, exist_ok=True)
-        self.api_url = settings.IPFS_API_URL
+    """Publishes public payloads to the local ``PublicPayloadStore`` and pins them through a Pinata-style API.
+
+    Requests share one pooled ``requests.Session`` and at most
+    ``IPFS_MAX_CONCURRENCY`` run at once. Transient failures (connection
+    errors, timeouts, 429/5xx) are retried with exponential backoff; a pin
+    that still fails raises ``IPFSPinError`` so the job queue can retry it
+    later. ``pin_many`` pins several payloads as one directory in one call.
+    """
+
+    def __init__(
+        self,
+        public_dir: Path = settings.PUBLIC_PAYLOAD_DIR,
+        api_url: Optional[str] = settings.IPFS_API_URL,
+        batch_api_url: Optional[str] = settings.IPFS_BATCH_API_URL,
+        max_concurrency: int = settings.IPFS_MAX_CONCURRENCY,
+    ):
+        self.public_store = PublicPayloadStore(public_dir)
+        self.api_url = api_url
+        self.batch_api_url = batch_api_url
         self.api_key = settings.IPFS_API_KEY
         self.api_secret = settings.IPFS_API_SECRET
+        self.gateway_url = settings.IPFS_GATEWAY_URL.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if self.api_key:
+            self.session.headers["pinata_api_key"] = self.api_key
+        if self.api_secret:
+            self.session.headers["pinata_secret_api_key"] = self.api_secret
+
+    def publish(self, payloads: Dict[str, Dict]) -> Dict[str, str]:
+        """Write payloads to the local public store only (no-op for unchanged ones)."""
+        return self.public_store.publish(payloads)
 
     def pin_json(self, cert_id: str, payload: Dict) -> Optional[str]:
-        local_path = self.public_dir / f"{cert_id}.json"
-        local_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        """Publish ``payload`` locally and pin it; ``None`` when no pinning API is configured."""
+        return self.pin_many({cert_id: payload})[cert_id]
 
+    def pin_many(self, payloads: Dict[str, Dict], name: str = "certificates") -> Dict[str, Optional[str]]:
+        """Publish and pin several payloads; with a batch endpoint they go up as one directory."""
+        self.publish(payloads)
         if not self.api_url:
-            return None
+            return dict.fromkeys(payloads)
+        if len(payloads) <= 1:
+            return {cert_id: self._pin_one(cert_id, payload) for cert_id, payload in payloads.items()}
+        if not self.batch_api_url:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(payloads))) as pool:
+                return dict(zip(payloads, pool.map(self._pin_one, payloads, payloads.values())))
+        files = [
+            ("file", (f"certificates/{cert_id}.json", PublicPayloadStore.encode(payload), "application/json"))
+            for cert_id, payload in payloads.items()
+        ]
+        data = self._post(
+            self.batch_api_url,
+            files=files,
+            data={"pinataMetadata": json.dumps({"name": name})},
+        )
+        cid = self._cid(data)
+        return {cert_id: f"{self.gateway_url}/{cid}/{cert_id}.json" for cert_id in payloads}
 
-        headers = {}
-        if self.api_key:
-            headers["pinata_api_key"] = self.api_key
-        if self.api_secret:
-            headers["pinata_secret_api_key"] = self.api_secret
-
-        try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json={"pinataContent": payload},
-                timeout=10,
-            )
-            response.raise_for_status()
-            data = response.json()
-            cid = data.get("IpfsHash") or data.get("cid")
-            if cid:
-                return f"https://ipfs.io/ipfs/{cid}"
-        except Exception:
-            return None
-        return None
+    def _pin_one(self, cert_id: str, payload: Dict) -> str:
+        data = self._post(self.api_url, json={"pinataContent": payload, "pinataMetadata": {"name": cert_id}})
+        return f"{self.gateway_url}/{self._cid(data)}"
+
+    def _post(self, url: str, **kwargs) -> Dict:
+        """POST with bounded concurrency, retrying transient failures with exponential backoff."""
+        delay = settings.IPFS_BACKOFF_SECONDS
+        for attempt in range(settings.IPFS_RETRIES + 1):
+            final = attempt == settings.IPFS_RETRIES
+            try:
+                with self._slots:
+                    response = self.session.post(url, timeout=settings.IPFS_TIMEOUT, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if final:
+                    raise IPFSPinError(f"IPFS pin failed: {exc}") from exc
+            else:
+                if response.ok:
+                    try:
+                        return response.json()
+                    except ValueError as exc:
+                        raise IPFSPinError("IPFS pin returned a non-JSON response") from exc
+                if final or response.status_code not in RETRY_STATUSES:
+                    raise IPFSPinError(f"IPFS pin failed: HTTP {response.status_code} {response.text[:200]}")
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            time.sleep(delay)
+            delay *= 2
+        raise IPFSPinError("IPFS pin failed")  # pragma: no cover
 
+    @staticmethod
+    def _cid(data: Dict) -> str:
+        cid = data.get("IpfsHash") or data.get("cid")
+        if not cid:
+            raise IPFSPinError("IPFS pin response did not include a CID")
+        return cid
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict], None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL,
+    locked_by TEXT,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+"""
+
+
+class JobQueue:
+    """Durable SQLite-backed queue for issuance side-effects.
+
+    Jobs survive restarts and are claimed with ``BEGIN IMMEDIATE`` so several
+    worker threads (and several gunicorn processes) can share one database.
+    A failing handler is retried with exponential backoff until
+    ``max_attempts``; a worker that dies mid-job releases it once its lease
+    expires. Finished jobs are deleted after ``retention_seconds`` by a sweep
+    the workers run every ``prune_interval`` seconds (or ``prune``).
+    """
+
+    def __init__(
+        self,
+        db_path: Path = settings.JOB_QUEUE_PATH,
+        workers: int = settings.JOB_WORKERS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+        backoff_seconds: float = settings.JOB_BACKOFF_SECONDS,
+        poll_interval: float = 0.5,
+        lease_seconds: float = 300.0,
+        retention_seconds: float = settings.JOB_RETENTION_SECONDS,
+        prune_interval: float = settings.JOB_PRUNE_INTERVAL,
+    ):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._handlers: Dict[str, JobHandler] = {}
+        self._local = threading.local()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind: str, payload: Dict, delay: float = 0.0) -> int:
+        return self.enqueue_many([(kind, payload)], delay)[0]
+
+    def enqueue_many(self, jobs: Iterable[Tuple[str, Dict]], delay: float = 0.0) -> List[int]:
+        now = time.time()
+        conn = self._connect()
+        ids: List[int] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, payload in jobs:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (kind, payload, run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, json.dumps(payload), now + delay, now, now),
+                )
+                ids.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._wake.set()
+        return ids
+
+    def _claim(self, worker_id: str) -> Optional[sqlite3.Row]:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT * FROM jobs
+                WHERE (status = 'queued' AND run_after <= ?)
+                   OR (status = 'running' AND locked_until < ?)
+                ORDER BY run_after, id LIMIT 1
+                """,
+                (now, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?, "
+                    "locked_until = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _finish(self, row: sqlite3.Row, error: Optional[str]) -> None:
+        now = time.time()
+        attempts = row["attempts"] + 1
+        if error is None:
+            status, run_after = "done", row["run_after"]
+        elif attempts >= self.max_attempts:
+            status, run_after = "failed", row["run_after"]
+        else:
+            status, run_after = "queued", now + self.backoff_seconds * (2 ** (attempts - 1))
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, locked_by = NULL, "
+            "locked_until = NULL, updated_at = ? WHERE id = ?",
+            (status, run_after, error, now, row["id"]),
+        )
+
+    def run_one(self, worker_id: Optional[str] = None) -> bool:
+        """Claim and run one ready job; returns ``False`` when none is ready."""
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        row = self._claim(worker_id)
+        if row is None:
+            return False
+        handler = self._handlers.get(row["kind"])
+        error: Optional[str] = None
+        if handler is None:
+            error = f"No handler registered for job kind {row['kind']!r}"
+        else:
+            payload = json.loads(row["payload"])
+            payload["_attempt"] = row["attempts"] + 1
+            payload["_final_attempt"] = row["attempts"] + 1 >= self.max_attempts
+            try:
+                handler(payload)
+            except Exception as exc:
+                logger.warning("Job %s (%s) failed: %s", row["id"], row["kind"], exc)
+                error = str(exc) or exc.__class__.__name__
+        self._finish(row, error)
+        return True
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """Run ready jobs in the calling thread (CLI/maintenance use)."""
+        processed = 0
+        while (limit is None or processed < limit) and self.run_one():
+            processed += 1
+        return processed
+
+    def prune(self, older_than: Optional[float] = None) -> int:
+        """Delete ``done`` jobs last updated more than ``older_than`` seconds ago; returns how many."""
+        cutoff = time.time() - (self.retention_seconds if older_than is None else older_than)
+        cursor = self._connect().execute("DELETE FROM jobs WHERE status = 'done' AND updated_at < ?", (cutoff,))
+        return cursor.rowcount
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_one():
+                    continue
+                if time.time() >= self._next_prune:
+                    # Shared by all threads; a duplicate sweep just deletes nothing.
+                    self._next_prune = time.time() + self.prune_interval
+                    self.prune()
+            except sqlite3.Error as exc:  # pragma: no cover - transient lock contention
+                logger.warning("Job queue error: %s", exc)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
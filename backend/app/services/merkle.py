@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.app.utils import canonical_payload
+
+SCHEME = "merkle-ed25519"
+
+
+def leaf_hash(payload: str) -> bytes:
+    """Leaf for a canonical payload (0x00-prefixed, as in RFC 6962, so leaves never pass for nodes)."""
+    return hashlib.sha256(b"\x00" + payload.encode("utf-8")).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def build(leaves: List[bytes]) -> Tuple[bytes, List[List[bytes]]]:
+    """Root of ``leaves`` and each leaf's audit path (sibling hashes, bottom up).
+
+    Pairs are hashed level by level; an odd last node moves up unchanged,
+    which yields the same tree shape as RFC 6962.
+    """
+    if not leaves:
+        raise ValueError("cannot build a Merkle tree without leaves")
+    level = list(leaves)
+    positions = list(range(len(leaves)))
+    paths: List[List[bytes]] = [[] for _ in leaves]
+    while len(level) > 1:
+        for leaf, position in enumerate(positions):
+            sibling = position ^ 1
+            if sibling < len(level):
+                paths[leaf].append(level[sibling])
+            positions[leaf] = position // 2
+        level = [
+            _node(level[index], level[index + 1]) if index + 1 < len(level) else level[index]
+            for index in range(0, len(level), 2)
+        ]
+    return level[0], paths
+
+
+def root_from_path(leaf: bytes, index: int, size: int, path: List[bytes]) -> Optional[bytes]:
+    """Fold an audit path back up to the root; ``None`` if it does not fit a tree of ``size``."""
+    if not 0 <= index < size:
+        return None
+    node, remaining = leaf, list(path)
+    while size > 1:
+        if index ^ 1 < size:
+            if not remaining:
+                return None
+            sibling = remaining.pop(0)
+            node = _node(sibling, node) if index & 1 else _node(node, sibling)
+        index, size = index // 2, (size + 1) // 2
+    return None if remaining else node
+
+
+def root_message(batch_id: str, size: int, root_hex: str) -> str:
+    """The string whose Ed25519 signature vouches for a batch root."""
+    return f"{SCHEME}|{batch_id}|{size}|{root_hex}"
+
+
+def inclusion_proof(batch_id: str, root: bytes, index: int, size: int, path: List[bytes]) -> Dict:
+    """The ``merkle`` field stored on a certificate."""
+    return {"batch": batch_id, "root": root.hex(), "index": index, "size": size, "path": [item.hex() for item in path]}
+
+
+def proof_root(cert: Dict) -> Optional[Tuple[str, str]]:
+    """``(signed message, root signature)`` for a Merkle-signed record, or ``None`` if its path is wrong."""
+    proof = cert.get("merkle")
+    try:
+        root = root_from_path(
+            leaf_hash(canonical_payload(cert)),
+            int(proof["index"]),
+            int(proof["size"]),
+            [bytes.fromhex(item) for item in proof["path"]],
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    if root is None or root.hex() != proof.get("root"):
+        return None
+    return root_message(str(proof["batch"]), int(proof["size"]), proof["root"]), cert.get("signature") or ""
+
+
+def verify_manifest(manifest: Dict, verify_signature: Callable[[str, str, Optional[str]], bool]) -> bool:
+    """Check a whole signed batch offline: rebuild the root from its leaves and check the one signature."""
+    leaves = manifest.get("leaves") or []
+    if not leaves or len(leaves) != manifest.get("size"):
+        return False
+    root, _ = build([leaf_hash(canonical_payload(leaf)) for leaf in leaves])
+    if root.hex() != manifest.get("root"):
+        return False
+    message = root_message(manifest["batch"], len(leaves), root.hex())
+    return verify_signature(message, manifest.get("signature") or "", manifest.get("key_id"))
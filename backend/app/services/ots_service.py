@@ -1,57 +1,263 @@
 from __future__ import annotations
 
+import datetime as dt
+import fnmatch
 import hashlib
+import os
 from pathlib import Path
-from typing import Dict
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
 
 from backend.app.config import settings
+from backend.app.services.storage_backends import FileSignature, atomic_write_bytes, file_signature
 
 try:
-    from opentimestamps.client import Client
-    from opentimestamps.core.op import OpSHA256
-    from opentimestamps.core.timestamp import DetachedTimestampFile
+    from opentimestamps.calendar import RemoteCalendar
+    from opentimestamps.core.notary import BitcoinBlockHeaderAttestation, PendingAttestation, VerificationError
+    from opentimestamps.core.op import OpAppend, OpSHA256
+    from opentimestamps.core.serialize import BytesDeserializationContext, BytesSerializationContext
+    from opentimestamps.core.timestamp import DetachedTimestampFile, Timestamp, make_merkle_tree
 
     OTS_AVAILABLE = True
 except Exception:  # pragma: no cover
     OTS_AVAILABLE = False
 
+CalendarFactory = Callable[[str], object]
+
+
+class BlockHeaders:
+    """Bitcoin block headers by height from an Esplora-style API (e.g. blockstream.info/api)."""
+
+    def __init__(self, base_url: str, timeout: float = settings.OTS_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._cache: Dict[int, SimpleNamespace] = {}
+
+    def header(self, height: int) -> SimpleNamespace:
+        """``hashMerkleRoot`` (internal byte order) and ``nTime`` of the block at ``height``."""
+        if height not in self._cache:
+            response = requests.get(f"{self.base_url}/block-height/{height}", timeout=self.timeout)
+            response.raise_for_status()
+            response = requests.get(f"{self.base_url}/block/{response.text.strip()}", timeout=self.timeout)
+            response.raise_for_status()
+            block = response.json()
+            self._cache[height] = SimpleNamespace(
+                hashMerkleRoot=bytes.fromhex(block["merkle_root"])[::-1], nTime=int(block["timestamp"])
+            )
+        return self._cache[height]
+
 
 class OpenTimestampsService:
-    def __init__(self, proofs_dir: Path = settings.PROOF_DIR):
+    """Stamps canonical payload digests and keeps one detached ``.ots`` proof per certificate.
+
+    ``stamp_many`` aggregates a batch of digests into a local Merkle tree and
+    submits only the root to each calendar, so a cohort costs one round trip
+    per calendar. Each certificate's proof is then its leaf's path up to the
+    root followed by the calendar's commitment.
+    """
+
+    def __init__(
+        self,
+        proofs_dir: Path = settings.PROOF_DIR,
+        calendar_urls: Optional[List[str]] = None,
+        calendar_factory: Optional[CalendarFactory] = None,
+        timeout: float = settings.OTS_TIMEOUT,
+        block_headers: Optional[BlockHeaders] = None,
+    ):
         self.proofs_dir = proofs_dir
         self.proofs_dir.mkdir(parents=True, exist_ok=True)
         self.enabled = settings.OTS_ENABLED and OTS_AVAILABLE
-        self.client = Client() if self.enabled else None
+        self.calendar_urls = list(calendar_urls or settings.OTS_CALENDAR_URLS)
+        self.timeout = timeout
+        self._factory = calendar_factory or (RemoteCalendar if OTS_AVAILABLE else None)
+        self.calendars = [self._factory(url) for url in self.calendar_urls] if self.enabled else []
+        self._upgrade_calendars: Dict[str, object] = {}
+        if block_headers is None and settings.OTS_BLOCK_EXPLORER_URL:
+            block_headers = BlockHeaders(settings.OTS_BLOCK_EXPLORER_URL, timeout)
+        self.block_headers = block_headers
+        self._digests: Dict[str, Tuple[FileSignature, str]] = {}
+
+    def proof_path(self, cert_id: str) -> Path:
+        return self.proofs_dir / f"{cert_id}.ots"
+
+    def proof_mtime(self, cert_id: str) -> Optional[int]:
+        """Modification time of the stored proof (ns), or ``None`` if there is none."""
+        try:
+            return self.proof_path(cert_id).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def proof_digest(self, cert_id: str) -> Optional[str]:
+        """SHA-256 of the stored proof, re-hashed only when the file changed; ``None`` if there is none."""
+        path = self.proof_path(cert_id)
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        cached = self._digests.get(cert_id)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if len(self._digests) >= settings.VERIFY_CACHE_SIZE:
+            self._digests.clear()
+        self._digests[cert_id] = (signature, digest)
+        return digest
 
     def stamp(self, cert_id: str, payload: str) -> Dict[str, str]:
-        proof_path = self.proofs_dir / f"{cert_id}.ots"
+        return self.stamp_many({cert_id: payload})[cert_id]
 
+    def stamp_many(self, payloads: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """Stamp a batch of ``{cert_id: payload}`` with one calendar submission per calendar."""
+        if not payloads:
+            return {}
         if not self.enabled:
-            proof_path.write_text("OTS disabled for this deployment.")
-            return {"status": "disabled", "proof_path": str(proof_path)}
+            results = {}
+            for cert_id in payloads:
+                proof_path = self.proof_path(cert_id)
+                proof_path.write_text("OTS disabled for this deployment.")
+                results[cert_id] = {"status": "disabled", "proof_path": str(proof_path)}
+            return results
 
-        digest = hashlib.sha256(payload.encode("utf-8")).digest()
-        detached = DetachedTimestampFile.from_hash(OpSHA256(), digest)
+        detached: Dict[str, DetachedTimestampFile] = {}
+        leaves = []
+        for cert_id, payload in payloads.items():
+            digest = hashlib.sha256(payload.encode("utf-8")).digest()
+            detached[cert_id] = DetachedTimestampFile(OpSHA256(), Timestamp(digest))
+            # A per-leaf nonce keeps sibling digests from being revealed by a proof.
+            nonced = detached[cert_id].timestamp.ops.add(OpAppend(os.urandom(16)))
+            leaves.append(nonced.ops.add(OpSHA256()))
+        root = make_merkle_tree(leaves)
+
+        errors: List[str] = []
+        for url, calendar in zip(self.calendar_urls, self.calendars):
+            try:
+                root.merge(calendar.submit(root.msg, timeout=self.timeout))
+            except Exception as exc:
+                errors.append(f"{url}: {exc}")
+        if len(errors) == len(self.calendars):
+            error = "; ".join(errors) or "no OpenTimestamps calendars configured"
+            return {
+                cert_id: {"status": "error", "proof_path": str(self.proof_path(cert_id)), "error": error}
+                for cert_id in payloads
+            }
+
+        results = {}
+        for cert_id, proof in detached.items():
+            proof_path = self.proof_path(cert_id)
+            context = BytesSerializationContext()
+            proof.serialize(context)
+            atomic_write_bytes(proof_path, context.getbytes())
+            results[cert_id] = {"status": "stamped", "proof_path": str(proof_path)}
+        return results
+
+    def load(self, cert_id: str) -> Optional[DetachedTimestampFile]:
+        """Parse the stored proof; ``None`` when it is missing or not a proof."""
         try:
-            self.client.stamp(detached)
-            with proof_path.open("wb") as handle:
-                detached.serialize(handle)
-            return {"status": "stamped", "proof_path": str(proof_path)}
-        except Exception as exc:  # pragma: no cover
-            proof_path.write_text(f"OTS stamp failed: {exc}")
-            return {"status": "error", "proof_path": str(proof_path), "error": str(exc)}
-
-    def verify(self, cert_id: str) -> Dict[str, str]:
-        proof_path = self.proofs_dir / f"{cert_id}.ots"
+            data = self.proof_path(cert_id).read_bytes()
+            return DetachedTimestampFile.deserialize(BytesDeserializationContext(data))
+        except Exception:
+            return None
+
+    def verify(self, cert_id: str, payload: Optional[str] = None) -> Dict[str, str]:
+        """Inspect the stored proof without touching the network.
+
+        With ``payload`` the proof must also commit to its SHA-256 digest.
+        """
+        proof_path = self.proof_path(cert_id)
         if not proof_path.exists():
             return {"status": "missing"}
         if not self.enabled:
             return {"status": "disabled"}
+        detached = self.load(cert_id)
+        if detached is None:
+            return {"status": "unverified", "error": "Proof file could not be parsed."}
+        if payload is not None and detached.file_digest != hashlib.sha256(payload.encode("utf-8")).digest():
+            return {"status": "unverified", "error": "Proof does not commit to this certificate."}
+        attestations = [attestation for _, attestation in detached.timestamp.all_attestations()]
+        heights = [a.height for a in attestations if isinstance(a, BitcoinBlockHeaderAttestation)]
+        if heights:
+            # Confirmed against a block header only once the upgrader has run.
+            return {"status": "anchored", "result": f"Bitcoin block {min(heights)}"}
+        calendars = sorted({a.uri for a in attestations if isinstance(a, PendingAttestation)})
+        return {"status": "pending", "result": ", ".join(calendars)}
+
+    def upgrade_many(self, cert_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch Bitcoin attestations for pending proofs and check them against block headers.
+
+        Each pending calendar commitment is requested once, so a Merkle batch
+        costs one request per calendar. Changed proofs are rewritten
+        atomically. Results are ``pending``, ``confirmed`` (with
+        ``block_height``/``block_time``), ``invalid`` or ``error``.
+        """
+        if not self.enabled:
+            return {cert_id: {"status": "error", "error": "OTS disabled"} for cert_id in cert_ids}
+        fetched: Dict[Tuple[str, bytes], Optional[Timestamp]] = {}
+        results: Dict[str, Dict] = {}
+        for cert_id in cert_ids:
+            detached = self.load(cert_id)
+            if detached is None:
+                results[cert_id] = {"status": "error", "error": "Proof file missing or unreadable."}
+                continue
+            changed = False
+            for node, attestation in list(self._pending(detached.timestamp)):
+                key = (attestation.uri, node.msg)
+                if key not in fetched:
+                    fetched[key] = self._fetch_upgrade(attestation.uri, node.msg)
+                upgraded = fetched[key]
+                if upgraded is None:
+                    continue
+                node.merge(upgraded)
+                if any(isinstance(a, BitcoinBlockHeaderAttestation) for _, a in upgraded.all_attestations()):
+                    # The calendar is done with this commitment.
+                    node.attestations.discard(attestation)
+                changed = True
+            if changed:
+                context = BytesSerializationContext()
+                detached.serialize(context)
+                atomic_write_bytes(self.proof_path(cert_id), context.getbytes())
+            results[cert_id] = self._confirm(detached)
+        return results
+
+    @staticmethod
+    def _pending(timestamp: Timestamp) -> Iterator[Tuple[Timestamp, PendingAttestation]]:
+        for attestation in timestamp.attestations:
+            if isinstance(attestation, PendingAttestation):
+                yield timestamp, attestation
+        for child in timestamp.ops.values():
+            yield from OpenTimestampsService._pending(child)
+
+    def _fetch_upgrade(self, uri: str, commitment: bytes) -> Optional[Timestamp]:
+        """The calendar's current timestamp for ``commitment``; ``None`` if not (yet) available."""
+        url = uri.rstrip("/")
+        allowed = [calendar.rstrip("/") for calendar in self.calendar_urls] + settings.OTS_UPGRADE_WHITELIST
+        if urlsplit(url).path or not any(fnmatch.fnmatchcase(url, pattern) for pattern in allowed):
+            return None
+        if url not in self._upgrade_calendars:
+            self._upgrade_calendars[url] = self._factory(url + "/")
         try:
-            with proof_path.open("rb") as handle:
-                detached = DetachedTimestampFile.deserialize(handle)
-            result = self.client.verify(detached)
-            return {"status": "verified", "result": str(result)}
-        except Exception as exc:  # pragma: no cover
-            return {"status": "unverified", "error": str(exc)}
+            return self._upgrade_calendars[url].get_timestamp(commitment, timeout=self.timeout)
+        except Exception:
+            return None
 
+    def _confirm(self, detached: DetachedTimestampFile) -> Dict:
+        attested = [
+            (msg, attestation)
+            for msg, attestation in detached.timestamp.all_attestations()
+            if isinstance(attestation, BitcoinBlockHeaderAttestation)
+        ]
+        if not attested:
+            return {"status": "pending"}
+        msg, attestation = min(attested, key=lambda item: item[1].height)
+        result = {"status": "confirmed", "block_height": attestation.height, "block_time": None}
+        if self.block_headers is None:
+            return result
+        try:
+            block_time = attestation.verify_against_blockheader(msg, self.block_headers.header(attestation.height))
+        except VerificationError as exc:
+            return {"status": "invalid", "block_height": attestation.height, "error": str(exc)}
+        except Exception as exc:
+            return {"status": "pending", "error": f"Block header lookup failed: {exc}"}
+        result["block_time"] = dt.datetime.utcfromtimestamp(block_time).isoformat() + "Z"
+        return result
@@ -3,9 +3,13 @@
 # No hard-coded personal names are included — signature labels are placeholders.
 # Uses the uploaded mockup image (if present) at /mnt/data/6c499ec9-fab1-4f61-8cc5-ed990388bba9.png for reference/watermark.
 
+import hashlib
+import json
+from functools import lru_cache
+from itertools import groupby
 from io import BytesIO
-from typing import Dict, List, Optional
-from reportlab.lib.colors import HexColor
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+from reportlab.lib.colors import HexColor, black, white
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
@@ -13,10 +17,41 @@ import qrcode
 import os
 
 MOCKUP_IMAGE_PATH = "/mnt/data/6c499ec9-fab1-4f61-8cc5-ed990388bba9.png"
+# Certificate fields that change the rendered PDF; bump TEMPLATE_VERSION when the layout changes.
+RENDERED_FIELDS = ("id", "name", "cohort", "issued_at", "body", "revoked")
+TEMPLATE_VERSION = 1
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 36
+RECIPIENT_Y = PAGE_SIZE[1] - MARGIN - 120 - 46 - 32
+QR_SIZE = 70
+DEFAULT_BODY = (
+    "In recognition of outstanding performance within the Dada Devs community. "
+    "You have demonstrated collaboration, creativity, and impact across the Lightning and Web3 ecosystem."
+)
+LAYER_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=1)
+def _mockup_image() -> Optional[ImageReader]:
+    """Check for and decode the optional watermark once per process."""
+    if not os.path.exists(MOCKUP_IMAGE_PATH):
+        return None
+    try:
+        return ImageReader(MOCKUP_IMAGE_PATH)
+    except Exception:
+        return None
+
 
 class PDFService:
-    def __init__(self, base_url: str = "https://example.com") -> None:
+    def __init__(self, base_url: str = "https://example.com", use_template: bool = True) -> None:
         self.base_url = base_url
+        # Draw the static artwork once per document and body/signatory
+        # combination as a form XObject that every page places (a saving in
+        # multi-page documents only); False redraws it on every page.
+        self.use_template = use_template
+        # (body, signatories) -> (form name, y of the cohort line)
+        self._layers: Dict[Tuple, Tuple[str, float]] = {}
         # Palette tuned to match the mockup image colors
         self.deep_red = HexColor("#9B1C28")
         self.maroon = HexColor("#7A0C15")
@@ -29,6 +64,13 @@ class PDFService:
         self.paper = HexColor("#FFFCF7")
         self.border_muted = HexColor("#E8E3DA")
 
+    def fingerprint(self, cert: Dict) -> str:
+        """Hash of everything that affects the rendered PDF for ``cert``."""
+        material = {field: cert.get(field) for field in RENDERED_FIELDS}
+        material["_base_url"] = self.base_url
+        material["_template"] = TEMPLATE_VERSION
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
     def generate_pdf(self, cert: Dict, left_signatory: Optional[str] = None, left_title: Optional[str] = None, right_signatory: Optional[str] = None, right_title: Optional[str] = None) -> BytesIO:
         """Generate a certificate PDF.
 
@@ -36,24 +78,156 @@ class PDFService:
         signatory and title fields are optional and default to empty placeholders.
         """
         buffer = BytesIO()
-        width, height = landscape(A4)
-        c = canvas.Canvas(buffer, pagesize=(width, height))
+        c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+        self.draw_certificate(c, cert, left_signatory, left_title, right_signatory, right_title)
+        c.showPage()
+        c.save()
+        buffer.seek(0)
+        return buffer
+
+    def write_document(self, certs: Iterable[Dict], fileobj: BinaryIO) -> int:
+        """Write ``certs`` to ``fileobj`` as one PDF with a page per certificate.
+
+        All pages share a single copy of the static artwork; this is the only
+        path where the form saves work, since ``generate_pdf`` documents hold
+        one page each. Returns the page count.
+        """
+        c = canvas.Canvas(fileobj, pagesize=PAGE_SIZE)
+        pages = 0
+        for cert in certs:
+            self.draw_certificate(c, cert)
+            c.showPage()
+            pages += 1
+        c.save()
+        return pages
+
+    def draw_certificate(self, c: canvas.Canvas, cert: Dict, left_signatory: Optional[str] = None, left_title: Optional[str] = None, right_signatory: Optional[str] = None, right_title: Optional[str] = None) -> None:
+        """Draw one certificate onto the current page of ``c``.
+
+        The shared artwork is a form XObject drawn once per document, so each
+        further page only adds the recipient, cohort/date line and QR.
+        """
+        width, height = PAGE_SIZE
+        margin = MARGIN
+        body = cert.get("body", DEFAULT_BODY)
+        signatories = (
+            left_signatory,
+            left_title,
+            right_signatory or "DADA DEVS COUNCIL",
+            right_title or "Program Leadership",
+        )
+        self._draw_watermark(c)
+        if self.use_template:
+            cursor_y = self._place_layer(c, body, signatories)
+        else:
+            cursor_y = self._draw_static(c, body, signatories)
+
+        c.setFillColor(self.charcoal)
+        c.setFont("Helvetica-Bold", 30)
+        recipient = cert.get("name", " ").strip().upper()
+        if recipient:
+            c.drawCentredString(width / 2, RECIPIENT_Y, recipient)
+        else:
+            line_w = 420
+            c.setStrokeColor(self.deep_red)
+            c.setLineWidth(1.2)
+            c.line(width / 2 - line_w / 2, RECIPIENT_Y - 6, width / 2 + line_w / 2, RECIPIENT_Y - 6)
+
+        cohort = cert.get("cohort", "-")
+        issued_at = cert.get("issued_at", "-") or "-"
+        issued_short = issued_at[:10] if isinstance(issued_at, str) and len(issued_at) >= 10 else issued_at
+        c.setFont("Helvetica-Bold", 11)
+        c.setFillColor(self.deep_red)
+        c.drawCentredString(width / 2, cursor_y, f"Cohort: {cohort}   •   Issued: {issued_short}")
+
+        # QR (bottom-right, minimal); its frame is part of the static layer
+        verify_url = f"{self.base_url}/verify/{cert.get('id','') if cert.get('id') else ''}"
+        qr_right = width - margin - 40
+        qr_bottom = margin + 20
+        self._draw_qr(c, verify_url, qr_right - QR_SIZE, qr_bottom, QR_SIZE)
 
+        if cert.get("revoked"):
+            c.saveState()
+            c.setFillColor(self.deep_red)
+            c.setFillAlpha(0.25)
+            c.setFont("Helvetica-Bold", 110)
+            c.translate(width / 2, height / 2)
+            c.rotate(25)
+            c.drawCentredString(0, -40, "REVOKED")
+            c.restoreState()
+
+    @staticmethod
+    def _draw_qr(c: canvas.Canvas, data: str, x: float, y: float, size: float) -> None:
+        """Draw ``data`` as a QR code built from vector rectangles.
+
+        Each run of dark modules in a row becomes one rectangle of a single
+        filled path, so no bitmap is rasterised, PNG-encoded or decoded.
+        """
+        qr = qrcode.QRCode(border=1)
+        qr.add_data(data)
+        qr.make()
+        matrix = qr.get_matrix()
+        c.saveState()
+        c.setFillColor(white)
+        c.rect(x, y, size, size, fill=1, stroke=0)
+        # One unit per module with rows counting downwards keeps every
+        # coordinate a small integer, so the path is emitted as-is.
+        c.translate(x, y + size)
+        c.scale(size / len(matrix), -size / len(matrix))
+        rects = []
+        for row_index, row in enumerate(matrix):
+            column = 0
+            for dark, run in groupby(row):
+                length = len(tuple(run))
+                if dark:
+                    rects.append(f"{column} {row_index} {length} 1 re")
+                column += length
+        c.setFillColor(black)
+        c.addLiteral("\n".join(rects) + "\nf")
+        c.restoreState()
+
+    def _place_layer(self, c: canvas.Canvas, body: str, signatories: Tuple) -> float:
+        """Place the static artwork as a form, drawing it into ``c``'s document first if needed.
+
+        Only ReportLab's public form API is used, so font resources and
+        compression are the document's own. Returns the cohort line's y.
+        """
+        key = (body, signatories)
+        layer = self._layers.get(key)
+        name = layer[0] if layer else "static-" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        if not c.hasForm(name):
+            c.beginForm(name)
+            details_y = self._draw_static(c, body, signatories)
+            c.endForm()
+            if layer is None:
+                if len(self._layers) >= LAYER_CACHE_SIZE:
+                    self._layers.clear()
+                layer = self._layers[key] = (name, details_y)
+        c.doForm(name)
+        return layer[1]
+
+    def _draw_watermark(self, c: canvas.Canvas) -> None:
         # Optional background watermark using the uploaded mockup image (if available).
-        if os.path.exists(MOCKUP_IMAGE_PATH):
-            try:
-                img = ImageReader(MOCKUP_IMAGE_PATH)
-                c.saveState()
-                c.translate(0, 0)
-                c.drawImage(img, 0, 0, width=width, height=height, mask='auto', preserveAspectRatio=True, anchor='c')
-                c.restoreState()
-            except Exception:
-                pass
+        img = _mockup_image()
+        if img is None:
+            return
+        width, height = PAGE_SIZE
+        try:
+            c.saveState()
+            c.drawImage(img, 0, 0, width=width, height=height, mask='auto', preserveAspectRatio=True, anchor='c')
+            c.restoreState()
+        except Exception:
+            pass
+
+    def _draw_static(self, c: canvas.Canvas, body: str, signatories: Tuple) -> float:
+        """Draw everything that does not depend on the recipient; returns the cohort line's y."""
+        width, height = PAGE_SIZE
+        margin = MARGIN
+        left_signatory, left_title, right_signatory, right_title = signatories
 
         # Clean paper background with subtle border
         c.setFillColor(self.paper)
         c.rect(0, 0, width, height, fill=1, stroke=0)
-        margin = 36
         c.setStrokeColor(self.border_muted)
         c.setLineWidth(1.2)
         c.roundRect(margin - 8, margin - 8, width - 2 * (margin - 8), height - 2 * (margin - 8), 22, stroke=1, fill=0)
@@ -74,23 +248,8 @@ class PDFService:
         c.setFillColor(self.charcoal)
         c.setFont("Helvetica", 12)
         c.drawCentredString(width / 2, cursor_y, "This certificate is proudly presented to")
-        cursor_y -= 32
+        cursor_y = RECIPIENT_Y - 40
 
-        c.setFont("Helvetica-Bold", 30)
-        recipient = cert.get("name", " ").strip().upper()
-        if recipient:
-            c.drawCentredString(width / 2, cursor_y, recipient)
-        else:
-            line_w = 420
-            c.setStrokeColor(self.deep_red)
-            c.setLineWidth(1.2)
-            c.line(width / 2 - line_w / 2, cursor_y - 6, width / 2 + line_w / 2, cursor_y - 6)
-        cursor_y -= 40
-
-        body = cert.get("body", (
-            "In recognition of outstanding performance within the Dada Devs community. "
-            "You have demonstrated collaboration, creativity, and impact across the Lightning and Web3 ecosystem."
-        ))
         c.setFont("Helvetica", 11)
         c.setFillColor(self.charcoal)
         for line in self._wrap_lines(body, 90):
@@ -98,13 +257,6 @@ class PDFService:
             cursor_y -= 16
         cursor_y -= 10
 
-        cohort = cert.get("cohort", "-")
-        issued_at = cert.get("issued_at", "-") or "-"
-        issued_short = issued_at[:10] if isinstance(issued_at, str) and len(issued_at) >= 10 else issued_at
-        c.setFont("Helvetica-Bold", 11)
-        c.setFillColor(self.deep_red)
-        c.drawCentredString(width / 2, cursor_y, f"Cohort: {cohort}   •   Issued: {issued_short}")
-
         # Signature section
         sig_base_y = margin + 120
         sig_width = 220
@@ -115,49 +267,23 @@ class PDFService:
         c.line(left_sig_x, sig_base_y, left_sig_x + sig_width, sig_base_y)
         c.line(right_sig_x, sig_base_y, right_sig_x + sig_width, sig_base_y)
 
-        self._draw_signatory_block(
-            c,
-            left_sig_x + sig_width / 2,
-            sig_base_y - 16,
-            left_signatory,
-            left_title
-        )
-        self._draw_signatory_block(
-            c,
-            right_sig_x + sig_width / 2,
-            sig_base_y - 16,
-            right_signatory or "DADA DEVS COUNCIL",
-            right_title or "Program Leadership"
-        )
+        self._draw_signatory_block(c, left_sig_x + sig_width / 2, sig_base_y - 16, left_signatory, left_title)
+        self._draw_signatory_block(c, right_sig_x + sig_width / 2, sig_base_y - 16, right_signatory, right_title)
 
-        # QR (bottom-right, minimal)
-        verify_url = f"{self.base_url}/verify/{cert.get('id','') if cert.get('id') else ''}"
-        qr = qrcode.QRCode(box_size=5, border=1)
-        qr.add_data(verify_url)
-        qr.make()
-        qr_buffer = BytesIO()
-        qr.make_image(fill_color="black", back_color="white").save(qr_buffer, format="PNG")
-        qr_buffer.seek(0)
-        qr_reader = ImageReader(qr_buffer)
-        qr_size = 70
+        # QR frame
         qr_right = width - margin - 40
         qr_bottom = margin + 20
         c.setFillColor(self.border_muted)
-        c.roundRect(qr_right - qr_size - 14, qr_bottom - 14, qr_size + 28, qr_size + 28, 10, fill=1, stroke=0)
+        c.roundRect(qr_right - QR_SIZE - 14, qr_bottom - 14, QR_SIZE + 28, QR_SIZE + 28, 10, fill=1, stroke=0)
         c.setStrokeColor(self.deep_red)
         c.setLineWidth(0.6)
-        c.roundRect(qr_right - qr_size - 14, qr_bottom - 14, qr_size + 28, qr_size + 28, 10, stroke=1, fill=0)
-        c.drawImage(qr_reader, qr_right - qr_size, qr_bottom, width=qr_size, height=qr_size)
+        c.roundRect(qr_right - QR_SIZE - 14, qr_bottom - 14, QR_SIZE + 28, QR_SIZE + 28, 10, stroke=1, fill=0)
 
         # Footer provenance line
         c.setFont("Helvetica", 9)
         c.setFillColor(self.text_muted)
         c.drawCentredString(width / 2, margin + 30, "Secured with Ed25519 signatures, OpenTimestamps anchoring, and Bitcoin provenance.")
-
-        c.showPage()
-        c.save()
-        buffer.seek(0)
-        return buffer
+        return cursor_y
 
     def _draw_logo(self, c: canvas.Canvas, x: float, y: float):
         """Draw Dada Devs logo: </> code tag with text."""
@@ -232,6 +358,16 @@ class PDFService:
             lines.append(" ".join(current))
         return lines
 
+_worker_services: Dict[str, PDFService] = {}
+
+
+def render_pdf_bytes(base_url: str, cert: Dict) -> bytes:
+    """Process-pool entry point: render one certificate with a per-process PDFService."""
+    service = _worker_services.get(base_url)
+    if service is None:
+        service = _worker_services[base_url] = PDFService(base_url=base_url)
+    return service.generate_pdf(cert).getvalue()
+
 # Example usage (uncomment to test locally)
 # if __name__ == "__main__":
 #     svc = PDFService(base_url="https://dada.example")
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from werkzeug.utils import secure_filename
+
+from backend.app.config import settings
+from backend.app.services.artifact_store import ArtifactStore
+from backend.app.services.storage_backends import AppendLogBackend, atomic_write_text, interprocess_lock
+
+
+def _compact(data) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def _open_log(path: Path) -> AppendLogBackend:
+    return AppendLogBackend(path, compact_ratio=settings.STORE_COMPACT_RATIO, compact_min=settings.STORE_COMPACT_MIN)
+
+
+class PublicPayloadStore:
+    """Content-addressed public certificate payloads with manifests a static host can serve.
+
+    Layout under ``root``::
+
+        blobs/<aa>/<sha256>.json   compact payloads, immutable
+        manifest.jsonl             {"k": cert_id, "v": {"sha256", "cohort", "revoked"}} per line
+        cohorts/index.json         {cohort: file name}
+        cohorts/<cohort>.jsonl     {"k": cert_id, "v": {"sha256", "revoked"}} per line
+        batches/<batch_id>.json    signed Merkle batch manifests (see ``merkle.verify_manifest``)
+
+    The manifests are ``AppendLogBackend`` logs: readers apply the lines in
+    order and the last line for an id wins. ``publish`` only writes when a
+    payload's digest changed, and then appends one line per changed payload
+    to the manifest and to its cohort's log, so its cost does not grow with
+    the number of published certificates. Superseded lines are compacted
+    away as in the certificate store. A legacy ``manifest.json`` is imported
+    on first use.
+    """
+
+    def __init__(self, root: Path = settings.PUBLIC_PAYLOAD_DIR):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.blobs = ArtifactStore(root / "blobs")
+        self.cohorts_dir = root / "cohorts"
+        self.cohorts_dir.mkdir(exist_ok=True)
+        self.batches_dir = root / "batches"
+        self.batches_dir.mkdir(exist_ok=True)
+        self.manifest = _open_log(root / "manifest.jsonl")
+        self._cohorts: Dict[str, AppendLogBackend] = {}
+        self._lock = threading.Lock()
+        self._import_legacy(root / "manifest.json")
+
+    @staticmethod
+    def encode(payload: Dict) -> bytes:
+        return _compact(payload).encode("utf-8")
+
+    def digest(self, cert_id: str) -> Optional[str]:
+        entry = self.manifest.get(cert_id)
+        return entry["sha256"] if entry else None
+
+    def path(self, cert_id: str) -> Optional[Path]:
+        digest = self.digest(cert_id)
+        return self.blobs.path(digest, ".json") if digest else None
+
+    def get(self, cert_id: str) -> Optional[Dict]:
+        path = self.path(cert_id)
+        if path is None or not path.exists():
+            return None
+        return json.loads(path.read_bytes())
+
+    def cohort_path(self, cohort: str) -> Path:
+        digest = hashlib.sha256(cohort.encode("utf-8")).hexdigest()[:8]
+        return self.cohorts_dir / f"{secure_filename(cohort) or 'cohort'}-{digest}.jsonl"
+
+    def put_batch(self, manifest: Dict) -> Path:
+        path = self.batches_dir / f"{secure_filename(manifest['batch'])}.json"
+        atomic_write_text(path, _compact(manifest))
+        return path
+
+    def get_batch(self, batch_id: str) -> Optional[Dict]:
+        try:
+            return json.loads((self.batches_dir / f"{secure_filename(batch_id)}.json").read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, payloads: Dict[str, Dict]) -> Dict[str, str]:
+        """Store ``{cert_id: payload}``, skipping unchanged ones; returns every payload's digest."""
+        encoded = {cert_id: self.encode(payload) for cert_id, payload in payloads.items()}
+        digests = {cert_id: hashlib.sha256(body).hexdigest() for cert_id, body in encoded.items()}
+        entries = {
+            cert_id: {
+                "sha256": digests[cert_id],
+                "cohort": str(payload.get("cohort") or "unspecified"),
+                "revoked": bool(payload.get("revoked")),
+            }
+            for cert_id, payload in payloads.items()
+        }
+        stale: List[str] = []
+
+        def unchanged(cert_id: str, entry: Dict, current: Optional[Dict]) -> bool:
+            if current == entry:
+                return True
+            if current and current["sha256"] != entry["sha256"]:
+                stale.append(current["sha256"])
+            return False
+
+        # One writer at a time, so the manifest and the cohort logs see changes in the same order.
+        with self._lock, interprocess_lock(self.root / "publish"):
+            for cert_id, body in encoded.items():
+                self.blobs.put(body, ".json")
+            skipped = set(self.manifest.put_many(entries, unchanged))
+            by_cohort: Dict[str, Dict[str, Dict]] = {}
+            for cert_id, entry in entries.items():
+                if cert_id not in skipped:
+                    by_cohort.setdefault(entry["cohort"], {})[cert_id] = {
+                        "sha256": entry["sha256"],
+                        "revoked": entry["revoked"],
+                    }
+            for cohort, members in by_cohort.items():
+                self._cohort_log(cohort).put_many(members)
+            for digest in stale:
+                self.blobs.delete(digest, ".json")
+        return digests
+
+    def _cohort_log(self, cohort: str) -> AppendLogBackend:
+        log = self._cohorts.get(cohort)
+        if log is None:
+            path = self.cohort_path(cohort)
+            if not path.exists():
+                index_path = self.cohorts_dir / "index.json"
+                try:
+                    index = json.loads(index_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    index = {}
+                index[cohort] = path.name
+                atomic_write_text(index_path, _compact(index))
+            log = self._cohorts[cohort] = _open_log(path)
+        return log
+
+    def _import_legacy(self, path: Path) -> None:
+        """Carry over a ``{cert_id: sha256}`` manifest.json written before the logs."""
+        if len(self.manifest) or not path.exists():
+            return
+        try:
+            legacy = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        # Without a cohort the entries never match ``publish``'s, so the next
+        # ``publish-payloads`` fills in the cohort logs.
+        entries = {cert_id: {"sha256": digest} for cert_id, digest in legacy.items()}
+        self.manifest.put_many(entries, lambda cert_id, entry, current: current is not None)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.app.config import settings
+from backend.app.services.signature_service import SignatureService
+from backend.app.services.storage_backends import atomic_write_bytes, atomic_write_text, interprocess_lock
+from backend.app.services.storage_service import CertificateStore
+from backend.app.utils import parse_utc_iso, utc_now_iso
+
+CRL_NAME = "crl.json"
+BLOOM_NAME = "revoked.bloom"
+BLOOM_HEADER = 8  # big-endian number of the list the filter belongs to
+
+
+def _compact(data) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+class BloomFilter:
+    """Bloom filter over certificate ids (SHA-256 double hashing); no false negatives."""
+
+    def __init__(self, bits: int, hashes: int, data: Optional[bytes] = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray(data if data is not None else -(-bits // 8))
+
+    @classmethod
+    def for_capacity(cls, count: int, false_positive_rate: float) -> "BloomFilter":
+        bits = max(1024, math.ceil(-max(count, 1) * math.log(false_positive_rate) / math.log(2) ** 2))
+        return cls(bits, max(1, round(bits / max(count, 1) * math.log(2))))
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:16], "big") | 1
+        return ((first + index * second) % self.bits for index in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.data[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.data[position // 8] & (1 << (position % 8)) for position in self._positions(item))
+
+
+class RevocationListPublisher:
+    """Writes an Ed25519-signed revocation list, signed deltas and a Bloom filter of revoked ids.
+
+    Layout under ``output_dir`` (static files; a CDN can serve them as is)::
+
+        crl.json             {"crl": {number, issued_at, next_update, revoked: [{id, revoked_at}],
+                              bloom: {bits, hashes, sha256}}, "signature", "key_id"}
+        revoked.bloom        the list's number (8 bytes, big-endian) then the filter's bit array;
+                             the whole file is authenticated by ``crl.bloom.sha256``
+        deltas/<number>.json {"delta": {number, base, issued_at, added: [...]}, "signature", "key_id"}
+
+    Each signature covers the compact, key-sorted JSON of the signed object.
+    ``publish`` bumps ``number`` and writes a delta against the previous list
+    only when the revoked set changed; otherwise it just re-signs with a fresh
+    ``issued_at``/``next_update``.
+
+    ``crl.json`` and ``revoked.bloom`` are replaced one after the other, so a
+    reader can fetch one from before a publish and the other from after it.
+    ``load_bloom`` rejects a filter whose number or digest does not match the
+    list; the reader then falls back to the list itself (or fetches again).
+    """
+
+    def __init__(
+        self,
+        store: CertificateStore,
+        signer: SignatureService,
+        output_dir: Path = settings.REVOCATION_DIR,
+    ):
+        self.store = store
+        self.signer = signer
+        self.output_dir = output_dir
+        self.deltas_dir = output_dir / "deltas"
+        self.deltas_dir.mkdir(parents=True, exist_ok=True)
+        self.crl_path = output_dir / CRL_NAME
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.crl_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def publish(self) -> Dict:
+        """Regenerate the list from the store's revoked index; returns the signed list."""
+        with self._lock, interprocess_lock(self.crl_path):
+            revoked = self.store.query_certificates(revoked=True)
+            entries = sorted(
+                ({"id": cert["id"], "revoked_at": cert.get("revoked_at")} for cert in revoked),
+                key=lambda entry: entry["id"],
+            )
+            previous = (self.current() or {}).get("crl") or {}
+            known = {entry["id"] for entry in previous.get("revoked", [])}
+            added = [entry for entry in entries if entry["id"] not in known]
+            changed = bool(added) or len(known) != len(entries) or not previous
+            number = previous.get("number", 0) + 1 if changed else previous["number"]
+            issued_at = utc_now_iso()
+            expires = parse_utc_iso(issued_at) + dt.timedelta(seconds=settings.REVOCATION_LIST_TTL)
+            next_update = expires.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+            bloom = BloomFilter.for_capacity(len(entries), settings.REVOCATION_BLOOM_FP_RATE)
+            for entry in entries:
+                bloom.add(entry["id"])
+            bloom_bytes = number.to_bytes(BLOOM_HEADER, "big") + bytes(bloom.data)
+            if changed and previous:
+                delta = {"number": number, "base": previous["number"], "issued_at": issued_at, "added": added}
+                atomic_write_text(self.deltas_dir / f"{number}.json", _compact(self._signed("delta", delta)))
+                self._prune_deltas(number)
+            crl = {
+                "number": number,
+                "issued_at": issued_at,
+                "next_update": next_update,
+                "count": len(entries),
+                "revoked": entries,
+                "bloom": {
+                    "bits": bloom.bits,
+                    "hashes": bloom.hashes,
+                    "sha256": hashlib.sha256(bloom_bytes).hexdigest(),
+                },
+            }
+            document = self._signed("crl", crl)
+            atomic_write_text(self.crl_path, _compact(document))
+            if changed or self._bloom_number() != number:
+                atomic_write_bytes(self.output_dir / BLOOM_NAME, bloom_bytes)
+            return document
+
+    def _bloom_number(self) -> Optional[int]:
+        try:
+            with (self.output_dir / BLOOM_NAME).open("rb") as handle:
+                header = handle.read(BLOOM_HEADER)
+        except OSError:
+            return None
+        return int.from_bytes(header, "big") if len(header) == BLOOM_HEADER else None
+
+    def _signed(self, kind: str, body: Dict) -> Dict:
+        key_id, signature = self.signer.sign_with_key_id(_compact(body))
+        return {kind: body, "signature": signature, "key_id": key_id}
+
+    def _prune_deltas(self, number: int) -> None:
+        for path in self.deltas_dir.glob("*.json"):
+            if path.stem.isdigit() and int(path.stem) <= number - settings.REVOCATION_DELTAS_KEPT:
+                path.unlink(missing_ok=True)
+
+
+def verify_signed(
+    document: Dict, kind: str, verify_signature: Callable[[str, str, Optional[str]], bool]
+) -> Optional[Dict]:
+    """The signed ``crl`` / ``delta`` body if its signature (by ``key_id``) checks out, else ``None``."""
+    body = document.get(kind)
+    signature = document.get("signature") or ""
+    if not isinstance(body, dict) or not verify_signature(_compact(body), signature, document.get("key_id")):
+        return None
+    return body
+
+
+def load_bloom(crl: Dict, data: bytes) -> Optional[BloomFilter]:
+    """The filter described by a verified ``crl``, or ``None`` if ``data`` belongs to another list."""
+    spec = crl.get("bloom") or {}
+    if len(data) < BLOOM_HEADER or int.from_bytes(data[:BLOOM_HEADER], "big") != crl.get("number"):
+        return None
+    if hashlib.sha256(data).hexdigest() != spec.get("sha256"):
+        return None
+    return BloomFilter(spec["bits"], spec["hashes"], data[BLOOM_HEADER:])
+
+
+def revoked_ids(crl: Dict, deltas: List[Dict]) -> List[str]:
+    """Ids revoked as of the newest delta that chains onto ``crl`` (both already verified)."""
+    ids = {entry["id"] for entry in crl.get("revoked", [])}
+    number = crl.get("number")
+    for delta in sorted(deltas, key=lambda item: item.get("number", 0)):
+        if delta.get("base") == number:
+            ids.update(entry["id"] for entry in delta.get("added", []))
+            number = delta["number"]
+    return sorted(ids)
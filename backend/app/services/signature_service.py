@@ -1,34 +1,113 @@
 import base64
+import hashlib
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ed25519
 
 from backend.app.config import settings
+from backend.app.services.storage_backends import (
+    FileSignature,
+    atomic_write_bytes,
+    file_signature,
+    interprocess_lock,
+)
+
+# (payload, signature_b64) or (payload, signature_b64, key_id)
+SignedItem = Sequence[Optional[str]]
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _raw(public_key: ed25519.Ed25519PublicKey) -> bytes:
+    return public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+
+def _pem(public_key: ed25519.Ed25519PublicKey) -> str:
+    return public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode("utf-8")
+
+
+def key_id_for(public_key: ed25519.Ed25519PublicKey) -> str:
+    """RFC 7638 JWK thumbprint of an Ed25519 public key."""
+    jwk = json.dumps({"crv": "Ed25519", "kty": "OKP", "x": _b64url(_raw(public_key))}, separators=(",", ":"))
+    return _b64url(hashlib.sha256(jwk.encode("utf-8")).digest())
 
 
 class SignatureService:
+    """Ed25519 signing with an in-memory keyring indexed by key id.
+
+    The active pair lives at ``private_key_path``/``public_key_path``. ``rotate``
+    moves the old public key to ``retired_dir/<key_id>.pem`` so certificates
+    signed with it keep verifying. Key ids are RFC 7638 JWK thumbprints and
+    are recorded on certificates as ``key_id``. Key files are re-read only
+    when their stat changes, so a rotation made by another worker or the CLI
+    is picked up without a restart. PEM and JWKS exports are cached.
+    """
+
     def __init__(
         self,
         private_key_path: Path = settings.PRIVATE_KEY_PATH,
         public_key_path: Path = settings.PUBLIC_KEY_PATH,
+        retired_dir: Optional[Path] = None,
     ):
         self.private_key_path = private_key_path
         self.public_key_path = public_key_path
-        self.private_key, self.public_key = self._load_or_create_keys()
+        self.retired_dir = retired_dir or private_key_path.parent / "retired"
+        self.keys: Dict[str, ed25519.Ed25519PublicKey] = {}
+        self._pems: Dict[str, str] = {}
+        self._jwks: Optional[Dict] = None
+        self._active: FileSignature = None
+        self._retired: FileSignature = None
+        self._retired_keys: Dict[str, ed25519.Ed25519PublicKey] = {}
+        self._lock = threading.Lock()
+        self._refresh()
+
+    @property
+    def key_id(self) -> str:
+        """Id of the key new signatures are made with."""
+        self._refresh()
+        return self._key_id
+
+    def _refresh(self) -> None:
+        active = file_signature(self.private_key_path)
+        retired = file_signature(self.retired_dir)
+        if active == self._active and retired == self._retired and active is not None:
+            return
+        with self._lock:
+            if active != self._active or active is None:
+                self.private_key, self.public_key = self._load_or_create_keys()
+                self._key_id = key_id_for(self.public_key)
+                self._active = file_signature(self.private_key_path)
+            if retired != self._retired:
+                self._retired_keys = self._load_retired()
+                self._retired = retired
+            self.keys = {**self._retired_keys, self._key_id: self.public_key}
+            self._pems = {key_id: _pem(public_key) for key_id, public_key in self.keys.items()}
+            self._jwks = None
 
     def _load_or_create_keys(self) -> Tuple[ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey]:
         if self.private_key_path.exists() and self.public_key_path.exists():
             private_key = self._load_private_key()
-            public_key = self._load_public_key()
-            return private_key, public_key
+            return private_key, private_key.public_key()
 
-        private_key = ed25519.Ed25519PrivateKey.generate()
-        public_key = private_key.public_key()
-        self._persist_keys(private_key, public_key)
-        return private_key, public_key
+        with interprocess_lock(self.private_key_path):
+            if self.private_key_path.exists() and self.public_key_path.exists():
+                private_key = self._load_private_key()
+                return private_key, private_key.public_key()
+            private_key = ed25519.Ed25519PrivateKey.generate()
+            public_key = private_key.public_key()
+            self._persist_keys(private_key, public_key)
+            return private_key, public_key
 
     def _persist_keys(self, private_key, public_key) -> None:
         self.private_key_path.parent.mkdir(parents=True, exist_ok=True)
@@ -39,34 +118,126 @@ class SignatureService:
             format=serialization.PrivateFormat.PKCS8,
             encryption_algorithm=serialization.NoEncryption(),
         )
-        public_bytes = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
-
-        self.private_key_path.write_bytes(private_bytes)
-        self.public_key_path.write_bytes(public_bytes)
+        atomic_write_bytes(self.public_key_path, _pem(public_key).encode("utf-8"))
+        atomic_write_bytes(self.private_key_path, private_bytes)
 
     def _load_private_key(self) -> ed25519.Ed25519PrivateKey:
         data = self.private_key_path.read_bytes()
         return serialization.load_pem_private_key(data, password=None)
 
-    def _load_public_key(self) -> ed25519.Ed25519PublicKey:
-        data = self.public_key_path.read_bytes()
-        return serialization.load_pem_public_key(data)
+    def _load_retired(self) -> Dict[str, ed25519.Ed25519PublicKey]:
+        keys: Dict[str, ed25519.Ed25519PublicKey] = {}
+        for path in sorted(self.retired_dir.glob("*.pem")) if self.retired_dir.is_dir() else []:
+            public_key = serialization.load_pem_public_key(path.read_bytes())
+            keys[key_id_for(public_key)] = public_key
+        return keys
+
+    def rotate(self) -> str:
+        """Retire the active key (its public half stays in the keyring) and start signing with a new one."""
+        with interprocess_lock(self.private_key_path):
+            current = self._load_private_key().public_key()
+            self.retired_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(self.retired_dir / f"{key_id_for(current)}.pem", _pem(current).encode("utf-8"))
+            private_key = ed25519.Ed25519PrivateKey.generate()
+            self._persist_keys(private_key, private_key.public_key())
+        self._refresh()
+        return self._key_id
 
     def sign(self, payload: str) -> str:
-        signature = self.private_key.sign(payload.encode("utf-8"))
-        return base64.b64encode(signature).decode("utf-8")
+        return self.sign_with_key_id(payload)[1]
+
+    def sign_with_key_id(self, payload: str) -> Tuple[str, str]:
+        """``(key_id, signature_b64)``, read together so a concurrent rotation cannot split them."""
+        self._refresh()
+        with self._lock:
+            key_id, private_key = self._key_id, self.private_key
+        signature = private_key.sign(payload.encode("utf-8"))
+        return key_id, base64.b64encode(signature).decode("utf-8")
+
+    def public_key_for(self, key_id: str) -> Optional[ed25519.Ed25519PublicKey]:
+        """Keyring lookup; an unknown id triggers one re-read in case another process rotated."""
+        public_key = self.keys.get(key_id)
+        if public_key is None:
+            self._refresh()
+            public_key = self.keys.get(key_id)
+        return public_key
+
+    def _candidates(self, key_id: Optional[str]) -> List[ed25519.Ed25519PublicKey]:
+        # Certificates issued before key ids were recorded may match any key.
+        if key_id is None:
+            return list(self.keys.values())
+        public_key = self.public_key_for(key_id)
+        return [public_key] if public_key is not None else []
+
+    def verify(self, payload: str, signature_b64: str, key_id: Optional[str] = None) -> bool:
+        return any(_verify_with(public_key, payload, signature_b64) for public_key in self._candidates(key_id))
+
+    def verify_many(self, items: List[SignedItem], workers: Optional[int] = None) -> List[bool]:
+        """Check many ``(payload, signature_b64[, key_id])`` items, in input order.
+
+        Large batches are split into one chunk per worker process; small ones
+        are cheaper to verify inline than to ship to a pool.
+        """
+        workers = min(workers or settings.VERIFY_WORKERS, len(items))
+        if workers <= 1 or len(items) < settings.VERIFY_PARALLEL_MIN:
+            return [self.verify(*item) for item in items]
+        resolved = []
+        for payload, signature, *key_id in items:
+            candidates = self._candidates(key_id[0] if key_id else None)
+            resolved.append((payload, signature, [_raw(public_key) for public_key in candidates]))
+        size = -(-len(resolved) // workers)
+        chunks = [resolved[start:start + size] for start in range(0, len(resolved), size)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            return [ok for chunk in pool.map(verify_signatures, chunks) for ok in chunk]
+
+    def export_public_key_pem(self, key_id: Optional[str] = None) -> str:
+        """PEM of the active (or given) public key, from the in-memory keyring."""
+        self._refresh()
+        return self._pems.get(key_id or self._key_id, "")
+
+    def jwks(self) -> Dict:
+        """Every key in the keyring as a JSON Web Key Set, active key first."""
+        self._refresh()
+        if self._jwks is None:
+            order = [self._key_id] + [key_id for key_id in self.keys if key_id != self._key_id]
+            self._jwks = {
+                "keys": [
+                    {
+                        "kty": "OKP",
+                        "crv": "Ed25519",
+                        "x": _b64url(_raw(self.keys[key_id])),
+                        "kid": key_id,
+                        "use": "sig",
+                        "alg": "EdDSA",
+                    }
+                    for key_id in order
+                ]
+            }
+        return self._jwks
+
+
+def _verify_with(public_key: ed25519.Ed25519PublicKey, payload: str, signature_b64: str) -> bool:
+    try:
+        signature = base64.b64decode(signature_b64.encode("utf-8"))
+        public_key.verify(signature, payload.encode("utf-8"))
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+_worker_keys: Dict[bytes, ed25519.Ed25519PublicKey] = {}
+
 
-    def verify(self, payload: str, signature_b64: str) -> bool:
-        try:
-            signature = base64.b64decode(signature_b64.encode("utf-8"))
-            self.public_key.verify(signature, payload.encode("utf-8"))
-            return True
-        except (InvalidSignature, ValueError, TypeError):
-            return False
+def _worker_key(raw_public_key: bytes) -> ed25519.Ed25519PublicKey:
+    public_key = _worker_keys.get(raw_public_key)
+    if public_key is None:
+        public_key = _worker_keys[raw_public_key] = ed25519.Ed25519PublicKey.from_public_bytes(raw_public_key)
+    return public_key
 
-    def export_public_key_pem(self) -> str:
-        return self.public_key_path.read_text(encoding="utf-8")
 
+def verify_signatures(items: List[Tuple[str, str, List[bytes]]]) -> List[bool]:
+    """Process-pool entry point: check ``(payload, signature, raw candidate keys)`` with per-process key objects."""
+    return [
+        any(_verify_with(_worker_key(raw), payload, signature) for raw in candidates)
+        for payload, signature, candidates in items
+    ]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Dict
+
+from flask import Flask, render_template
+
+from backend.app.config import settings
+from backend.app.services.certificate_service import CertificateService
+from backend.app.services.storage_backends import atomic_write_bytes, atomic_write_text
+from backend.app.utils import export_public_certificate, parse_utc_iso, utc_now_iso
+
+TEMPLATES = ("base.html", "verify.html")
+MARKER_SLACK_SECONDS = 30
+
+
+def _marker(timestamp: str) -> str:
+    """Where the next build starts reading the change index after one that saw writes up to ``timestamp``.
+
+    Writers stamp ``updated_at`` just before taking the store lock, so a
+    write stamped shortly before a build read the index may only land after
+    it; starting a little earlier picks those up (at the cost of re-rendering
+    the last few seconds' changes).
+    """
+    earlier = parse_utc_iso(timestamp) - dt.timedelta(seconds=MARKER_SLACK_SECONDS)
+    return earlier.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class StaticSiteBuilder:
+    """Pre-renders every certificate's verify page and JSON twin for a static host.
+
+    Output layout (serve it from nginx or a CDN, proxy everything else to
+    the app)::
+
+        verify/<id>/index.html   the page /verify/<id> would render
+        verify/<id>.json         public fields plus the verification result
+        proofs/<id>.ots          the OpenTimestamps proof
+        static/                  the app's CSS/JS
+        revocations/             the signed revocation list, deltas and Bloom filter
+
+    ``.build-state.json`` records the templates' hash and a marker: the
+    ``updated_at`` of the store's writes up to which the output is current.
+    ``build`` asks the store's ``updated_at`` index for the certificates
+    written since the marker (issued, revoked, stamped, pinned...) and
+    re-renders only those, so an incremental build costs time in the number
+    of changes, not the number of certificates. A template or ``BASE_URL``
+    change, or ``full``, renders everything from an empty marker and removes
+    pages of certificates the store no longer has.
+    """
+
+    def __init__(self, app: Flask, service: CertificateService, output_dir: Path = settings.STATIC_SITE_DIR):
+        self.app = app
+        self.service = service
+        self.output_dir = output_dir
+        self.state_path = output_dir / ".build-state.json"
+
+    def build(self, full: bool = False) -> Dict[str, int]:
+        """Bring the output directory up to date; returns rendered/unchanged/removed counts."""
+        (self.output_dir / "verify").mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "proofs").mkdir(exist_ok=True)
+        state = self._load_state()
+        template_key = self._template_key()
+        full = full or state.get("template") != template_key or "marker" not in state
+        started = utc_now_iso()
+        changed = self.service.store.changed_certificates("" if full else state["marker"])
+        counts = {"rendered": 0, "unchanged": 0, "removed": 0}
+
+        with self.app.test_request_context(base_url=settings.BASE_URL):
+            for index, (updated_at, cert_id) in enumerate(changed, start=1):
+                self._render(cert_id)
+                counts["rendered"] += 1
+                if index % settings.MAX_PAGE_SIZE == 0:
+                    # An interrupted build resumes from here.
+                    self._save_state(template_key, _marker(updated_at))
+
+        if full:
+            current = {cert_id for _, cert_id in changed}
+            for path in (self.output_dir / "verify").glob("*.json"):
+                if path.stem not in current:
+                    self._remove(path.stem)
+                    counts["removed"] += 1
+        counts["unchanged"] = max(self.service.store.count_certificates() - counts["rendered"], 0)
+        self._copy_assets()
+        self._save_state(template_key, _marker(started))
+        return counts
+
+    def _render(self, cert_id: str) -> None:
+        cert = self.service.verify(cert_id)
+        if not cert:
+            return
+        ots = cert.get("ots_verification", {})
+        page = render_template(
+            "verify.html", found=True, cert=cert, signature_valid=cert.get("signature_valid"), ots=ots
+        )
+        twin = {
+            "found": True,
+            "certificate": {
+                **export_public_certificate(cert),
+                "signature_valid": cert.get("signature_valid"),
+                "ots_verification": ots,
+            },
+        }
+        page_dir = self.output_dir / "verify" / cert_id
+        page_dir.mkdir(exist_ok=True)
+        atomic_write_text(page_dir / "index.html", page)
+        atomic_write_text(self.output_dir / "verify" / f"{cert_id}.json", json.dumps(twin, sort_keys=True))
+        proof = self.service.ots_service.proof_path(cert_id)
+        if proof.exists():
+            atomic_write_bytes(self.output_dir / "proofs" / f"{cert_id}.ots", proof.read_bytes())
+
+    def _remove(self, cert_id: str) -> None:
+        shutil.rmtree(self.output_dir / "verify" / cert_id, ignore_errors=True)
+        (self.output_dir / "verify" / f"{cert_id}.json").unlink(missing_ok=True)
+        (self.output_dir / "proofs" / f"{cert_id}.ots").unlink(missing_ok=True)
+
+    def _template_key(self) -> str:
+        digest = hashlib.sha256(settings.BASE_URL.encode("utf-8"))
+        for name in TEMPLATES:
+            digest.update(Path(self.app.jinja_loader.searchpath[0], name).read_bytes())
+        return digest.hexdigest()
+
+    def _copy_assets(self) -> None:
+        shutil.copytree(self.app.static_folder, self.output_dir / "static", dirs_exist_ok=True)
+        revocations = self.service.revocation_list
+        if revocations is not None and revocations.crl_path.exists():
+            shutil.copytree(revocations.output_dir, self.output_dir / "revocations", dirs_exist_ok=True)
+
+    def _load_state(self) -> Dict:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, template_key: str, marker: str) -> None:
+        atomic_write_text(self.state_path, json.dumps({"template": template_key, "marker": marker}))
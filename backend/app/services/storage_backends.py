@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import copy
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+FileSignature = Optional[Tuple[int, int, int]]
+ChangeListener = Callable[[str, Optional[Dict], Optional[Dict]], None]
+# (key, new record, current record or None) -> True to leave the key untouched
+Conflict = Callable[[str, Dict, Optional[Dict]], bool]
+
+
+@contextmanager
+def interprocess_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """Hold an OS-level lock on ``<path>.lock`` for the duration of the block.
+
+    The lock lives in a sidecar file so that ``path`` itself can be replaced
+    atomically while other workers are waiting on it.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    with lock_path.open("a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write ``text`` to a temp file beside ``path`` and rename it into place."""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary counterpart of ``atomic_write_text``."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def file_signature(path: Path) -> FileSignature:
+    """(inode, mtime_ns, size) of ``path``, or ``None`` when it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _rejected(records: Dict[str, Dict], conflicts: Optional[Conflict], current: Dict[str, Dict]) -> Dict[str, None]:
+    if conflicts is None:
+        return {}
+    return {key: None for key, record in records.items() if conflicts(key, record, current.get(key))}
+
+
+class _CachedBackend:
+    """Parsed in-memory view shared by the file backends.
+
+    Subclasses implement ``_refresh`` to catch up with the file on disk and
+    route every change through ``_set``/``_remove`` so that subscribed
+    listeners (secondary indexes, aggregates) see ``(key, old, new)`` for
+    local writes and for writes made by other worker processes alike.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._records: Dict[str, Dict] = {}
+        self._listeners: List[ChangeListener] = []
+        self._lock = Lock()
+
+    def _refresh(self) -> None:
+        raise NotImplementedError
+
+    def _set(self, key: str, record: Dict) -> None:
+        old = self._records.get(key)
+        self._records[key] = record
+        for listener in self._listeners:
+            listener(key, old, record)
+
+    def _remove(self, key: str) -> None:
+        old = self._records.pop(key, None)
+        if old is not None:
+            for listener in self._listeners:
+                listener(key, old, None)
+
+    def _replace_all(self, records: Dict[str, Dict]) -> None:
+        for key in [key for key in self._records if key not in records]:
+            self._remove(key)
+        for key, record in records.items():
+            if self._records.get(key) != record:
+                self._set(key, record)
+        self.generation += 1
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Register ``listener`` and replay the current records into it."""
+        with self._lock:
+            self._refresh()
+            self._listeners.append(listener)
+            for key, record in self._records.items():
+                listener(key, None, record)
+
+    def read(self, fn: Callable[[], object]) -> object:
+        """Run ``fn`` against an up-to-date view, e.g. to count via a listener's index."""
+        with self._lock:
+            self._refresh()
+            return fn()
+
+    def select(self, keys_fn: Callable[[], Iterable[str]]) -> List[Dict]:
+        """Copies of the records whose keys ``keys_fn`` yields, in that order."""
+        with self._lock:
+            self._refresh()
+            return [copy.deepcopy(self._records[key]) for key in keys_fn() if key in self._records]
+
+    def all(self) -> Dict[str, Dict]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._records)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._records.get(key))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._records)
+
+
+class JsonFileBackend(_CachedBackend):
+    """Legacy backend: one pretty-printed JSON object holding every record.
+
+    The parsed file is cached and only re-read when its inode, mtime or size
+    no longer match what this process last read or wrote. Writes re-read,
+    modify and atomically replace the file while holding ``interprocess_lock``.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._signature: FileSignature = None
+        self._loaded = False
+
+    def _read(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        with self.path.open("r", encoding="utf-8") as handle:
+            try:
+                return json.load(handle)
+            except json.JSONDecodeError:
+                return {}
+
+    def _write(self) -> None:
+        atomic_write_text(self.path, json.dumps(self._records, indent=2, sort_keys=True))
+        self._signature = file_signature(self.path)
+        self.generation += 1
+
+    def _refresh(self) -> None:
+        signature = file_signature(self.path)
+        if self._loaded and signature == self._signature:
+            return
+        self._replace_all(self._read())
+        self._signature = signature
+        self._loaded = True
+
+    def put(self, key: str, record: Dict) -> None:
+        self.put_many({key: record})
+
+    def put_many(self, records: Dict[str, Dict], conflicts: Optional[Conflict] = None) -> List[str]:
+        """Write ``records`` at once; with ``conflicts``, skip (and return) the keys it rejects.
+
+        ``conflicts`` runs under the same exclusive lock as the write, against
+        the current records and listener indexes, so check-and-put is atomic
+        across workers.
+        """
+        with self._lock, interprocess_lock(self.path):
+            self._refresh()
+            rejected = _rejected(records, conflicts, self._records)
+            for key, record in records.items():
+                if key not in rejected:
+                    self._set(key, copy.deepcopy(record))
+            if len(rejected) < len(records):
+                self._write()
+            return list(rejected)
+
+    def update(self, key: str, mutate: Callable[[Dict], Optional[Dict]]) -> Optional[Dict]:
+        """Atomically apply ``mutate`` to a copy of ``key``; ``None`` skips the write."""
+        with self._lock, interprocess_lock(self.path):
+            self._refresh()
+            current = self._records.get(key)
+            if current is None:
+                return None
+            record = mutate(copy.deepcopy(current))
+            if record is None:
+                return None
+            self._set(key, copy.deepcopy(record))
+            self._write()
+            return record
+
+    def update_many(self, keys: Iterable[str], mutate: Callable[[Dict], Optional[Dict]]) -> List[Dict]:
+        """``update`` for several keys under one lock and one file write."""
+        with self._lock, interprocess_lock(self.path):
+            self._refresh()
+            updated = []
+            for key in keys:
+                current = self._records.get(key)
+                record = mutate(copy.deepcopy(current)) if current is not None else None
+                if record is not None:
+                    self._set(key, copy.deepcopy(record))
+                    updated.append(record)
+            if updated:
+                self._write()
+            return updated
+
+    def delete(self, key: str) -> None:
+        with self._lock, interprocess_lock(self.path):
+            self._refresh()
+            if key in self._records:
+                self._remove(key)
+                self._write()
+
+
+class AppendLogBackend(_CachedBackend):
+    """Append-only JSON-lines log holding an in-memory, already-parsed view.
+
+    Each write appends one line, so saving a record costs the same whether the
+    store holds ten certificates or ten thousand. Superseded lines are dropped
+    by ``compact`` once they outnumber live records by ``compact_ratio``.
+
+    Reads are served from memory. Before each operation the log is stat'ed:
+    if another process appended to it only the new tail is parsed, and if it
+    was compacted (new inode or shorter file) it is re-read from the start.
+    ``generation`` increases whenever the record set changes.
+
+    Appends and compactions happen under ``interprocess_lock`` after catching
+    up with the log, so concurrent gunicorn/uwsgi workers never lose writes.
+    Readers need no lock: a line still being written is simply left for the
+    next refresh.
+    """
+
+    def __init__(self, path: Path, compact_ratio: float = 1.0, compact_min: int = 1000):
+        super().__init__()
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._dead = 0
+        self._offset = 0
+        self._inode: Optional[int] = None
+        with self._lock, interprocess_lock(self.path):
+            if not self.path.exists():
+                self.path.touch()
+            self._refresh(exclusive=True)
+
+    def _refresh(self, exclusive: bool = False) -> None:
+        """Catch up with the log; ``exclusive`` means the caller holds the file lock."""
+        stat = self.path.stat()
+        if stat.st_ino == self._inode and stat.st_size == self._offset:
+            return
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reload(handle, stat.st_ino)
+            else:
+                handle.seek(self._offset)
+                changed = False
+                for line in handle:
+                    entry = self._decode(line)
+                    if entry is None:
+                        break
+                    self._apply(entry)
+                    self._offset += len(line)
+                    changed = True
+                if changed:
+                    self.generation += 1
+        if exclusive and self._offset < stat.st_size:
+            # A torn write from a crashed writer leaves a partial trailing line; drop it.
+            with self.path.open("r+b") as handle:
+                handle.truncate(self._offset)
+
+    def _reload(self, handle, inode: int) -> None:
+        records: Dict[str, Dict] = {}
+        dead = 0
+        offset = 0
+        for line in handle:
+            entry = self._decode(line)
+            if entry is None:
+                break
+            key = entry["k"]
+            if key in records:
+                dead += 1
+            if entry.get("d"):
+                records.pop(key, None)
+                dead += 1
+            else:
+                records[key] = entry["v"]
+            offset += len(line)
+        self._replace_all(records)
+        self._dead = dead
+        self._offset = offset
+        self._inode = inode
+
+    def _apply(self, entry: Dict) -> None:
+        key = entry["k"]
+        if key in self._records:
+            self._dead += 1
+        if entry.get("d"):
+            self._remove(key)
+            self._dead += 1
+        else:
+            self._set(key, entry["v"])
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[Dict]:
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(entry, dict) or "k" not in entry:
+            return None
+        return entry
+
+    @staticmethod
+    def _encode(entry: Dict) -> bytes:
+        return (json.dumps(entry, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _append(self, *entries: Dict) -> None:
+        lines = [self._encode(entry) for entry in entries]
+        if not lines:
+            return
+        payload = b"".join(lines)
+        with self.path.open("ab") as handle:
+            handle.write(payload)
+        for line in lines:
+            self._apply(json.loads(line))
+        self._offset += len(payload)
+        self.generation += 1
+
+    def put(self, key: str, record: Dict) -> None:
+        self.put_many({key: record})
+
+    def put_many(self, records: Dict[str, Dict], conflicts: Optional[Conflict] = None) -> List[str]:
+        """Append ``records`` in one write; ``conflicts`` as in ``JsonFileBackend.put_many``."""
+        with self._lock, interprocess_lock(self.path):
+            self._refresh(exclusive=True)
+            rejected = _rejected(records, conflicts, self._records)
+            self._append(*({"k": key, "v": record} for key, record in records.items() if key not in rejected))
+            self._maybe_compact()
+            return list(rejected)
+
+    def update(self, key: str, mutate: Callable[[Dict], Optional[Dict]]) -> Optional[Dict]:
+        """Atomically apply ``mutate`` to a copy of ``key``; ``None`` skips the write."""
+        with self._lock, interprocess_lock(self.path):
+            self._refresh(exclusive=True)
+            current = self._records.get(key)
+            if current is None:
+                return None
+            record = mutate(copy.deepcopy(current))
+            if record is None:
+                return None
+            self._append({"k": key, "v": record})
+            self._maybe_compact()
+            return record
+
+    def update_many(self, keys: Iterable[str], mutate: Callable[[Dict], Optional[Dict]]) -> List[Dict]:
+        """``update`` for several keys under one lock and one append."""
+        with self._lock, interprocess_lock(self.path):
+            self._refresh(exclusive=True)
+            updated = {}
+            for key in keys:
+                current = self._records.get(key)
+                record = mutate(copy.deepcopy(current)) if current is not None else None
+                if record is not None:
+                    updated[key] = record
+            self._append(*({"k": key, "v": record} for key, record in updated.items()))
+            self._maybe_compact()
+            return list(updated.values())
+
+    def delete(self, key: str) -> None:
+        with self._lock, interprocess_lock(self.path):
+            self._refresh(exclusive=True)
+            if key not in self._records:
+                return
+            self._append({"k": key, "d": True})
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self._dead >= max(self.compact_min, len(self._records) * self.compact_ratio):
+            self._compact()
+
+    def compact(self) -> None:
+        with self._lock, interprocess_lock(self.path):
+            self._refresh(exclusive=True)
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".compact")
+        with tmp_path.open("wb") as out:
+            for key, record in self._records.items():
+                out.write(self._encode({"k": key, "v": record}))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.path)
+        stat = self.path.stat()
+        self._inode = stat.st_ino
+        self._offset = stat.st_size
+        self._dead = 0
+
+
+def migrate_json_store(json_path: Path, log_path: Path) -> int:
+    """One-shot copy of a legacy ``JsonFileBackend`` file into a new log.
+
+    Runs only while ``log_path`` does not exist yet, under the log's
+    ``interprocess_lock``, so workers starting together migrate exactly once
+    and never replay stale JSON over newer log entries. Returns the number of
+    migrated records.
+    """
+    with interprocess_lock(log_path):
+        if log_path.exists() or not json_path.exists():
+            return 0
+        records = JsonFileBackend(json_path).all()
+        tmp_path = log_path.with_name(log_path.name + ".migrate")
+        with tmp_path.open("wb") as out:
+            for key, record in records.items():
+                out.write(AppendLogBackend._encode({"k": key, "v": record}))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, log_path)
+        return len(records)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+SortKey = Tuple[str, str]
+
+
+def _hashable(value: object) -> Hashable:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class RecordIndex:
+    """Secondary indexes over one record collection.
+
+    Keeps, for every indexed field, ``value -> [(order_by, key), ...]`` lists
+    sorted by the ``order_by`` timestamp (ties broken by key), plus one list of
+    all records in that order. ``on_change`` is registered with a storage
+    backend via ``subscribe`` so the lists follow every write, local or from
+    another worker, without re-sorting the collection.
+    """
+
+    def __init__(self, fields: Sequence[str], order_by: str):
+        self.fields = tuple(fields)
+        self.order_by = order_by
+        self._ordered: List[SortKey] = []
+        self._buckets: Dict[str, Dict[Hashable, List[SortKey]]] = {field: {} for field in self.fields}
+        self._entries: Dict[str, Tuple[SortKey, Dict[str, Hashable]]] = {}
+
+    def on_change(self, key: str, old: Optional[Dict], new: Optional[Dict]) -> None:
+        if key in self._entries:
+            self._discard(key)
+        if new is not None:
+            self._add(key, new)
+
+    def _add(self, key: str, record: Dict) -> None:
+        sort_key = (str(record.get(self.order_by) or ""), key)
+        values = {field: _hashable(record.get(field)) for field in self.fields}
+        self._entries[key] = (sort_key, values)
+        insort(self._ordered, sort_key)
+        for field, value in values.items():
+            insort(self._buckets[field].setdefault(value, []), sort_key)
+
+    def _discard(self, key: str) -> None:
+        sort_key, values = self._entries.pop(key)
+        self._remove_sorted(self._ordered, sort_key)
+        for field, value in values.items():
+            bucket = self._buckets[field][value]
+            self._remove_sorted(bucket, sort_key)
+            if not bucket:
+                del self._buckets[field][value]
+
+    @staticmethod
+    def _remove_sorted(items: List[SortKey], sort_key: SortKey) -> None:
+        position = bisect_left(items, sort_key)
+        if position < len(items) and items[position] == sort_key:
+            del items[position]
+
+    def _candidates(self, filters: Mapping[str, object]) -> List[SortKey]:
+        if not filters:
+            return self._ordered
+        buckets = [self._buckets[field].get(_hashable(value), []) for field, value in filters.items()]
+        return min(buckets, key=len)
+
+    def keys(
+        self,
+        filters: Optional[Mapping[str, object]] = None,
+        limit: Optional[int] = None,
+        before: Optional[SortKey] = None,
+    ) -> Iterator[str]:
+        """Yield keys matching every ``field == value`` filter, newest first.
+
+        Walks the smallest matching bucket from its newest end (or from just
+        below the ``before`` cursor), so a single filter with a limit costs
+        O(limit + log n) regardless of collection size.
+        """
+        filters = {field: _hashable(value) for field, value in (filters or {}).items()}
+        candidates = self._candidates(filters)
+        start = bisect_left(candidates, tuple(before)) if before is not None else len(candidates)
+        produced = 0
+        for index in range(start - 1, -1, -1):
+            if limit is not None and produced >= limit:
+                return
+            key = candidates[index][1]
+            values = self._entries[key][1]
+            if all(values[field] == value for field, value in filters.items()):
+                produced += 1
+                yield key
+
+    def page(
+        self,
+        filters: Optional[Mapping[str, object]],
+        limit: int,
+        before: Optional[SortKey] = None,
+    ) -> Tuple[List[str], Optional[SortKey]]:
+        """Up to ``limit`` keys below ``before`` and the cursor for the next page."""
+        keys = list(self.keys(filters, limit + 1, before))
+        if len(keys) <= limit:
+            return keys, None
+        keys = keys[:limit]
+        return keys, self._entries[keys[-1]][0]
+
+    def since(self, value: str) -> List[SortKey]:
+        """``(order_by value, key)`` for every record whose value is ``>= value``, oldest first."""
+        return self._ordered[bisect_left(self._ordered, (value, "")):]
+
+    def values(self, key: str) -> Dict[str, Hashable]:
+        """The indexed field values of ``key`` (which must be indexed)."""
+        return self._entries[key][1]
+
+    def count(self, filters: Optional[Mapping[str, object]] = None) -> int:
+        filters = filters or {}
+        if len(filters) <= 1:
+            return len(self._candidates(filters))
+        return sum(1 for _ in self.keys(filters))
+
+
+class StoreStats:
+    """Running totals for dashboards, updated from the same change events.
+
+    Every issue, revoke, approve or reject adjusts a handful of counters by
+    subtracting the old record's contribution and adding the new one, so
+    reading the totals never touches the record set. The counters are rebuilt
+    from the persisted store when it is opened.
+    """
+
+    def __init__(self) -> None:
+        self.certificates = {"total": 0, "revoked": 0}
+        self.cohorts: Dict[str, Dict[str, int]] = {}
+        self.issued_per_day: Dict[str, int] = {}
+        self.requests: Dict[str, int] = {}
+
+    @staticmethod
+    def _bump(counter: Dict, key: Hashable, delta: int) -> None:
+        counter[key] = counter.get(key, 0) + delta
+        if not counter[key]:
+            del counter[key]
+
+    def _count_certificate(self, cert: Dict, delta: int) -> None:
+        revoked = 1 if cert.get("revoked") else 0
+        self.certificates["total"] += delta
+        self.certificates["revoked"] += delta * revoked
+        cohort = self.cohorts.setdefault(str(cert.get("cohort") or "unspecified"), {"total": 0, "revoked": 0})
+        cohort["total"] += delta
+        cohort["revoked"] += delta * revoked
+        if not cohort["total"]:
+            del self.cohorts[str(cert.get("cohort") or "unspecified")]
+        self._bump(self.issued_per_day, str(cert.get("issued_at") or "")[:10], delta)
+
+    def on_certificate_change(self, key: str, old: Optional[Dict], new: Optional[Dict]) -> None:
+        if old is not None:
+            self._count_certificate(old, -1)
+        if new is not None:
+            self._count_certificate(new, 1)
+
+    def on_request_change(self, key: str, old: Optional[Dict], new: Optional[Dict]) -> None:
+        if old is not None:
+            self._bump(self.requests, old.get("status"), -1)
+        if new is not None:
+            self._bump(self.requests, new.get("status"), 1)
+
+    def snapshot(self) -> Dict:
+        total = self.certificates["total"]
+        revoked = self.certificates["revoked"]
+        return {
+            "total": total,
+            "revoked": revoked,
+            "active": total - revoked,
+            "pending": self.requests.get("pending", 0),
+            "requests": dict(self.requests),
+            "cohorts": {name: dict(counts) for name, counts in self.cohorts.items()},
+            "issued_per_day": dict(sorted(self.issued_per_day.items())),
+        }
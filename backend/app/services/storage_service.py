@@ -1,97 +1,209 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from threading import Lock
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from backend.app.config import settings
+from backend.app.services.storage_backends import AppendLogBackend, JsonFileBackend, migrate_json_store
+from backend.app.services.storage_indexes import RecordIndex, SortKey, StoreStats
+from backend.app.utils import utc_now_iso
+
+Backend = Union[AppendLogBackend, JsonFileBackend]
+Page = Tuple[List[Dict], Optional[SortKey]]
+
+
+def open_backend(json_path: Path, log_path: Path, kind: str = settings.STORE_BACKEND) -> Backend:
+    """Return the configured backend, migrating legacy JSON data on first use."""
+    if kind == "json":
+        return JsonFileBackend(json_path)
+    if kind != "log":
+        raise ValueError(f"Unknown store backend: {kind}")
+    migrate_json_store(json_path, log_path)
+    return AppendLogBackend(
+        log_path,
+        compact_ratio=settings.STORE_COMPACT_RATIO,
+        compact_min=settings.STORE_COMPACT_MIN,
+    )
+
+
+def _touch(record: Dict) -> Dict:
+    record["updated_at"] = utc_now_iso()
+    return record
+
+
+def _touching(mutate: Callable[[Dict], Optional[Dict]]) -> Callable[[Dict], Optional[Dict]]:
+    def apply(record: Dict) -> Optional[Dict]:
+        result = mutate(record)
+        return _touch(result) if result is not None else None
+
+    return apply
 
 
 class CertificateStore:
-    def __init__(self, db_path: Path = settings.CERT_DB_PATH, request_path: Path = settings.CERT_REQUEST_DB_PATH):
+    """Certificates and issuance requests, with secondary indexes kept in step with every write.
+
+    Every certificate write stamps ``updated_at``; ``changed_certificates``
+    walks an index ordered by it, so consumers such as the static site
+    builder can catch up on changes without scanning the collection.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = settings.CERT_DB_PATH,
+        request_path: Path = settings.CERT_REQUEST_DB_PATH,
+        backend: str = settings.STORE_BACKEND,
+    ):
         self.db_path = db_path
         self.request_path = request_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.request_path.parent.mkdir(parents=True, exist_ok=True)
+        self._certs = open_backend(db_path, db_path.with_suffix(".jsonl"), backend)
+        self._requests = open_backend(request_path, request_path.with_suffix(".jsonl"), backend)
         self._lock = Lock()
+        self.cert_index = RecordIndex(("cohort", "email", "revoked", "ots_status", "ipfs_status"), order_by="issued_at")
+        self.request_index = RecordIndex(("status", "cohort", "email"), order_by="requested_at")
+        self.change_index = RecordIndex((), order_by="updated_at")
+        self.stats = StoreStats()
+        self._certs.subscribe(self.cert_index.on_change)
+        self._certs.subscribe(self.change_index.on_change)
+        self._certs.subscribe(self.stats.on_certificate_change)
+        self._requests.subscribe(self.request_index.on_change)
+        self._requests.subscribe(self.stats.on_request_change)
 
-    def _read(self) -> Dict[str, Dict]:
-        if not self.db_path.exists():
-            return {}
-        with self.db_path.open("r", encoding="utf-8") as handle:
-            try:
-                return json.load(handle)
-            except json.JSONDecodeError:
-                return {}
+    def list_certificates(self) -> List[Dict]:
+        with self._lock:
+            return list(self._certs.all().values())
 
-    def _write(self, data: Dict[str, Dict]) -> None:
-        with self.db_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+    def query_certificates(self, limit: Optional[int] = None, **filters) -> List[Dict]:
+        """Certificates matching ``cohort``/``email``/``revoked`` filters, newest first."""
+        with self._lock:
+            return self._certs.select(lambda: self.cert_index.keys(filters, limit))
 
-    def list_certificates(self) -> List[Dict]:
+    def page_certificates(self, limit: int, before: Optional[SortKey] = None, **filters) -> Page:
+        """One newest-first page of certificates plus the cursor for the next one."""
         with self._lock:
-            return list(self._read().values())
+            return self._page(self._certs, self.cert_index, limit, before, filters)
+
+    def count_certificates(self, **filters) -> int:
+        with self._lock:
+            return self._certs.read(lambda: self.cert_index.count(filters))
+
+    def stats_snapshot(self) -> Dict:
+        """Current totals from ``StoreStats`` (after catching up with other workers)."""
+        with self._lock:
+            self._requests.read(lambda: None)
+            return self._certs.read(self.stats.snapshot)
 
     def get_certificate(self, cert_id: str) -> Optional[Dict]:
         with self._lock:
-            return self._read().get(cert_id)
+            return self._certs.get(cert_id)
+
+    def get_certificates(self, cert_ids: List[str]) -> Dict[str, Dict]:
+        """Look up many certificates in one backend read; missing ids are omitted."""
+        with self._lock:
+            return {cert["id"]: cert for cert in self._certs.select(lambda: dict.fromkeys(cert_ids))}
+
+    def changed_certificates(self, since: str = "") -> List[SortKey]:
+        """``(updated_at, id)`` of certificates written at or after ``since``, oldest change first."""
+        with self._lock:
+            return self._certs.read(lambda: self.change_index.since(since))
 
     def save_certificate(self, cert: Dict) -> Dict:
         with self._lock:
-            data = self._read()
-            data[cert["id"]] = cert
-            self._write(data)
+            self._certs.put(cert["id"], _touch(cert))
         return cert
 
-    def revoke_certificate(self, cert_id: str, reason: str) -> Optional[Dict]:
+    def save_certificates(self, certs: List[Dict]) -> List[Dict]:
+        """Persist many certificates in a single backend write."""
         with self._lock:
-            data = self._read()
-            cert = data.get(cert_id)
-            if not cert:
-                return None
+            self._certs.put_many({cert["id"]: _touch(cert) for cert in certs})
+        return certs
+
+    def add_certificates(self, certs: List[Dict]) -> List[Dict]:
+        """Persist, in one write, the certificates whose id is not stored yet; returns the others, unsaved.
+
+        The existence check and the write share the backend's exclusive lock,
+        so an issued record (and its revocation state) is never replaced.
+        """
+        records = {cert["id"]: _touch(cert) for cert in certs}
+        with self._lock:
+            rejected = set(self._certs.put_many(records, lambda key, new, current: current is not None))
+        return [cert for cert in certs if cert["id"] in rejected]
+
+    def update_certificate(self, cert_id: str, mutate: Callable[[Dict], Optional[Dict]]) -> Optional[Dict]:
+        with self._lock:
+            return self._certs.update(cert_id, _touching(mutate))
+
+    def update_certificates(self, cert_ids: List[str], mutate: Callable[[Dict], Optional[Dict]]) -> List[Dict]:
+        """Apply ``mutate`` to many certificates in a single backend write."""
+        with self._lock:
+            return self._certs.update_many(cert_ids, _touching(mutate))
+
+    def revoke_certificate(self, cert_id: str, reason: str) -> Optional[Dict]:
+        def mark_revoked(cert: Dict) -> Dict:
             cert["revoked"] = True
-            cert["revoked_at"] = cert.get("revoked_at") or cert.get("updated_at")
+            cert["revoked_at"] = cert.get("revoked_at") or utc_now_iso()
             cert["revocation_reason"] = reason
-            data[cert_id] = cert
-            self._write(data)
             return cert
 
-    def _read_requests(self) -> Dict[str, Dict]:
-        if not self.request_path.exists():
-            return {}
-        with self.request_path.open("r", encoding="utf-8") as handle:
-            try:
-                return json.load(handle)
-            except json.JSONDecodeError:
-                return {}
+        with self._lock:
+            return self._certs.update(cert_id, _touching(mark_revoked))
 
-    def _write_requests(self, data: Dict[str, Dict]) -> None:
-        with self.request_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+    def list_requests(self, status: Optional[str] = None, limit: Optional[int] = None, **filters) -> List[Dict]:
+        """Requests matching ``status``/``cohort``/``email`` filters, newest first."""
+        if status:
+            filters["status"] = status
+        with self._lock:
+            return self._requests.select(lambda: self.request_index.keys(filters, limit))
 
-    def list_requests(self, status: Optional[str] = None) -> List[Dict]:
+    def page_requests(self, limit: int, before: Optional[SortKey] = None, **filters) -> Page:
         with self._lock:
-            requests = list(self._read_requests().values())
-        if status:
-            requests = [req for req in requests if req.get("status") == status]
-        return sorted(requests, key=lambda r: r.get("requested_at", ""), reverse=True)
+            return self._page(self._requests, self.request_index, limit, before, filters)
+
+    @staticmethod
+    def _page(backend: Backend, index: RecordIndex, limit: int, before: Optional[SortKey], filters: Dict) -> Page:
+        keys, next_before = backend.read(lambda: index.page(filters, limit, before))
+        return backend.select(lambda: keys), next_before
+
+    def count_requests(self, **filters) -> int:
+        with self._lock:
+            return self._requests.read(lambda: self.request_index.count(filters))
 
     def get_request(self, request_id: str) -> Optional[Dict]:
         with self._lock:
-            return self._read_requests().get(request_id)
+            return self._requests.get(request_id)
 
     def save_request(self, request: Dict) -> Dict:
         with self._lock:
-            data = self._read_requests()
-            data[request["request_id"]] = request
-            self._write_requests(data)
+            self._requests.put(request["request_id"], request)
         return request
 
-    def delete_request(self, request_id: str) -> None:
+    def save_requests(self, requests: List[Dict]) -> List[Dict]:
         with self._lock:
-            data = self._read_requests()
-            if request_id in data:
-                del data[request_id]
-                self._write_requests(data)
+            self._requests.put_many({request["request_id"]: request for request in requests})
+        return requests
+
+    def add_requests(self, requests: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Save, in one backend write, the requests whose ``email``+``cohort`` has no pending or approved request.
+
+        Returns ``(saved, duplicates)``. Requests without an email are never
+        duplicates. The check runs against the request index under the
+        backend's exclusive lock, so overlapping uploads in different workers
+        cannot both queue the same pair.
+        """
 
+        def taken(key: str, request: Dict, current: Optional[Dict]) -> bool:
+            if not request.get("email"):
+                return False
+            matches = self.request_index.keys({"email": request["email"], "cohort": request["cohort"]})
+            return any(self.request_index.values(match)["status"] in ("pending", "approved") for match in matches)
+
+        with self._lock:
+            rejected = set(self._requests.put_many({request["request_id"]: request for request in requests}, taken))
+        saved = [request for request in requests if request["request_id"] not in rejected]
+        return saved, [request for request in requests if request["request_id"] in rejected]
+
+    def delete_request(self, request_id: str) -> None:
+        with self._lock:
+            self._requests.delete(request_id)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from backend.app.config import settings
+
+
+class VerificationCache:
+    """Bounded LRU of verification results with a TTL and hit/miss counters.
+
+    Keys start with the certificate id and include everything the result
+    depends on (signed payload, signature, proof mtime), so a changed record
+    or an upgraded proof simply misses. ``invalidate`` drops a certificate's
+    entry outright, e.g. on revocation. ``max_entries=0`` disables caching.
+    """
+
+    def __init__(self, max_entries: int = settings.VERIFY_CACHE_SIZE, ttl_seconds: float = settings.VERIFY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._keys: Dict[Hashable, Tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, value: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._keys.get(key[0])
+            if previous is not None and previous != key:
+                self._discard(previous)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self._keys[key[0]] = key
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._keys.pop(oldest[0], None)
+                self.evictions += 1
+
+    def invalidate(self, cert_id: str) -> None:
+        with self._lock:
+            key = self._keys.get(cert_id)
+            if key is not None:
+                self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def _discard(self, key: Tuple) -> None:
+        self._entries.pop(key, None)
+        if self._keys.get(key[0]) == key:
+            del self._keys[key[0]]
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import datetime as dt
 import json
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple
 
 
 CANONICAL_FIELDS = ("id", "name", "cohort", "issued_at")
@@ -18,6 +20,16 @@ def utc_now_iso() -> str:
     return dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
 
+def parse_utc_iso(value: Optional[str]) -> Optional[dt.datetime]:
+    """Inverse of ``utc_now_iso`` (timezone-aware); ``None`` for missing or malformed values."""
+    if not value:
+        return None
+    try:
+        return dt.datetime.fromisoformat(value.rstrip("Z")).replace(tzinfo=dt.timezone.utc)
+    except ValueError:
+        return None
+
+
 def export_public_certificate(cert: Dict[str, str]) -> Dict[str, str]:
     """Strip sensitive/internal fields for public storage (IPFS/Arweave)."""
     allowed = {
@@ -26,6 +38,9 @@ def export_public_certificate(cert: Dict[str, str]) -> Dict[str, str]:
         "cohort",
         "issued_at",
         "signature",
+        "signature_scheme",
+        "key_id",
+        "merkle",
         "verify_url",
         "linkedin_share_url",
         "ots_status",
@@ -39,3 +54,27 @@ def export_public_certificate(cert: Dict[str, str]) -> Dict[str, str]:
 def json_dumps(data: Dict, *, indent: int = 2) -> str:
     return json.dumps(data, indent=indent, sort_keys=True)
 
+
+def encode_cursor(sort_key: Sequence[str]) -> str:
+    """Opaque pagination cursor for a ``(timestamp, id)`` position."""
+    raw = json.dumps(list(sort_key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Inverse of ``encode_cursor``; malformed cursors restart from the newest page."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, record_id = json.loads(raw)
+        return str(timestamp), str(record_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def parse_bool(value: Optional[str]) -> Optional[bool]:
+    """Map query-string flags such as ``revoked=true`` to booleans (``None`` if absent)."""
+    if value is None or value == "":
+        return None
+    return value.strip().lower() in {"1", "true", "yes", "on"}
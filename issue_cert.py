@@ -1,5 +1,6 @@
 """
 Small CLI to issue a certificate (sends request to running Flask app).
+To issue a whole roster locally instead, use `python -m backend.app.cli issue-batch roster.csv`.
 
 Usage examples:
     python issue_cert.py --name "Bridgit G" --cohort "DadaDevs Feb 2025"
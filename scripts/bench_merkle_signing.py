@@ -0,0 +1,126 @@
+"""
+Merkle-batched cohort signing benchmark against per-certificate Ed25519 signing.
+
+Prepares N certificate records (no PDFs are rendered) and signs them both
+ways, then verifies every record and reports:
+
+  * sign        one Ed25519 signature per certificate vs one Merkle tree plus
+                one root signature for the cohort
+  * verify      CertificateService.verify() per id (result cache disabled),
+                i.e. one signature check each vs an audit-path fold plus a
+                memoized root signature check
+  * batch       verify_batch() over all ids
+  * manifest    checking the whole cohort offline from its signed manifest
+  * proof size  bytes a record carries for its signature (and inclusion path)
+
+Usage examples:
+    python scripts/bench_merkle_signing.py
+    python scripts/bench_merkle_signing.py --count 10000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("ENABLE_OTS", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.services import merkle  # noqa: E402
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSService  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+from backend.app.services.verification_cache import VerificationCache  # noqa: E402
+
+
+def build_service(data_dir: Path) -> CertificateService:
+    return CertificateService(
+        store=CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json"),
+        signer=SignatureService(data_dir / "private.pem", data_dir / "public.pem"),
+        pdf_service=PDFService(),
+        ots_service=OpenTimestampsService(data_dir / "ots"),
+        ipfs_service=IPFSService(data_dir / "public"),
+        linkedin_service=LinkedInService(),
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+        verification_cache=VerificationCache(max_entries=0),
+    )
+
+
+def run(count: int, use_merkle: bool, data_dir: Path) -> dict:
+    settings.MERKLE_SIGNING = use_merkle
+    settings.MERKLE_SIGNING_MIN = 2
+    service = build_service(data_dir)
+    items = [service._prepare_certificate(f"Learner {index}", "bench", sign=False) for index in range(count)]
+
+    started = time.perf_counter()
+    service._sign_many(items)
+    sign_time = time.perf_counter() - started
+    certs = [cert for cert, _ in items]
+    service.store.save_certificates(certs)
+    ids = [cert["id"] for cert in certs]
+
+    started = time.perf_counter()
+    per_id = [service.verify(cert_id)["signature_valid"] for cert_id in ids]
+    verify_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = service.verify_batch(ids)
+    batch_time = time.perf_counter() - started
+
+    manifest_time = None
+    if use_merkle:
+        manifest = service.batch_manifest(certs[0]["merkle"]["batch"])
+        started = time.perf_counter()
+        if not merkle.verify_manifest(manifest, service.signer.verify):
+            raise SystemExit("signed manifest did not verify")
+        manifest_time = time.perf_counter() - started
+
+    if not all(per_id) or any(result["status"] != "valid" for result in batch):
+        raise SystemExit("some certificates failed verification")
+    proof_bytes = sum(
+        len(json.dumps({key: cert[key] for key in ("signature", "signature_scheme", "merkle") if key in cert}))
+        for cert in certs
+    ) / count
+    return {
+        "sign": sign_time,
+        "verify": verify_time,
+        "batch": batch_time,
+        "manifest": manifest_time,
+        "proof_bytes": proof_bytes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Merkle-batched vs per-certificate signing benchmark.")
+    parser.add_argument("--count", type=int, default=2000, help="Certificates in the cohort")
+    args = parser.parse_args()
+
+    settings.VERIFY_PARALLEL_MIN = args.count + 1  # keep the comparison single-process
+    results = {}
+    for label, use_merkle in (("per-cert", False), ("merkle", True)):
+        with tempfile.TemporaryDirectory(prefix="dadadevs-merkle-") as tmp:
+            results[label] = run(args.count, use_merkle, Path(tmp))
+
+    print(f"{args.count} certificates")
+    for label, result in results.items():
+        manifest = f", manifest {result['manifest'] * 1000:.1f} ms" if result["manifest"] is not None else ""
+        print(
+            f"{label:>9}: sign {args.count / result['sign']:>9.0f} certs/s, "
+            f"verify {args.count / result['verify']:>7.0f} certs/s, "
+            f"batch {args.count / result['batch']:>7.0f} certs/s, "
+            f"{result['proof_bytes']:.0f} B/cert{manifest}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
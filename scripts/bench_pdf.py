@@ -0,0 +1,91 @@
+"""
+Benchmark certificate PDF rendering with and without the static artwork form.
+
+Renders the same batch of certificates both ways: redrawing the full artwork
+on every page, and drawing it once per document as a form XObject that each
+page places. It reports the time per certificate for one PDF per certificate,
+and the time per page and file size for a single multi-page cohort document,
+which is where the form pays off. Runs are interleaved so machine noise hits
+both paths alike.
+
+Usage examples:
+    python scripts/bench_pdf.py
+    python scripts/bench_pdf.py --count 200 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+
+
+def make_certs(count: int) -> List[Dict]:
+    return [
+        {
+            "id": str(uuid.UUID(int=index + 1)),
+            "name": f"Bench Learner {index}",
+            "cohort": f"cohort-{index % 4}",
+            "issued_at": "2025-11-24T11:05:03Z",
+        }
+        for index in range(count)
+    ]
+
+
+def run(service: PDFService, certs: List[Dict]) -> float:
+    started = time.perf_counter()
+    for cert in certs:
+        service.generate_pdf(cert)
+    return time.perf_counter() - started
+
+
+def run_document(service: PDFService, certs: List[Dict]) -> Tuple[float, int]:
+    buffer = BytesIO()
+    started = time.perf_counter()
+    service.write_document(certs, buffer)
+    return time.perf_counter() - started, len(buffer.getvalue())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-certificate PDF render benchmark.")
+    parser.add_argument("--count", type=int, default=1000, help="Certificates rendered per run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per path; the fastest is reported")
+    parser.add_argument("--base-url", default="http://localhost:5000", help="Base URL encoded in the QR")
+    args = parser.parse_args()
+
+    certs = make_certs(args.count)
+    services = {
+        "full redraw": PDFService(base_url=args.base_url, use_template=False),
+        "artwork form": PDFService(base_url=args.base_url, use_template=True),
+    }
+    for service in services.values():
+        service.generate_pdf(certs[0])  # warm caches outside the timed runs
+
+    single = {label: float("inf") for label in services}
+    document = dict(single)
+    sizes: Dict[str, int] = {}
+    for _ in range(args.repeat):
+        for label, service in services.items():
+            single[label] = min(single[label], run(service, certs))
+            elapsed, sizes[label] = run_document(service, certs)
+            document[label] = min(document[label], elapsed)
+
+    for title, results in (("one PDF per certificate", single), ("one multi-page document", document)):
+        print(f"{title} ({args.count} certs, best of {args.repeat}):")
+        for label, elapsed in results.items():
+            size = f", {sizes[label] / 1024:8.0f} KiB" if results is document else ""
+            print(f"  {label:>12}: {elapsed:7.2f}s total, {elapsed / args.count * 1000:6.2f} ms/cert{size}")
+        baseline, templated = results["full redraw"], results["artwork form"]
+        saved = (baseline - templated) / args.count * 1000
+        print(f"  speed-up: {baseline / templated:.2f}x ({saved:.2f} ms saved per cert)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for the certificate QR code: PNG image vs vector modules.
+
+The "png" path is the original one (qrcode -> Pillow bitmap -> PNG ->
+ReportLab ImageReader -> image XObject); the "vector" path is
+PDFService._draw_qr, which fills one path of rectangles straight from the
+QR matrix. Each iteration draws one QR onto a fresh page and saves the PDF,
+so the image stream encoding the PNG path triggers is included. "matrix
+only" is the QR encoding both paths share.
+
+Usage examples:
+    python scripts/bench_qr.py
+    python scripts/bench_qr.py --count 2000 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, List
+
+import qrcode
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.services.pdf_service import PAGE_SIZE, QR_SIZE, PDFService  # noqa: E402
+
+
+def draw_png(c: canvas.Canvas, data: str) -> None:
+    qr = qrcode.QRCode(box_size=5, border=1)
+    qr.add_data(data)
+    qr.make()
+    qr_buffer = BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(qr_buffer, format="PNG")
+    qr_buffer.seek(0)
+    c.drawImage(ImageReader(qr_buffer), 100, 100, width=QR_SIZE, height=QR_SIZE)
+
+
+def draw_vector(c: canvas.Canvas, data: str) -> None:
+    PDFService._draw_qr(c, data, 100, 100, QR_SIZE)
+
+
+def matrix_only(c: canvas.Canvas, data: str) -> None:
+    qr = qrcode.QRCode(border=1)
+    qr.add_data(data)
+    qr.make()
+    qr.get_matrix()
+
+
+def run(draw: Callable[[canvas.Canvas, str], None], urls: List[str], save: bool) -> float:
+    started = time.perf_counter()
+    for url in urls:
+        c = canvas.Canvas(BytesIO(), pagesize=PAGE_SIZE)
+        draw(c, url)
+        if save:
+            c.showPage()
+            c.save()
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="QR drawing micro-benchmark.")
+    parser.add_argument("--count", type=int, default=1000, help="QR codes drawn per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported")
+    parser.add_argument("--base-url", default="http://localhost:5000", help="Base URL encoded in the QR")
+    args = parser.parse_args()
+
+    urls = [f"{args.base_url}/verify/{uuid.UUID(int=index + 1)}" for index in range(args.count)]
+    paths = (("png", draw_png, True), ("vector", draw_vector, True), ("matrix only", matrix_only, False))
+    best = {label: float("inf") for label, _, _ in paths}
+    for _ in range(args.repeat):
+        for label, draw, save in paths:
+            best[label] = min(best[label], run(draw, urls, save))
+
+    print(f"{args.count} QR codes, best of {args.repeat}:")
+    for label, elapsed in best.items():
+        print(f"  {label:>11}: {elapsed:6.2f}s total, {elapsed / args.count * 1000:6.2f} ms/QR")
+    print(f"  speed-up: {best['png'] / best['vector']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
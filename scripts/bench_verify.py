@@ -0,0 +1,122 @@
+"""
+Verification throughput benchmark: one-by-one lookups vs the batch API path.
+
+Signs N certificates into a temporary store (no PDFs are rendered), then
+verifies all of them several ways and reports certs/sec:
+
+  * per-id      CertificateService.verify(), as GET /api/v1/certificates/<id> does
+  * batch       CertificateService.verify_batch() with inline signature checks
+  * batch pool  verify_batch() with checks spread over --workers processes
+  * payloads    verify_batch() on presented public payloads, as exported to
+                IPFS; every tenth certificate is a pre-keyring one without a
+                ``key_id``, which must still verify against the keyring
+  * http per-id / http batch   the same through the Flask API (test client),
+                which adds the per-request overhead a round trip costs
+
+Usage examples:
+    python scripts/bench_verify.py
+    python scripts/bench_verify.py --count 5000 --batch-size 500 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("ENABLE_OTS", "false")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from flask import Flask  # noqa: E402
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.routes import api_bp  # noqa: E402
+from backend.app.routes.api import init_api_routes  # noqa: E402
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSService  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+from backend.app.utils import export_public_certificate  # noqa: E402
+
+
+def build_service(data_dir: Path) -> CertificateService:
+    return CertificateService(
+        store=CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json"),
+        signer=SignatureService(data_dir / "private.pem", data_dir / "public.pem"),
+        pdf_service=PDFService(),
+        ots_service=OpenTimestampsService(data_dir / "ots"),
+        ipfs_service=IPFSService(data_dir / "public"),
+        linkedin_service=LinkedInService(),
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Certificate verification throughput benchmark.")
+    parser.add_argument("--count", type=int, default=2000, help="Certificates to sign and verify")
+    parser.add_argument("--batch-size", type=int, default=settings.VERIFY_BATCH_MAX, help="Ids per batch call")
+    parser.add_argument("--workers", type=int, default=settings.VERIFY_WORKERS, help="Processes for the pooled run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dadadevs-verify-") as tmp:
+        service = build_service(Path(tmp))
+        certs = [service._prepare_certificate(f"Learner {index}", "bench")[0] for index in range(args.count)]
+        for cert in certs[::10]:
+            cert.pop("key_id", None)
+        service.store.save_certificates(certs)
+        ids = [cert["id"] for cert in certs]
+        batches = [ids[start:start + args.batch_size] for start in range(0, len(ids), args.batch_size)]
+
+        results = {}
+        started = time.perf_counter()
+        ok = sum(bool(service.verify(cert_id)["signature_valid"]) for cert_id in ids)
+        results["per-id"] = (time.perf_counter() - started, ok)
+
+        for label, workers, parallel_min in (("batch", 1, args.batch_size + 1), ("batch pool", args.workers, 1)):
+            settings.VERIFY_WORKERS, settings.VERIFY_PARALLEL_MIN = workers, parallel_min
+            started = time.perf_counter()
+            ok = sum(result["status"] == "valid" for batch in batches for result in service.verify_batch(batch))
+            results[label] = (time.perf_counter() - started, ok)
+
+        payloads = [export_public_certificate(cert) for cert in certs]
+        settings.VERIFY_WORKERS, settings.VERIFY_PARALLEL_MIN = 1, args.batch_size + 1
+        started = time.perf_counter()
+        ok = sum(
+            result["status"] == "valid"
+            for start in range(0, len(payloads), args.batch_size)
+            for result in service.verify_batch(payloads[start:start + args.batch_size])
+        )
+        results["payloads"] = (time.perf_counter() - started, ok)
+
+        app = Flask(__name__)
+        init_api_routes(service)
+        app.register_blueprint(api_bp)
+        client = app.test_client()
+        settings.VERIFY_WORKERS, settings.VERIFY_PARALLEL_MIN = 1, args.batch_size + 1
+        started = time.perf_counter()
+        ok = sum(client.get(f"/api/v1/certificates/{cert_id}").status_code == 200 for cert_id in ids)
+        results["http per-id"] = (time.perf_counter() - started, ok)
+        started = time.perf_counter()
+        ok = sum(
+            client.post("/api/v1/verify/batch", json={"ids": batch}).get_json()["summary"].get("valid", 0)
+            for batch in batches
+        )
+        results["http batch"] = (time.perf_counter() - started, ok)
+
+    print(f"{args.count} certificates, batches of {args.batch_size}, pool of {args.workers} process(es):")
+    for label, (elapsed, ok) in results.items():
+        print(f"  {label:>11}: {elapsed:6.2f}s, {args.count / elapsed:8.0f} certs/sec ({ok} valid)")
+    failed = [label for label, (_, ok) in results.items() if ok != args.count]
+    if failed:
+        print(f"FAIL: not every certificate verified in: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Regression check for the static artwork form in certificate PDFs.
+
+Renders certificates uncompressed and resolves every text run to the font its
+``Tf`` operator names in that document (``/F1`` ... are numbered per document
+in first-use order). It then checks that:
+
+  * each static string uses the same font and size as a full redraw, in a
+    fresh document and in multi-page documents whose canvas registered other
+    fonts first (so the form's fonts get different resource names)
+  * a multi-page document defines the form once and places it on every page
+  * a second body text in the same document gets its own form
+
+Run it after upgrading ReportLab.
+
+Usage examples:
+    python scripts/check_pdf_layout.py
+    python scripts/check_pdf_layout.py --pages 20
+"""
+
+import argparse
+import re
+import sys
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from backend.app.services.pdf_service import PAGE_SIZE, PDFService  # noqa: E402
+
+STATIC_TEXT = (
+    "Certificate of Achievement",
+    "This certificate is proudly presented to",
+    "DADA DEVS COUNCIL",
+    "Program Leadership",
+    "Secured with Ed25519 signatures, OpenTimestamps anchoring, and Bitcoin provenance.",
+)
+FONT_OBJECT = re.compile(r"/BaseFont /([\w-]+)[^>]*?/Name /(F\d+)")
+STREAM = re.compile(r"stream\r?\n(.*?)endstream", re.S)
+TEXT_OP = re.compile(r"/(F\d+) ([\d.]+) Tf|\((.*?)\) Tj")
+FORM_USE = re.compile(r"/(\S+) Do")
+
+
+def cert(index: int) -> Dict:
+    return {"id": f"check-{index}", "name": f"Learner {index}", "cohort": "check", "issued_at": "2025-01-01T00:00:00Z"}
+
+
+def render(service: PDFService, pages: int, prelude: Callable[[canvas.Canvas], None], bodies: int = 1) -> str:
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=0)
+    prelude(c)
+    for index in range(pages):
+        page = cert(index)
+        if bodies > 1 and index % 2:
+            page["body"] = "A second body text for alternate pages."
+        service.draw_certificate(c, page)
+        c.showPage()
+    c.save()
+    return buffer.getvalue().decode("latin-1")
+
+
+def text_fonts(pdf: str) -> Dict[str, Tuple[str, float]]:
+    """Static string -> (base font, size) as resolved in ``pdf``."""
+    fonts = dict((name, base) for base, name in FONT_OBJECT.findall(pdf))
+    found: Dict[str, Tuple[str, float]] = {}
+    for stream in STREAM.findall(pdf):
+        current: Tuple[str, float] = ("", 0.0)
+        for font, size, text in TEXT_OP.findall(stream):
+            if font:
+                current = (fonts.get(font, f"unknown {font}"), float(size))
+            elif text in STATIC_TEXT:
+                found.setdefault(text, current)
+    return found
+
+
+def preludes() -> List[Tuple[str, Callable[[canvas.Canvas], None]]]:
+    def fonts_first(*names: str) -> Callable[[canvas.Canvas], None]:
+        def prelude(c: canvas.Canvas) -> None:
+            for offset, name in enumerate(names):
+                c.setFont(name, 8)
+                c.drawString(10, 10 + offset * 10, name)
+
+        return prelude
+
+    return [
+        ("fresh document", lambda c: None),
+        ("Courier registered first", fonts_first("Courier")),
+        ("Times, Helvetica-Bold, Courier first", fonts_first("Times-Roman", "Helvetica-Bold", "Courier")),
+    ]
+
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    return condition
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Static artwork form regression check.")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per multi-page document")
+    args = parser.parse_args()
+
+    expected = text_fonts(render(PDFService(use_template=False), 1, lambda c: None))
+    passed = check(set(expected) == set(STATIC_TEXT), "full redraw shows every static string")
+    service = PDFService(use_template=True)
+    for label, prelude in preludes():
+        pdf = render(service, args.pages, prelude)
+        passed &= check(text_fonts(pdf) == expected, f"{label}: static text keeps its fonts and sizes")
+        forms = FORM_USE.findall(pdf)
+        passed &= check(
+            len(forms) == args.pages and len(set(forms)) == 1 and pdf.count("/Subtype /Form") == 1,
+            f"{label}: one form, placed on all {args.pages} pages",
+        )
+    pdf = render(service, args.pages, preludes()[1][1], bodies=2)
+    passed &= check(pdf.count("/Subtype /Form") == 2, "two body texts in one document get two forms")
+    passed &= check(text_fonts(pdf) == expected, "two body texts: static text keeps its fonts and sizes")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+IPFS pinning harness against a local fake Pinata-style pinning server.
+
+The fake server answers ``POST /pinning/pinJSONToIPFS`` and
+``POST /pinning/pinFileToIPFS`` (multipart, one directory per call) with
+content-derived CIDs, keeps connections alive, and counts requests and TCP
+connections. It can fail the next K requests with 503 or be taken "down".
+The harness checks that:
+
+  * pins reuse pooled connections (compared with one ``requests.post`` each)
+  * a batch of payloads is pinned as one directory in one request
+  * transient 503s are retried with backoff and the pin still succeeds
+  * pins that keep failing are marked ``ipfs_status: error``, stay in the
+    persisted job queue, and succeed after a "restart" once the server is back
+
+Usage examples:
+    python scripts/ipfs_pin_harness.py
+    python scripts/ipfs_pin_harness.py --count 500 --latency 20 --concurrency 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+os.environ["ENABLE_OTS"] = "false"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests  # noqa: E402
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSPinError, IPFSService  # noqa: E402
+from backend.app.services.job_queue import JobQueue  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+
+
+class FakePinningServer:
+    """Pinata-compatible enough for ``IPFSService``; records what it receives."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.files = 0
+        self.connections = set()
+        self.fail_next = 0
+        self.down = False
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        base = f"http://127.0.0.1:{self.server.server_port}/pinning"
+        self.json_url, self.file_url = f"{base}/pinJSONToIPFS", f"{base}/pinFileToIPFS"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid delayed-ACK stalls on kept-alive sockets.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.connections.add(self.client_address)
+                    failing = fake.down or fake.fail_next > 0
+                    fake.fail_next = max(0, fake.fail_next - 1)
+                time.sleep(fake.latency)
+                if failing:
+                    self._reply(503, {"error": "try again"}, {"Retry-After": "0"})
+                elif self.path.endswith("/pinJSONToIPFS"):
+                    fake._count(1)
+                    self._reply(200, {"IpfsHash": fake.cid(json.loads(body)["pinataContent"])})
+                elif self.path.endswith("/pinFileToIPFS"):
+                    header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                    parts = [part for part in BytesParser().parsebytes(header + body).walk() if part.get_filename()]
+                    fake._count(len(parts))
+                    self._reply(200, {"IpfsHash": fake.cid(sorted(part.get_filename() for part in parts))})
+                else:
+                    self._reply(404, {"error": "unknown endpoint"})
+
+            def _reply(self, status: int, data, headers=None):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _count(self, files: int) -> None:
+        with self._lock:
+            self.files += files
+
+    @staticmethod
+    def cid(content) -> str:
+        return "bafy" + hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()[:40]
+
+    def reset(self) -> None:
+        self.requests = self.files = 0
+        self.connections = set()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def build_service(data_dir: Path, fake: FakePinningServer, job_queue: JobQueue) -> CertificateService:
+    return CertificateService(
+        store=CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json"),
+        signer=SignatureService(data_dir / "private.pem", data_dir / "public.pem"),
+        pdf_service=PDFService(),
+        ots_service=OpenTimestampsService(data_dir / "ots"),
+        ipfs_service=IPFSService(data_dir / "public", api_url=fake.json_url, batch_api_url=fake.file_url),
+        linkedin_service=LinkedInService(),
+        job_queue=job_queue,
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="IPFS pinning harness with a local fake pinning server.")
+    parser.add_argument("--count", type=int, default=200, help="Payloads to pin")
+    parser.add_argument("--latency", type=float, default=10.0, help="Artificial delay per pin request (ms)")
+    parser.add_argument("--concurrency", type=int, default=settings.IPFS_MAX_CONCURRENCY, help="Concurrent pins")
+    args = parser.parse_args()
+
+    settings.IPFS_BACKOFF_SECONDS = 0.01
+    fake = FakePinningServer(args.latency / 1000)
+    payloads = {f"cert-{index}": {"id": f"cert-{index}", "name": f"Learner {index}"} for index in range(args.count)}
+    problems: List[str] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="dadadevs-ipfs-") as tmp:
+            data_dir = Path(tmp)
+
+            started = time.perf_counter()
+            for payload in payloads.values():
+                requests.post(fake.json_url, json={"pinataContent": payload}, timeout=10).raise_for_status()
+            print(f"  unpooled: {fake.requests} requests, {len(fake.connections)} connections, "
+                  f"{time.perf_counter() - started:.2f}s")
+            fake.reset()
+
+            service = IPFSService(data_dir / "a", api_url=fake.json_url, batch_api_url=None,
+                                  max_concurrency=args.concurrency)
+            started = time.perf_counter()
+            urls = service.pin_many(payloads)
+            print(f"    pooled: {fake.requests} requests, {len(fake.connections)} connections, "
+                  f"{time.perf_counter() - started:.2f}s")
+            if len(fake.connections) > args.concurrency or None in urls.values():
+                problems.append("pooled pins opened more connections than the concurrency limit")
+            fake.reset()
+
+            service = IPFSService(data_dir / "b", api_url=fake.json_url, batch_api_url=fake.file_url)
+            started = time.perf_counter()
+            urls = service.pin_many(payloads, "certificates-harness")
+            print(f"     batch: {fake.requests} request(s), {fake.files} files, {time.perf_counter() - started:.2f}s")
+            cids = {url.rsplit("/", 2)[1] for url in urls.values()}
+            if fake.requests != 1 or fake.files != args.count or len(cids) != 1:
+                problems.append("batch pin did not go up as one directory in one request")
+            fake.reset()
+
+            fake.fail_next = settings.IPFS_RETRIES
+            try:
+                service.pin_json("cert-0", payloads["cert-0"])
+            except IPFSPinError as exc:
+                problems.append(f"transient failures were not retried: {exc}")
+            print(f" transient: {fake.requests} requests for one pin after {settings.IPFS_RETRIES} 503s")
+            fake.reset()
+
+            fake.down = True
+            queue = JobQueue(data_dir / "jobs.sqlite3", workers=0, backoff_seconds=0.2)
+            issuing = build_service(data_dir / "svc", fake, queue)
+            certs = [issuing.issue(f"Learner {index}", "harness")[0] for index in range(5)]
+            queue.run_pending()
+            stored = issuing.store.get_certificates([cert["id"] for cert in certs])
+            if {cert.get("ipfs_status") for cert in stored.values()} != {"error"}:
+                problems.append("failed pins were not marked ipfs_status=error")
+            fake.down = False
+            restarted = build_service(data_dir / "svc", fake, JobQueue(data_dir / "jobs.sqlite3", workers=0))
+            deadline = time.monotonic() + 10
+            while restarted.job_queue.counts().get("queued") and time.monotonic() < deadline:
+                restarted.job_queue.run_pending()
+                time.sleep(0.05)
+            stored = restarted.store.get_certificates([cert["id"] for cert in certs])
+            pinned = sum(cert.get("ipfs_status") == "pinned" for cert in stored.values())
+            print(f"     retry: {pinned}/{len(certs)} pinned after the server came back ({restarted.job_queue.counts()})")
+            if pinned != len(certs):
+                problems.append("queued pins did not succeed after the restart")
+    finally:
+        fake.close()
+
+    print("FAIL: " + "; ".join(problems) if problems else "ok")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Re-run checks for ``python -m backend.app.cli issue-batch``.
+
+Issues a generated roster into a temporary data directory, revokes one
+certificate, then runs the same roster again and checks that:
+
+  * ``--restart`` into the same output and a run into a new ``--output`` issue
+    nothing; every row is logged ``exists``
+  * the revoked certificate keeps ``revoked: true``, its ``issued_at`` and its
+    signature, stays on the signed revocation list and still verifies as revoked
+  * a chunk replayed after a simulated crash (checkpoint rewound, chunk still
+    marked in flight) re-exports its PDFs from the archive without touching
+    the stored records, while a revoked row in it stays ``exists``
+
+Usage examples:
+    python scripts/issue_batch_harness.py
+    python scripts/issue_batch_harness.py --rows 120 --chunk-size 25
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+os.environ["ENABLE_OTS"] = "false"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.cli import ISSUE_CHECKPOINT, issue_batch  # noqa: E402
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSService  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.revocation_list import RevocationListPublisher  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+
+
+def build_service(data_dir: Path) -> CertificateService:
+    store = CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json")
+    signer = SignatureService(data_dir / "private.pem", data_dir / "public.pem")
+    return CertificateService(
+        store=store,
+        signer=signer,
+        pdf_service=PDFService(),
+        ots_service=OpenTimestampsService(data_dir / "ots"),
+        ipfs_service=IPFSService(data_dir / "public"),
+        linkedin_service=LinkedInService(),
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+        revocation_list=RevocationListPublisher(store, signer, data_dir / "revocations"),
+    )
+
+
+def run(service: CertificateService, roster: Path, output: Path, chunk_size: int, restart: bool = False) -> List[Dict]:
+    args = argparse.Namespace(
+        roster=str(roster), output=str(output), cohort="harness", workers=1, chunk_size=chunk_size, restart=restart
+    )
+    issue_batch(args, service)
+    with (output / "issued.csv").open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def check(condition: bool, message: str) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="issue-batch re-run and revocation checks.")
+    parser.add_argument("--rows", type=int, default=60, help="Roster rows")
+    parser.add_argument("--chunk-size", type=int, default=20, help="Rows per chunk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dadadevs-issue-batch-") as tmp:
+        tmp_dir = Path(tmp)
+        service = build_service(tmp_dir / "data")
+        roster = tmp_dir / "roster.csv"
+        with roster.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["name", "cohort", "email"])
+            writer.writerows([f"Learner {row}", "", f"learner{row}@example.com"] for row in range(1, args.rows + 1))
+
+        first = run(service, roster, tmp_dir / "out", args.chunk_size)
+        ids = [row["certificate_id"] for row in first]
+        check(len(ids) == args.rows and all(row["status"] == "issued" for row in first), "first run issues every row")
+
+        revoked_id = ids[1]
+        service.revoke(revoked_id, "harness")
+        before = service.store.get_certificates(ids)
+
+        def unchanged() -> bool:
+            after = service.store.get_certificates(ids)
+            return all(
+                after[cert_id][field] == before[cert_id][field]
+                for cert_id in ids
+                for field in ("issued_at", "signature", "revoked")
+            )
+
+        for label, output, restart in (("--restart", tmp_dir / "out", True), ("new --output", tmp_dir / "out2", False)):
+            rows = run(service, roster, output, args.chunk_size, restart)[-args.rows:]
+            check(all(row["status"] == "exists" for row in rows), f"{label}: every row is logged exists")
+            check(unchanged(), f"{label}: issued_at, signatures and revocation state are untouched")
+
+        check(service.store.count_certificates() == args.rows, "no certificate was added")
+        check(service.verify(revoked_id)["revoked"], "revoked certificate still verifies as revoked")
+        crl = json.loads((tmp_dir / "data" / "revocations" / "crl.json").read_text(encoding="utf-8"))["crl"]
+        check(revoked_id in {entry["id"] for entry in crl["revoked"]}, "revoked id is still on the revocation list")
+
+        # Simulate a crash after the first chunk was stored but before its checkpoint was written.
+        replay_dir = tmp_dir / "out3"
+        replay_dir.mkdir()
+        checkpoint = json.loads((tmp_dir / "out" / ISSUE_CHECKPOINT).read_text(encoding="utf-8"))
+        checkpoint.update(rows=0, issued=0, failed=0, skipped=0, inflight=[1, args.chunk_size])
+        (replay_dir / ISSUE_CHECKPOINT).write_text(json.dumps(checkpoint), encoding="utf-8")
+        rows = run(service, roster, replay_dir, args.chunk_size)
+        statuses = {row["certificate_id"]: row["status"] for row in rows}
+        in_flight = ids[: args.chunk_size]
+        check(statuses[revoked_id] == "exists", "replayed chunk: the revoked row stays exists")
+        check(
+            all(statuses[cert_id] == "issued" for cert_id in in_flight if cert_id != revoked_id),
+            "replayed chunk: stored rows are recovered as issued",
+        )
+        check(
+            all((replay_dir / f"certificate-{cert_id}.pdf").exists() for cert_id in in_flight if cert_id != revoked_id),
+            "replayed chunk: PDFs are exported from the archive",
+        )
+        check(all(statuses[cert_id] == "exists" for cert_id in ids[args.chunk_size:]), "rows after it stay exists")
+        check(unchanged(), "replay leaves every stored record untouched")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
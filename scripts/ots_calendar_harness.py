@@ -0,0 +1,276 @@
+"""
+OpenTimestamps batching and upgrade harness against local stand-in calendars.
+
+Starts one or more HTTP servers that speak the calendar protocol
+(``POST /digest`` answers with a pending attestation, ``GET /timestamp/<hex>``
+with the upgraded timestamp once a block is "mined") and count the requests
+they receive. The first one also serves Esplora-style block headers. The
+harness issues N certificates through the job queue with OTS enabled and
+checks that:
+
+  * each calendar received exactly one submission per batch of --batch-size
+  * every certificate's ``.ots`` proof commits to its own payload digest and
+    its Merkle path ends in a commitment a calendar actually issued
+  * ``upgrade_proofs`` leaves proofs pending before the block exists, and
+    afterwards records the block height and time on every certificate with
+    one upgrade request per batch per calendar
+  * verify pages then report the stored attestation without any calendar or
+    block-header request
+
+It then repeats the stamping run with batches of one to show the
+per-certificate cost. --latency adds an artificial delay per calendar call.
+
+Usage examples:
+    python scripts/ots_calendar_harness.py
+    python scripts/ots_calendar_harness.py --count 1000 --batch-size 250 --calendars 3 --latency 100
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Set
+
+os.environ["ENABLE_OTS"] = "true"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from opentimestamps.core.notary import BitcoinBlockHeaderAttestation, PendingAttestation  # noqa: E402
+from opentimestamps.core.op import OpAppend, OpSHA256  # noqa: E402
+from opentimestamps.core.serialize import BytesSerializationContext  # noqa: E402
+from opentimestamps.core.timestamp import Timestamp, make_merkle_tree  # noqa: E402
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSService  # noqa: E402
+from backend.app.services.job_queue import JobQueue  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import BlockHeaders, OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+from backend.app.utils import canonical_payload  # noqa: E402
+
+BLOCK_HEIGHT = 840000
+BLOCK_TIME = 1713571767
+
+
+def _serialize(timestamp: Timestamp) -> bytes:
+    context = BytesSerializationContext()
+    timestamp.serialize(context)
+    return context.getbytes()
+
+
+class StandInCalendar:
+    """Minimal calendar (and block explorer) server that records what it is asked."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.submissions = 0
+        self.upgrade_requests = 0
+        self.header_requests = 0
+        self.commitments: Set[bytes] = set()
+        self.upgraded: Dict[bytes, Timestamp] = {}
+        self.blocks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handler(self):
+        calendar = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                digest = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != "/digest" or not 0 < len(digest) <= 64:
+                    self.send_error(400)
+                    return
+                time.sleep(calendar.latency)
+                self._reply(calendar.commit(digest))
+
+            def do_GET(self):
+                time.sleep(calendar.latency)
+                _, kind, arg = (self.path.split("/", 2) + [""])[:3]
+                if kind == "timestamp":
+                    body = calendar.upgrade(bytes.fromhex(arg))
+                elif kind in ("block-height", "block"):
+                    body = calendar.block(kind, arg)
+                else:
+                    body = None
+                if body is None:
+                    self.send_error(404)
+                    return
+                self._reply(body)
+
+            def _reply(self, body: bytes):
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def commit(self, digest: bytes) -> bytes:
+        timestamp = Timestamp(digest)
+        commitment = timestamp.ops.add(OpAppend(os.urandom(8))).ops.add(OpSHA256())
+        commitment.attestations.add(PendingAttestation(self.url))
+        with self._lock:
+            self.submissions += 1
+            self.commitments.add(commitment.msg)
+        return _serialize(timestamp)
+
+    def upgrade(self, commitment: bytes):
+        with self._lock:
+            self.upgrade_requests += 1
+            timestamp = self.upgraded.get(commitment)
+        return _serialize(timestamp) if timestamp else None
+
+    def mine(self) -> None:
+        """Commit every commitment so far into one block at ``BLOCK_HEIGHT``."""
+        with self._lock:
+            leaves = [Timestamp(commitment) for commitment in sorted(self.commitments)]
+            root = make_merkle_tree(leaves)
+            root.attestations.add(BitcoinBlockHeaderAttestation(BLOCK_HEIGHT))
+            self.upgraded = {leaf.msg: leaf for leaf in leaves}
+            block_hash = hashlib.sha256(root.msg).hexdigest()
+            self.blocks = {
+                str(BLOCK_HEIGHT): {"hash": block_hash},
+                block_hash: {"merkle_root": root.msg[::-1].hex(), "timestamp": BLOCK_TIME},
+            }
+
+    def block(self, kind: str, arg: str):
+        with self._lock:
+            self.header_requests += 1
+            block = self.blocks.get(arg)
+        if block is None:
+            return None
+        return block["hash"].encode() if kind == "block-height" else json.dumps(block).encode()
+
+    def requests(self) -> int:
+        return self.submissions + self.upgrade_requests + self.header_requests
+
+    def reset(self) -> None:
+        self.submissions = self.upgrade_requests = self.header_requests = 0
+        self.commitments, self.upgraded, self.blocks = set(), {}, {}
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run(count: int, batch_size: int, calendars, data_dir: Path, upgrade: bool) -> Dict:
+    for calendar in calendars:
+        calendar.reset()
+    settings.OTS_BATCH_SIZE = batch_size
+    ots_service = OpenTimestampsService(
+        data_dir / "ots",
+        calendar_urls=[calendar.url for calendar in calendars],
+        block_headers=BlockHeaders(calendars[0].url),
+    )
+    job_queue = JobQueue(data_dir / "jobs.sqlite3", workers=0)
+    service = CertificateService(
+        store=CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json"),
+        signer=SignatureService(data_dir / "private.pem", data_dir / "public.pem"),
+        pdf_service=PDFService(),
+        ots_service=ots_service,
+        ipfs_service=IPFSService(data_dir / "public"),
+        linkedin_service=LinkedInService(),
+        job_queue=job_queue,
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+    )
+    certs = [service._prepare_certificate(f"Learner {index}", "harness")[0] for index in range(count)]
+    ids = [cert["id"] for cert in certs]
+    service.store.save_certificates(certs)
+    service._enqueue_side_effects(certs)
+
+    started = time.perf_counter()
+    job_queue.run_pending()
+    elapsed = time.perf_counter() - started
+    batches = -(-count // batch_size)
+    problems = []
+    if any(calendar.submissions != batches for calendar in calendars):
+        problems.append(f"submissions {[calendar.submissions for calendar in calendars]}, expected {batches} each")
+
+    issued = set().union(*(calendar.commitments for calendar in calendars))
+    bad_proofs = 0
+    for cert in service.store.get_certificates(ids).values():
+        detached = ots_service.load(cert["id"])
+        digest = hashlib.sha256(canonical_payload(cert).encode("utf-8")).digest()
+        pending = [msg for msg, _ in detached.timestamp.all_attestations()] if detached else []
+        if (
+            cert.get("ots_status") != "stamped"
+            or detached.file_digest != digest
+            or len(pending) != len(calendars)
+            or not set(pending) <= issued
+            or service.verify(cert["id"])["ots_verification"]["status"] != "pending"
+        ):
+            bad_proofs += 1
+    if bad_proofs:
+        problems.append(f"{bad_proofs} bad proof(s)")
+
+    if upgrade:
+        before = service.upgrade_proofs()
+        if any(result["status"] != "pending" for result in before.values()):
+            problems.append("proofs upgraded before any block was mined")
+        calendars[0].mine()
+        for calendar in calendars:
+            calendar.upgrade_requests = 0
+        after = service.upgrade_proofs()
+        stored = service.store.get_certificates(ids)
+        expected_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(BLOCK_TIME))
+        if any(calendar.upgrade_requests != batches for calendar in calendars):
+            problems.append(f"upgrade requests {[calendar.upgrade_requests for calendar in calendars]}")
+        if len(after) != count or any(
+            cert.get("ots_status") != "confirmed"
+            or cert.get("ots_block_height") != BLOCK_HEIGHT
+            or cert.get("ots_block_time") != expected_time
+            for cert in stored.values()
+        ):
+            problems.append("not every certificate recorded the block height and time")
+        requests_before = sum(calendar.requests() for calendar in calendars)
+        statuses = {service.verify(cert_id)["ots_verification"]["status"] for cert_id in ids}
+        if statuses != {"verified"} or sum(calendar.requests() for calendar in calendars) != requests_before:
+            problems.append(f"verify reported {statuses} or made network requests")
+        if service.upgrade_proofs():
+            problems.append("confirmed proofs are still walked")
+    return {"elapsed": elapsed, "batches": batches, "problems": problems}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OpenTimestamps Merkle batching and upgrade harness.")
+    parser.add_argument("--count", type=int, default=200, help="Certificates to stamp")
+    parser.add_argument("--batch-size", type=int, default=settings.OTS_BATCH_SIZE, help="Certificates per Merkle batch")
+    parser.add_argument("--calendars", type=int, default=2, help="Stand-in calendars to submit to")
+    parser.add_argument("--latency", type=float, default=20.0, help="Artificial delay per calendar call (ms)")
+    args = parser.parse_args()
+
+    calendars = [StandInCalendar(args.latency / 1000) for _ in range(args.calendars)]
+    failed = False
+    try:
+        for label, batch_size, upgrade in (("batched", args.batch_size, True), ("per-cert", 1, False)):
+            with tempfile.TemporaryDirectory(prefix="dadadevs-ots-") as tmp:
+                result = run(args.count, batch_size, calendars, Path(tmp), upgrade)
+            failed |= bool(result["problems"])
+            print(
+                f"{label:>8}: {args.count} certs in {result['batches']} batch(es) of {batch_size}, "
+                f"{result['batches']} calendar call(s) each, stamped in {result['elapsed']:.2f}s: "
+                f"{'; '.join(result['problems']) or 'ok'}"
+            )
+    finally:
+        for calendar in calendars:
+            calendar.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
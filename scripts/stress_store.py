@@ -0,0 +1,130 @@
+"""
+Multi-process stress test for CertificateStore and AuthService persistence.
+
+Spawns N worker processes that each queue, approve and identity-verify M
+certificates against one shared data directory, then checks that no request,
+certificate or verification token was lost.
+
+Usage examples:
+    python scripts/stress_store.py
+    python scripts/stress_store.py --workers 16 --per-worker 50 --backend json
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("ENABLE_OTS", "false")
+os.environ.setdefault("STORE_COMPACT_MIN", "50")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.services.artifact_store import ArtifactStore  # noqa: E402
+from backend.app.services.auth_service import AuthService  # noqa: E402
+from backend.app.services.certificate_service import CertificateService  # noqa: E402
+from backend.app.services.ipfs_service import IPFSService  # noqa: E402
+from backend.app.services.linkedin_service import LinkedInService  # noqa: E402
+from backend.app.services.ots_service import OpenTimestampsService  # noqa: E402
+from backend.app.services.pdf_service import PDFService  # noqa: E402
+from backend.app.services.signature_service import SignatureService  # noqa: E402
+from backend.app.services.storage_service import CertificateStore  # noqa: E402
+
+
+def build_service(data_dir: Path, backend: str) -> CertificateService:
+    return CertificateService(
+        store=CertificateStore(data_dir / "certs.json", data_dir / "cert_requests.json", backend),
+        signer=SignatureService(data_dir / "private.pem", data_dir / "public.pem"),
+        pdf_service=PDFService(),
+        ots_service=OpenTimestampsService(data_dir / "ots"),
+        ipfs_service=IPFSService(data_dir / "public"),
+        linkedin_service=LinkedInService(),
+        artifact_store=ArtifactStore(data_dir / "artifacts"),
+    )
+
+
+def build_auth(data_dir: Path) -> AuthService:
+    auth = AuthService()
+    auth.session_file = data_dir / "sessions.json"
+    auth.student_verifications_file = data_dir / "student_verifications.json"
+    auth._ensure_files()
+    return auth
+
+
+def worker(data_dir: str, backend: str, worker_id: int, count: int) -> None:
+    service = build_service(Path(data_dir), backend)
+    auth = build_auth(Path(data_dir))
+    request_ids = []
+    for index in range(count):
+        request = service.request_issue(
+            name=f"Worker {worker_id} Learner {index}",
+            cohort=f"stress-{worker_id % 3}",
+            email=f"w{worker_id}-{index}@example.com",
+            source="stress",
+        )
+        request_ids.append(request["request_id"])
+    for request_id in request_ids:
+        cert, _ = service.approve_request(request_id, approver=f"worker-{worker_id}")
+        auth.generate_student_verification_token(cert["email"], cert["id"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent issuance stress test for the certificate store.")
+    parser.add_argument("--workers", type=int, default=8, help="Number of worker processes")
+    parser.add_argument("--per-worker", type=int, default=25, help="Requests issued and approved per worker")
+    parser.add_argument("--backend", choices=("log", "json"), default="log", help="Store backend to exercise")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dadadevs-stress-") as tmp:
+        data_dir = Path(tmp)
+        build_service(data_dir, args.backend)  # create the key pair once, before workers race for it
+        build_auth(data_dir)
+
+        started = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=worker, args=(tmp, args.backend, worker_id, args.per_worker))
+            for worker_id in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        failed_workers = [p.exitcode for p in processes if p.exitcode != 0]
+        service = build_service(data_dir, args.backend)
+        auth = build_auth(data_dir)
+        requests = service.list_requests()
+        approved = [r for r in requests if r.get("status") == "approved"]
+        cert_ids = {c["id"] for c in service.store.list_certificates()}
+        tokens = auth._load_verifications()
+        expected = args.workers * args.per_worker
+
+        problems = []
+        if failed_workers:
+            problems.append(f"{len(failed_workers)} worker(s) crashed")
+        if len(requests) != expected:
+            problems.append(f"requests: expected {expected}, found {len(requests)}")
+        if len(approved) != expected:
+            problems.append(f"approved requests: expected {expected}, found {len(approved)}")
+        if len(cert_ids) != expected:
+            problems.append(f"certificates: expected {expected}, found {len(cert_ids)}")
+        missing = [r["request_id"] for r in approved if r.get("certificate_id") not in cert_ids]
+        if missing:
+            problems.append(f"{len(missing)} approved request(s) point at missing certificates")
+        if len(tokens) != expected:
+            problems.append(f"verification tokens: expected {expected}, found {len(tokens)}")
+
+    print(f"{args.workers} workers x {args.per_worker} approvals ({args.backend} backend) in {elapsed:.2f}s")
+    if problems:
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        return 1
+    print(f"OK: {expected} requests, certificates and verification tokens, none lost")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())